@@ -208,6 +208,7 @@ def init(site, sites_path=".", new_site=False, force=False):
 	)
 	local.rollback_observers = []
 	local.before_commit = []
+	local.after_commit = []
 	local.test_objects = {}
 
 	local.site = site
@@ -269,17 +270,9 @@ def connect(site=None, db_name=None, set_admin_as_user=True):
 
 
 def connect_replica():
-	from frappe.database import get_db
-
-	user = local.conf.db_name
-	password = local.conf.db_password
-	port = local.conf.replica_db_port
-
-	if local.conf.different_credentials_for_replica:
-		user = local.conf.replica_db_name
-		password = local.conf.replica_db_password
+	from frappe.database.replica import connect, get_replica_configs
 
-	local.replica_db = get_db(host=local.conf.replica_host, user=user, password=password, port=port)
+	local.replica_db = connect(get_replica_configs()[0])
 
 	# swap db connections
 	local.primary_db = local.db
@@ -345,6 +338,9 @@ def destroy():
 	if db:
 		db.close()
 
+	if getattr(local, "replica_db", None):
+		local.replica_db.close()
+
 	release_local(local)
 
 
@@ -763,19 +759,14 @@ def is_whitelisted(method):
 
 
 def read_only():
+	"""Decorator: Run the function on a read replica, see `frappe.database.replica`."""
+
 	def innfn(fn):
 		def wrapper_fn(*args, **kwargs):
-			if conf.read_from_replica:
-				connect_replica()
+			from frappe.database.replica import use_replica
 
-			try:
-				retval = fn(*args, **get_newargs(fn, kwargs))
-			finally:
-				if local and hasattr(local, "primary_db"):
-					local.db.close()
-					local.db = local.primary_db
-
-			return retval
+			with use_replica("read_only"):
+				return fn(*args, **get_newargs(fn, kwargs))
 
 		return wrapper_fn
 
@@ -1739,6 +1730,7 @@ def get_all(doctype, *args, **kwargs):
 	:param order_by: Order By e.g. `modified desc`.
 	:param limit_start: Start results at record #. Default 0.
 	:param limit_page_length: No of records in the page. Default 20.
+	:param as_iterator: Return a generator fetching rows lazily (see `frappe.db.stream`).
 
 	Example usage:
 
@@ -21,6 +21,7 @@ import frappe.monitor
 import frappe.rate_limiter
 import frappe.recorder
 import frappe.utils.response
+import frappe.website.page_cache
 import frappe.website.render
 from frappe import _
 from frappe.core.doctype.comment.comment import update_comments_in_parent_after_request
@@ -54,6 +55,11 @@ def application(request):
 
 		init_request(request)
 
+		if frappe.local.cached_response:
+			# no session or database connection was set up for the request
+			response = frappe.local.cached_response
+			return response
+
 		frappe.api.validate_auth()
 
 		if request.method == "OPTIONS":
@@ -132,8 +138,12 @@ def init_request(request):
 	if frappe.local.conf.get("maintenance_mode"):
 		frappe.connect()
 		raise frappe.SessionStopped("Session Stopped")
-	else:
-		frappe.connect(set_admin_as_user=False)
+
+	frappe.local.cached_response = frappe.website.page_cache.get_cached_response(request)
+	if frappe.local.cached_response:
+		return
+
+	frappe.connect(set_admin_as_user=False)
 
 	make_form_dict(request)
 
@@ -9,6 +9,8 @@ from six import iteritems, text_type
 bootstrap client session
 """
 
+import hashlib
+
 import frappe
 import frappe.defaults
 import frappe.desk.desk_page
@@ -23,7 +25,7 @@ from frappe.social.doctype.energy_point_settings.energy_point_settings import (
 )
 from frappe.social.doctype.post.post import frequently_visited_links
 from frappe.translate import get_lang_dict, get_messages_for_boot, get_translated_doctypes
-from frappe.utils import cstr
+from frappe.utils import cint, cstr
 from frappe.utils.change_log import get_versions
 from frappe.website.doctype.web_page_view.web_page_view import is_tracking_enabled
 
@@ -44,13 +46,10 @@ def get_bootinfo():
 	bootinfo.server_date = frappe.utils.nowdate()
 
 	if frappe.session["user"] != "Guest":
-		bootinfo.user_info = get_user_info()
 		bootinfo.sid = frappe.session["sid"]
 
 	bootinfo.modules = {}
 	bootinfo.module_list = []
-	load_desktop_data(bootinfo)
-	bootinfo.letter_heads = get_letter_heads()
 	bootinfo.active_domains = frappe.get_active_domains()
 	bootinfo.all_domains = [d.get("name") for d in frappe.get_all("Domain")]
 	add_layouts(bootinfo)
@@ -61,9 +60,7 @@ def get_bootinfo():
 		d.parent for d in frappe.get_all("DocField", {"fieldname": "lft"}, ["parent"])
 	]
 	add_home_page(bootinfo, doclist)
-	bootinfo.page_info = get_allowed_pages()
-	load_translations(bootinfo)
-	add_timezone_info(bootinfo)
+	bootinfo.lang = frappe.lang
 	load_conf_settings(bootinfo)
 	load_print(bootinfo, doclist)
 	doclist.extend(get_meta_bundle("Page"))
@@ -89,8 +86,6 @@ def get_bootinfo():
 	bootinfo.calendars = sorted(frappe.get_hooks("calendars"))
 	bootinfo.treeviews = frappe.get_hooks("treeviews") or []
 	bootinfo.lang_dict = get_lang_dict()
-	bootinfo.success_action = get_success_action()
-	bootinfo.update(get_email_accounts(user=frappe.session.user))
 	bootinfo.energy_points_enabled = is_energy_point_enabled()
 	bootinfo.website_tracking_enabled = is_tracking_enabled()
 	bootinfo.points = get_energy_points(frappe.session.user)
@@ -104,6 +99,96 @@ def get_bootinfo():
 	return bootinfo
 
 
+def get_boot_sections():
+	"""Parts of bootinfo that are cached and versioned separately, by a hash of their data.
+
+	The desk keeps them in `localStorage` and only fetches sections whose hash changed,
+	`lazy` sections only when they are first used. Sections are cached per user, per
+	language or for the whole site."""
+	return {
+		"desktop": frappe._dict(method=load_desktop_data, per_user=True),
+		"pages": frappe._dict(method=load_allowed_pages, per_user=True),
+		"user_info": frappe._dict(method=load_user_info),
+		"translations": frappe._dict(method=load_translations, per_lang=True),
+		"timezone": frappe._dict(method=add_timezone_info),
+		"print_style": frappe._dict(method=load_print_css),
+		"email_accounts": frappe._dict(method=load_email_accounts, per_user=True, lazy=True),
+		"letter_heads": frappe._dict(method=load_letter_heads, lazy=True),
+		"success_action": frappe._dict(method=load_success_action, lazy=True),
+	}
+
+
+def add_boot_sections(bootinfo, include_data=False):
+	"""Add hash, keys and laziness of every boot section to bootinfo, and their data if
+	the client does not load them separately (mobile app)"""
+	bootinfo.boot_sections = {}
+	for name, section in get_boot_section_data(get_boot_sections()).items():
+		bootinfo.boot_sections[name] = {
+			"hash": section["hash"],
+			"keys": section["keys"],
+			"lazy": section["lazy"],
+		}
+		if include_data:
+			bootinfo.update(section["data"])
+
+
+@frappe.whitelist()
+def get_sections(sections):
+	"""Hash and data of the given boot sections, for the desk"""
+	if frappe.session.user == "Guest":
+		frappe.throw(frappe._("Log in to access this page."), frappe.PermissionError)
+
+	boot_sections = get_boot_sections()
+	sections = frappe.parse_json(sections)
+	return get_boot_section_data(
+		{name: boot_sections[name] for name in sections if name in boot_sections}
+	)
+
+
+def get_boot_section_data(sections):
+	cache = frappe.cache()
+	use_cache = not frappe.conf.disable_session_cache
+	out = {}
+
+	frappe.set_user_lang(frappe.session.user)
+
+	for name, section in sections.items():
+		key = get_boot_section_cache_key(section)
+		data = cache.hget("boot_section:" + name, key) if use_cache else None
+		if not data:
+			data = build_boot_section(section)
+			cache.hset("boot_section:" + name, key, data)
+
+		out[name] = data
+
+	return out
+
+
+def get_boot_section_cache_key(section):
+	if section.per_user:
+		return frappe.session.user
+
+	if section.per_lang:
+		return frappe.lang
+
+	return "*"
+
+
+def build_boot_section(section):
+	bootinfo = frappe._dict()
+	section.method(bootinfo)
+	return {
+		"hash": hashlib.md5(frappe.as_json(bootinfo).encode()).hexdigest(),
+		"keys": list(bootinfo),
+		"lazy": cint(section.lazy),
+		"data": bootinfo,
+	}
+
+
+def load_letter_heads(bootinfo):
+	bootinfo.letter_heads = get_letter_heads()
+
+
 def get_letter_heads():
 	letter_heads = {}
 	for letter_head in frappe.get_all("Letter Head", fields=["name", "content", "footer"]):
@@ -131,6 +216,22 @@ def load_desktop_data(bootinfo):
 	bootinfo.dashboards = frappe.get_all("Dashboard")
 
 
+def load_allowed_pages(bootinfo):
+	bootinfo.page_info = get_allowed_pages()
+
+
+def load_user_info(bootinfo):
+	bootinfo.user_info = get_user_info()
+
+
+def load_email_accounts(bootinfo):
+	bootinfo.update(get_email_accounts(user=frappe.session.user))
+
+
+def load_success_action(bootinfo):
+	bootinfo.success_action = get_success_action()
+
+
 def get_allowed_pages(cache=False):
 	return get_user_pages_or_reports("Page", cache=cache)
 
@@ -261,7 +362,6 @@ def get_column(doctype):
 
 
 def load_translations(bootinfo):
-	bootinfo["lang"] = frappe.lang
 	bootinfo["__messages"] = get_messages_for_boot()
 
 
@@ -319,7 +419,7 @@ def add_home_page(bootinfo, docs):
 
 
 def add_timezone_info(bootinfo):
-	system = bootinfo.sysdefaults.get("time_zone")
+	system = frappe.defaults.get_defaults().get("time_zone")
 	import frappe.utils.momentjs
 
 	bootinfo.timezone_info = {"zones": {}, "rules": {}, "links": {}}
@@ -330,12 +430,14 @@ def load_print(bootinfo, doclist):
 	print_settings = frappe.db.get_singles_dict("Print Settings")
 	print_settings.doctype = ":Print Settings"
 	doclist.append(print_settings)
-	load_print_css(bootinfo, print_settings)
 
 
-def load_print_css(bootinfo, print_settings):
+def load_print_css(bootinfo, print_settings=None):
 	import frappe.www.printview
 
+	if not print_settings:
+		print_settings = frappe.db.get_singles_dict("Print Settings")
+
 	bootinfo.print_css = frappe.www.printview.get_print_style(
 		print_settings.print_style or "Redesign", for_legacy=True
 	)
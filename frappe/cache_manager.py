@@ -39,10 +39,19 @@ global_cache_keys = (
 	"sitemap_routes",
 	"db_tables",
 	"server_script_autocompletion_items",
+	"boot_section:user_info",
+	"boot_section:translations",
+	"boot_section:timezone",
+	"boot_section:print_style",
+	"boot_section:letter_heads",
+	"boot_section:success_action",
 ) + doctype_map_keys
 
 user_cache_keys = (
 	"bootinfo",
+	"boot_section:desktop",
+	"boot_section:pages",
+	"boot_section:email_accounts",
 	"user_recent",
 	"roles",
 	"user_doc",
@@ -57,6 +66,7 @@ user_cache_keys = (
 	"has_role:Page",
 	"has_role:Report",
 	"desk_sidebar_items",
+	"permission_predicates",
 )
 
 doctype_cache_keys = (
@@ -102,6 +112,7 @@ def clear_global_cache():
 	clear_doctype_cache()
 	clear_website_cache()
 	frappe.cache().delete_value(global_cache_keys)
+	frappe.cache().clear_process_cache()
 	frappe.setup_module_map()
 
 
@@ -120,7 +131,7 @@ def clear_doctype_cache(doctype=None):
 	if getattr(frappe.local, "meta_cache") and (doctype in frappe.local.meta_cache):
 		del frappe.local.meta_cache[doctype]
 
-	for key in ("is_table", "doctype_modules", "document_cache"):
+	for key in ("is_table", "doctype_modules", "document_cache", "permission_predicates"):
 		cache.delete_value(key)
 
 	frappe.local.document_cache = {}
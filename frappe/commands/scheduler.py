@@ -107,6 +107,7 @@ def scheduler(context, state, site=None):
 			update_site_config("pause_scheduler", 1)
 		elif state == "resume":
 			update_site_config("pause_scheduler", 0)
+			frappe.utils.scheduler.reset_site_due_time(site)
 		elif state == "disable":
 			frappe.connect()
 			frappe.utils.scheduler.disable_scheduler()
@@ -197,10 +198,16 @@ def start_scheduler():
 @click.command("worker")
 @click.option("--queue", type=str)
 @click.option("--quiet", is_flag=True, default=False, help="Hide Log Outputs")
-def start_worker(queue, quiet=False):
+@click.option(
+	"--persistent",
+	is_flag=True,
+	default=False,
+	help="Run jobs in the worker process, keeping caches and database connections warm",
+)
+def start_worker(queue, quiet=False, persistent=False):
 	from frappe.utils.background_jobs import start_worker
 
-	start_worker(queue, quiet=quiet)
+	start_worker(queue, quiet=quiet, persistent=persistent)
 
 
 @click.command("ready-for-migration")
@@ -116,6 +116,24 @@ def clear_website_cache(context):
 		raise SiteNotSpecifiedError
 
 
+@click.command("warm-website-cache")
+@click.option("--lang", help="Language of the rendered pages, defaults to the system language")
+@pass_context
+def warm_website_cache(context, lang=None):
+	"Render the pages of the sitemap into the website page cache"
+	from frappe.website.page_cache import warm_cache
+
+	for site in context.sites:
+		try:
+			frappe.init(site=site)
+			frappe.connect()
+			warm_cache(lang=lang)
+		finally:
+			frappe.destroy()
+	if not context.sites:
+		raise SiteNotSpecifiedError
+
+
 @click.command("destroy-all-sessions")
 @click.option("--reason")
 @pass_context
@@ -1023,6 +1041,7 @@ commands = [
 	build,
 	clear_cache,
 	clear_website_cache,
+	warm_website_cache,
 	jupyter,
 	console,
 	destroy_all_sessions,
@@ -4,7 +4,7 @@
 from __future__ import unicode_literals
 
 import csv
-import os
+import io
 import re
 
 from six import string_types
@@ -16,6 +16,12 @@ from frappe.core.doctype.access_log.access_log import make_access_log
 from frappe.core.doctype.data_import_legacy.importer import get_data_keys
 from frappe.utils import cint, cstr, format_datetime, format_duration, formatdate, parse_json
 from frappe.utils.csvutils import UnicodeWriter
+from frappe.utils.export_file import (
+	enqueue_export,
+	get_temp_file,
+	send_file,
+	should_export_in_background,
+)
 
 reflags = {"I": re.I, "L": re.L, "M": re.M, "U": re.U, "S": re.S, "X": re.X, "D": re.DEBUG}
 
@@ -54,6 +60,10 @@ def export_data(
 	exporter.build_response()
 
 
+def write_export(f, **kwargs):
+	DataExporter(**kwargs).write(f)
+
+
 class DataExporter:
 	def __init__(
 		self,
@@ -66,6 +76,18 @@ class DataExporter:
 		template=False,
 		filters=None,
 	):
+		# arguments to write the export again in a background job
+		self.export_args = dict(
+			doctype=doctype,
+			parent_doctype=parent_doctype,
+			all_doctypes=all_doctypes,
+			with_data=with_data,
+			select_columns=select_columns,
+			file_type=file_type,
+			template=template,
+			filters=filters,
+		)
+
 		self.doctype = doctype
 		self.parent_doctype = parent_doctype
 		self.all_doctypes = all_doctypes
@@ -104,8 +126,44 @@ class DataExporter:
 				self.child_doctypes.append(dict(doctype=df.options, parentfield=df.fieldname))
 
 	def build_response(self):
-		self.writer = UnicodeWriter()
+		filename = self.doctype + (".xlsx" if self.file_type == "Excel" else ".csv")
+
+		if self.with_data and should_export_in_background(self.get_row_count()):
+			enqueue_export(
+				"frappe.core.doctype.data_export.exporter.write_export", filename, **self.export_args
+			)
+			return
+
+		f = get_temp_file()
+		self.write(f)
+		if self.with_data and not self.row_count:
+			f.close()
+			frappe.respond_as_web_page(
+				_("No Data"), _("There is no data to be exported"), indicator_color="orange"
+			)
+			return
+
+		send_file(f, filename)
+
+	def write(self, f):
+		"""Write the export to a binary file, rows are written as they are fetched"""
+		from frappe.utils.xlsxutils import make_xlsx
+
+		if self.file_type != "Excel":
+			self.write_csv(f)
+			return
+
+		with get_temp_file() as csv_file:
+			self.write_csv(csv_file)
+			csv_file.seek(0)
+			reader = csv.reader(io.TextIOWrapper(csv_file, encoding="utf-8", newline=""))
+			make_xlsx(reader, "Data Import Template" if self.template else "Data Export", file=f)
+
+	def write_csv(self, f):
+		text_file = io.TextIOWrapper(f, encoding="utf-8", newline="")
+		self.writer = UnicodeWriter(file=text_file)
 		self.name_field = "parent" if self.parent_doctype != self.doctype else "name"
+		self.row_count = 0
 
 		if self.template:
 			self.add_main_header()
@@ -132,18 +190,16 @@ class DataExporter:
 
 		self.add_field_headings()
 		self.add_data()
-		if self.with_data and not self.data:
-			frappe.respond_as_web_page(
-				_("No Data"), _("There is no data to be exported"), indicator_color="orange"
-			)
 
-		if self.file_type == "Excel":
-			self.build_response_as_excel()
-		else:
-			# write out response as a type csv
-			frappe.response["result"] = cstr(self.writer.getvalue())
-			frappe.response["type"] = "csv"
-			frappe.response["doctype"] = self.doctype
+		text_file.flush()
+		# leave `f` open
+		text_file.detach()
+
+	def get_row_count(self):
+		frappe.permissions.can_export(self.parent_doctype, raise_exception=True)
+		return frappe.get_list(
+			self.doctype, fields=["count(*) as count"], filters=self.filters, as_list=True
+		)[0][0]
 
 	def add_main_header(self):
 		self.writer.writerow([_("Data Import Template")])
@@ -325,12 +381,18 @@ class DataExporter:
 		table_columns = frappe.db.get_table_columns(self.parent_doctype)
 		if "lft" in table_columns and "rgt" in table_columns:
 			order_by = "`tab{doctype}`.`lft` asc".format(doctype=self.parent_doctype)
-		# get permitted data only
-		self.data = frappe.get_list(
-			self.doctype, fields=["*"], filters=self.filters, limit_page_length=None, order_by=order_by
+		# get permitted data only, fetched as it is written
+		data = frappe.get_list(
+			self.doctype,
+			fields=["*"],
+			filters=self.filters,
+			limit_page_length=None,
+			order_by=order_by,
+			as_iterator=True,
 		)
 
-		for doc in self.data:
+		for doc in data:
+			self.row_count += 1
 			op = self.docs_to_export.get("op")
 			names = self.docs_to_export.get("name")
 
@@ -402,25 +464,6 @@ class DataExporter:
 
 				row[_column_start_end.start + i + 1] = value
 
-	def build_response_as_excel(self):
-		filename = frappe.generate_hash("", 10)
-		with open(filename, "wb") as f:
-			f.write(cstr(self.writer.getvalue()).encode("utf-8"))
-		f = open(filename)
-		reader = csv.reader(f)
-
-		from frappe.utils.xlsxutils import make_xlsx
-
-		xlsx_file = make_xlsx(reader, "Data Import Template" if self.template else "Data Export")
-
-		f.close()
-		os.remove(filename)
-
-		# write out response as a xlsx type
-		frappe.response["filename"] = self.doctype + ".xlsx"
-		frappe.response["filecontent"] = xlsx_file.getvalue()
-		frappe.response["type"] = "binary"
-
 	def _append_name_column(self, dt=None):
 		self.append_field_column(
 			frappe._dict(
@@ -2,6 +2,7 @@
 # Copyright (c) 2019, Frappe Technologies and Contributors
 # License: MIT. See LICENSE
 import unittest
+from unittest.mock import patch
 
 import frappe
 from frappe.core.doctype.data_export.exporter import DataExporter
@@ -87,11 +88,11 @@ class TestDataExporter(unittest.TestCase):
 		exp = DataExporter(doctype=self.doctype_name, file_type="CSV")
 		exp.build_response()
 
-		self.assertEqual(frappe.response["type"], "csv")
-		self.assertEqual(frappe.response["doctype"], self.doctype_name)
-		self.assertTrue(frappe.response["result"])
-		self.assertIn('Child Title 1",50', frappe.response["result"])
-		self.assertIn('Child Title 2",51', frappe.response["result"])
+		self.assertEqual(frappe.response["type"], "file")
+		self.assertEqual(frappe.response["filename"], self.doctype_name + ".csv")
+		content = frappe.response["file"].read().decode()
+		self.assertIn('Child Title 1",50', content)
+		self.assertIn('Child Title 2",51', content)
 
 	def test_export_type(self):
 		for type in ["csv", "Excel"]:
@@ -99,17 +100,30 @@ class TestDataExporter(unittest.TestCase):
 				exp = DataExporter(doctype=self.doctype_name, file_type=type)
 				exp.build_response()
 
-				self.assertEqual(frappe.response["doctype"], self.doctype_name)
-				self.assertTrue(frappe.response["result"])
+				self.assertEqual(frappe.response["type"], "file")
+				self.assertTrue(frappe.response["file"].read())
 
 				if type == "csv":
-					self.assertEqual(frappe.response["type"], "csv")
+					self.assertEqual(frappe.response["filename"], self.doctype_name + ".csv")
 				elif type == "Excel":
-					self.assertEqual(frappe.response["type"], "binary")
 					self.assertEqual(
 						frappe.response["filename"], self.doctype_name + ".xlsx"
 					)  # 'Test DocType for Export Tool.xlsx')
-					self.assertTrue(frappe.response["filecontent"])
+
+	def test_export_in_background(self):
+		with patch.dict(frappe.conf, {"export_background_threshold": -1}):
+			exp = DataExporter(doctype=self.doctype_name, file_type="CSV", with_data=1)
+			exp.build_response()
+
+		self.assertEqual(frappe.response["type"], "page")
+
+		# the export job runs right away in tests
+		file_doc = frappe.get_last_doc(
+			"File", filters={"file_name": ("like", self.doctype_name + "-%.csv")}
+		)
+		self.assertTrue(file_doc.is_private)
+		self.assertIn(b"Child Title 1", file_doc.get_content())
+		file_doc.delete()
 
 	def tearDown(self):
 		pass
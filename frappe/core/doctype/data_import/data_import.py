@@ -39,7 +39,9 @@ class DataImport(Document):
 		validate_google_sheets_url(self.google_sheets_url)
 
 	@frappe.whitelist()
-	def get_preview_from_template(self, import_file=None, google_sheets_url=None):
+	def get_preview_from_template(
+		self, import_file=None, google_sheets_url=None, start=0, page_length=None
+	):
 		if import_file:
 			self.import_file = import_file
 
@@ -50,7 +52,7 @@ class DataImport(Document):
 			return
 
 		i = self.get_importer()
-		return i.get_data_for_import_preview()
+		return i.get_data_for_import_preview(start, page_length)
 
 	def start_import(self):
 		from frappe.core.page.background_jobs.background_jobs import get_info
@@ -60,8 +62,9 @@ class DataImport(Document):
 			frappe.throw(_("Scheduler is inactive. Cannot import data."), title=_("Scheduler Inactive"))
 
 		enqueued_jobs = [d.get("job_name") for d in get_info()]
+		shard_jobs = [job for job in enqueued_jobs if job and job.startswith(self.name + "-shard-")]
 
-		if self.name not in enqueued_jobs:
+		if self.name not in enqueued_jobs and not shard_jobs:
 			enqueue(
 				start_import,
 				queue="default",
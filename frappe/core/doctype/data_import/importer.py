@@ -6,8 +6,13 @@ from __future__ import unicode_literals
 import io
 import json
 import os
+import random
+import time
 import timeit
-from datetime import date, datetime, time
+from collections import Counter
+from datetime import date, datetime
+from datetime import time as datetime_time
+from itertools import islice
 
 import frappe
 from frappe import _
@@ -15,17 +20,34 @@ from frappe.core.doctype.version.version import get_diff
 from frappe.model import no_value_fields
 from frappe.model import table_fields as table_fieldtypes
 from frappe.utils import cint, cstr, duration_to_seconds, flt, update_progress_bar
-from frappe.utils.csvutils import get_csv_content_from_google_sheets, read_csv_content
+from frappe.utils.csvutils import (
+	get_csv_content_from_google_sheets,
+	read_csv_content,
+	read_csv_file,
+)
 from frappe.utils.xlsxutils import (
 	read_xls_file_from_attached_file,
 	read_xlsx_file_from_attached_file,
+	read_xlsx_rows,
 )
 
 INVALID_VALUES = ("", None)
 MAX_ROWS_IN_PREVIEW = 10
+# rows read from the file at a time to validate the values of its columns
+VALIDATION_BATCH_SIZE = 1000
 INSERT = "Insert New Records"
 UPDATE = "Update Existing Records"
 
+# parallel imports: payloads are split in up to `data_import_parallel_shards` shards
+DEFAULT_SHARD_COUNT = 4
+MIN_SHARD_SIZE = 100
+SHARD_STATE_KEY = "data_import_shard_state|{0}"
+SHARD_LOG_KEY = "data_import_shard_log|{0}"
+SHARD_LOG_SAVE_INTERVAL = 100
+
+# attempts to import a payload that fails with a lock timeout or deadlock
+MAX_IMPORT_ATTEMPTS = 3
+
 
 class Importer:
 	def __init__(self, doctype, data_import=None, file_path=None, import_type=None, console=False):
@@ -48,10 +70,15 @@ class Importer:
 			self.import_type,
 		)
 
-	def get_data_for_import_preview(self):
-		return self.import_file.get_data_for_import_preview()
+	def get_data_for_import_preview(self, start=0, page_length=None):
+		return self.import_file.get_data_for_import_preview(start, page_length)
 
 	def before_import(self):
+		self.set_import_flags()
+		self.data_import.db_set("status", "Pending")
+		self.data_import.db_set("template_warnings", "")
+
+	def set_import_flags(self):
 		# set user lang for translations
 		frappe.cache().hdel("lang", frappe.session.user)
 		frappe.set_user_lang(frappe.session.user)
@@ -60,14 +87,11 @@ class Importer:
 		frappe.flags.in_import = True
 		frappe.flags.mute_emails = self.data_import.mute_emails
 
-		self.data_import.db_set("status", "Pending")
-		self.data_import.db_set("template_warnings", "")
-
 	def import_data(self):
 		self.before_import()
 
-		# parse docs from rows
-		payloads = self.import_file.get_payloads_for_import()
+		# parse docs from rows to validate them, they are parsed again while importing
+		total_payload_count = self.import_file.validate_payloads()
 
 		# dont import if there are non-ignorable warnings
 		warnings = self.import_file.get_warnings()
@@ -80,91 +104,113 @@ class Importer:
 				self.data_import.db_set("template_warnings", json.dumps(warnings))
 			return
 
-		# setup import log
+		import_log = self.get_import_log()
+		shards = self.get_shards(total_payload_count)
+		if len(shards) > 1:
+			return self.enqueue_shards(shards, total_payload_count, import_log)
+
+		# get successfully imported rows
+		imported_rows = set(get_imported_rows(import_log))
+
+		# start import
+		for current_index, rows in enumerate(self.import_file.iter_payload_rows(), 1):
+			row_indexes = [row.row_number for row in rows]
+
+			if imported_rows.intersection(row_indexes):
+				print("Skipping imported rows", row_indexes)
+				if total_payload_count > 5:
+					frappe.publish_realtime(
+						"data_import_progress",
+						{
+							"current": current_index,
+							"total": total_payload_count,
+							"skipping": True,
+							"data_import": self.data_import.name,
+						},
+						user=frappe.session.user,
+					)
+				continue
+
+			start = timeit.default_timer()
+			log = self.import_payload(self.import_file.get_payload(rows))
+			import_log.append(log)
+			if not log.success:
+				continue
+
+			processing_time = timeit.default_timer() - start
+			eta = self.get_eta(current_index, total_payload_count, processing_time)
+
+			if self.console:
+				update_progress_bar(
+					"Importing {0} records".format(total_payload_count),
+					current_index,
+					total_payload_count,
+				)
+			elif total_payload_count > 5:
+				frappe.publish_realtime(
+					"data_import_progress",
+					{
+						"current": current_index,
+						"total": total_payload_count,
+						"docname": log.docname,
+						"data_import": self.data_import.name,
+						"success": True,
+						"row_indexes": row_indexes,
+						"eta": eta,
+					},
+					user=frappe.session.user,
+				)
+
+		self.finish_import(import_log, total_payload_count)
+
+		return import_log
+
+	def import_payload(self, payload):
+		"""Import and commit the doc of one payload, returns its import log entry"""
+		row_indexes = [row.row_number for row in payload.rows]
+
+		for attempt in range(1, MAX_IMPORT_ATTEMPTS + 1):
+			try:
+				doc = self.process_doc(payload.doc)
+				# commit after every successful import
+				frappe.db.commit()
+				return frappe._dict(success=True, docname=doc.name, row_indexes=row_indexes)
+
+			except (frappe.QueryDeadlockError, frappe.QueryTimeoutError):
+				# parallel imports can lock the same rows, e.g. of a naming series
+				if attempt == MAX_IMPORT_ATTEMPTS:
+					return self.get_failure_log(row_indexes)
+
+				frappe.clear_messages()
+				frappe.db.rollback()
+				time.sleep(random.uniform(0, attempt))
+
+			except Exception:
+				return self.get_failure_log(row_indexes)
+
+	def get_failure_log(self, row_indexes):
+		log = frappe._dict(
+			success=False,
+			exception=frappe.get_traceback(),
+			messages=frappe.local.message_log,
+			row_indexes=row_indexes,
+		)
+		frappe.clear_messages()
+		# rollback if exception
+		frappe.db.rollback()
+		return log
+
+	def get_import_log(self):
+		"""Entries of rows that were imported successfully before"""
 		if self.data_import.import_log:
 			import_log = frappe.parse_json(self.data_import.import_log)
 		else:
 			import_log = []
 
 		# remove previous failures from import log
-		import_log = [log for log in import_log if log.get("success")]
-
-		# get successfully imported rows
-		imported_rows = []
-		for log in import_log:
-			log = frappe._dict(log)
-			if log.success:
-				imported_rows += log.row_indexes
-
-		# start import
-		total_payload_count = len(payloads)
-		batch_size = frappe.conf.data_import_batch_size or 1000
-
-		for batch_index, batched_payloads in enumerate(frappe.utils.create_batch(payloads, batch_size)):
-			for i, payload in enumerate(batched_payloads):
-				doc = payload.doc
-				row_indexes = [row.row_number for row in payload.rows]
-				current_index = (i + 1) + (batch_index * batch_size)
-
-				if set(row_indexes).intersection(set(imported_rows)):
-					print("Skipping imported rows", row_indexes)
-					if total_payload_count > 5:
-						frappe.publish_realtime(
-							"data_import_progress",
-							{
-								"current": current_index,
-								"total": total_payload_count,
-								"skipping": True,
-								"data_import": self.data_import.name,
-							},
-							user=frappe.session.user,
-						)
-					continue
-
-				try:
-					start = timeit.default_timer()
-					doc = self.process_doc(doc)
-					processing_time = timeit.default_timer() - start
-					eta = self.get_eta(current_index, total_payload_count, processing_time)
-
-					if self.console:
-						update_progress_bar(
-							"Importing {0} records".format(total_payload_count),
-							current_index,
-							total_payload_count,
-						)
-					elif total_payload_count > 5:
-						frappe.publish_realtime(
-							"data_import_progress",
-							{
-								"current": current_index,
-								"total": total_payload_count,
-								"docname": doc.name,
-								"data_import": self.data_import.name,
-								"success": True,
-								"row_indexes": row_indexes,
-								"eta": eta,
-							},
-							user=frappe.session.user,
-						)
-
-					import_log.append(frappe._dict(success=True, docname=doc.name, row_indexes=row_indexes))
-					# commit after every successful import
-					frappe.db.commit()
-
-				except Exception:
-					import_log.append(
-						frappe._dict(
-							success=False,
-							exception=frappe.get_traceback(),
-							messages=frappe.local.message_log,
-							row_indexes=row_indexes,
-						)
-					)
-					frappe.clear_messages()
-					# rollback if exception
-					frappe.db.rollback()
+		return [frappe._dict(log) for log in import_log if log.get("success")]
 
+	def finish_import(self, import_log, total_payload_count):
 		# set status
 		failures = [log for log in import_log if not log.get("success")]
 		if len(failures) == total_payload_count:
@@ -182,8 +228,126 @@ class Importer:
 
 		self.after_import()
 
+	def get_shards(self, total_payload_count):
+		"""`[(start, stop), ...]` ranges of payloads imported by separate jobs in parallel mode"""
+		if self.console or not self.data_import.import_in_parallel:
+			return [(0, total_payload_count)]
+
+		shard_count = min(
+			cint(frappe.conf.data_import_parallel_shards) or DEFAULT_SHARD_COUNT,
+			total_payload_count // MIN_SHARD_SIZE,
+		)
+		if shard_count < 2:
+			return [(0, total_payload_count)]
+
+		shard_size = -(-total_payload_count // shard_count)
+		return [
+			(start, min(start + shard_size, total_payload_count))
+			for start in range(0, total_payload_count, shard_size)
+		]
+
+	def enqueue_shards(self, shards, total_payload_count, import_log):
+		"""Import payload ranges in parallel background jobs. The job that finishes last
+		merges the logs of all shards into `import_log` and sets the status."""
+		from frappe.utils.background_jobs import enqueue
+
+		name = self.data_import.name
+
+		# logs of shards of an interrupted parallel import
+		for shard_log in pop_shard_logs(name):
+			import_log += [log for log in shard_log if log.success]
+
+		if import_log:
+			self.data_import.db_set("import_log", json.dumps(import_log))
+
+		cache = frappe.cache()
+		state_key = cache.make_key(SHARD_STATE_KEY.format(name))
+		cache.delete(state_key)
+		cache.hmset(
+			state_key,
+			{
+				"shards": len(shards),
+				"total": total_payload_count,
+				"current": 0,
+				"finished": 0,
+				"started": time.time(),
+			},
+		)
+		frappe.db.commit()
+
+		for shard, (start, stop) in enumerate(shards):
+			enqueue(
+				"frappe.core.doctype.data_import.importer.import_shard",
+				queue="default",
+				timeout=6000,
+				event="data_import",
+				job_name=get_shard_job_name(name, shard),
+				data_import=name,
+				shard=shard,
+				start=start,
+				stop=stop,
+				now=frappe.conf.developer_mode or frappe.flags.in_test,
+			)
+
 		return import_log
 
+	def import_shard(self, shard, start, stop):
+		self.set_import_flags()
+
+		imported_rows = set(get_imported_rows(self.get_import_log()))
+		name = self.data_import.name
+
+		cache = frappe.cache()
+		state_key = cache.make_key(SHARD_STATE_KEY.format(name))
+		total_payload_count, shard_count, started = cache.hmget(state_key, "total", "shards", "started")
+		total_payload_count = cint(total_payload_count)
+		started = float(started or time.time())
+
+		shard_log = []
+		try:
+			for rows in islice(self.import_file.iter_payload_rows(), start, stop):
+				row_indexes = [row.row_number for row in rows]
+				current = cache.hincrby(state_key, "current", 1)
+				if imported_rows.intersection(row_indexes):
+					continue
+
+				log = self.import_payload(self.import_file.get_payload(rows))
+				shard_log.append(log)
+				if len(shard_log) % SHARD_LOG_SAVE_INTERVAL == 0:
+					save_shard_log(name, shard, shard_log)
+
+				if log.success:
+					eta = (time.time() - started) / current * (total_payload_count - current)
+					frappe.publish_realtime(
+						"data_import_progress",
+						{
+							"current": current,
+							"total": total_payload_count,
+							"docname": log.docname,
+							"data_import": name,
+							"success": True,
+							"row_indexes": row_indexes,
+							"eta": eta,
+						},
+						user=frappe.session.user,
+					)
+		finally:
+			save_shard_log(name, shard, shard_log)
+			self.after_import()
+
+			if cache.hincrby(state_key, "finished", 1) == cint(shard_count):
+				cache.delete(state_key)
+				self.merge_shards(total_payload_count)
+
+	def merge_shards(self, total_payload_count):
+		import_log = self.get_import_log()
+		for shard_log in pop_shard_logs(self.data_import.name):
+			import_log += shard_log
+
+		self.finish_import(import_log, total_payload_count)
+		frappe.db.commit()
+		frappe.publish_realtime("data_import_refresh", {"data_import": self.data_import.name})
+
 	def after_import(self):
 		frappe.flags.in_import = False
 		frappe.flags.mute_emails = False
@@ -256,12 +420,11 @@ class Importer:
 			row_indexes.extend(f.get("row_indexes", []))
 
 		# de duplicate
-		row_indexes = list(set(row_indexes))
-		row_indexes.sort()
+		row_indexes = set(row_indexes)
 
 		header_row = [col.header_title for col in self.import_file.columns]
 		rows = [header_row]
-		rows += [row.data for row in self.import_file.data if row.row_number in row_indexes]
+		rows += [row.data for row in self.import_file.iter_data_rows() if row.row_number in row_indexes]
 
 		build_csv_response(rows, _(self.doctype))
 
@@ -306,6 +469,38 @@ class Importer:
 			print(w.get("message"))
 
 
+def import_shard(data_import, shard, start, stop):
+	"""Import a range of payloads of a parallel Data Import, runs in a background job"""
+	data_import = frappe.get_doc("Data Import", data_import)
+	Importer(data_import.reference_doctype, data_import=data_import).import_shard(shard, start, stop)
+
+
+def get_shard_job_name(data_import, shard):
+	return "{0}-shard-{1}".format(data_import, shard)
+
+
+def save_shard_log(data_import, shard, shard_log):
+	frappe.cache().hset(SHARD_LOG_KEY.format(data_import), shard, shard_log)
+
+
+def pop_shard_logs(data_import):
+	"""Logs of all shards of a parallel import, in the order of their payloads"""
+	key = SHARD_LOG_KEY.format(data_import)
+	shard_logs = frappe.cache().hgetall(key)
+	frappe.cache().delete_value(key)
+	return [shard_logs[shard] for shard in sorted(shard_logs, key=int)]
+
+
+def get_imported_rows(import_log):
+	imported_rows = []
+	for log in import_log:
+		log = frappe._dict(log)
+		if log.success:
+			imported_rows += log.row_indexes
+
+	return imported_rows
+
+
 class ImportFile:
 	def __init__(self, doctype, file, template_options=None, import_type=None):
 		self.doctype = doctype
@@ -326,62 +521,103 @@ class ImportFile:
 		if not self.file_doc and not self.file_path and not self.google_sheets_url:
 			frappe.throw(_("Invalid template file for import"))
 
-		self.raw_data = self.get_data_from_template_file()
+		self._raw_data = None
 		self.parse_data_from_template()
 
+	@property
+	def raw_data(self):
+		"""All rows of the file, read in memory on first access. Until then, the file is read
+		one row at a time whenever its rows are needed."""
+		if self._raw_data is None:
+			self._raw_data = list(self.get_data_from_template_file())
+		return self._raw_data
+
+	@property
+	def data(self):
+		return list(self.iter_data_rows())
+
 	def get_data_from_template_file(self):
-		content = None
-		extension = None
+		"""Iterator over the rows of the file, as lists of values"""
+		if self._raw_data is not None:
+			return iter(self._raw_data)
+
+		file_path = content = extension = None
 
 		if self.file_doc:
-			parts = self.file_doc.get_extension()
-			extension = parts[1]
-			content = self.file_doc.get_content()
-			extension = extension.lstrip(".")
+			extension = self.file_doc.get_extension()[1]
+			if self.file_doc.is_remote_file:
+				content = self.file_doc.get_content()
+			else:
+				file_path = self.file_doc.get_full_path()
 
 		elif self.file_path:
-			content, extension = self.read_file(self.file_path)
+			file_path = self.file_path
+			extension = os.path.splitext(file_path)[1]
 
 		elif self.google_sheets_url:
 			content = get_csv_content_from_google_sheets(self.google_sheets_url)
 			extension = "csv"
 
+		extension = (extension or "csv").lstrip(".")
+
+		if file_path:
+			return self.read_file(file_path, extension)
+
 		if not content:
 			frappe.throw(_("Invalid or corrupted content for import"))
 
-		if not extension:
-			extension = "csv"
-
-		if content:
-			return self.read_content(content, extension)
+		return iter(self.read_content(content, extension))
 
 	def parse_data_from_template(self):
-		header = None
-		data = []
+		"""Set up the header and validate the values of its columns in one pass over the file,
+		rows are read in batches and not kept in memory"""
+		self.header = None
+		self.row_count = 0
+		self.row_warnings = []
 
-		for i, row in enumerate(self.raw_data):
-			if all(v in INVALID_VALUES for v in row):
-				# empty row
-				continue
+		rows = self.iter_rows()
+		for i, row in rows:
+			self.header = Header(i, row, self.doctype, column_to_field_map=self.column_to_field_map)
+			break
 
-			if not header:
-				header = Header(i, row, self.doctype, self.raw_data[1:], self.column_to_field_map)
-			else:
-				row_obj = Row(i, row, self.doctype, header, self.import_type)
-				data.append(row_obj)
+		if self.header:
+			for batch in iter_batches(rows, VALIDATION_BATCH_SIZE):
+				for i, row in batch:
+					self.row_warnings += Row(i, row, self.doctype, self.header, self.import_type).warnings
 
-		self.header = header
-		self.columns = self.header.columns
-		self.data = data
+				self.header.add_values([row for i, row in batch])
+				self.row_count += len(batch)
+
+			self.header.validate_values()
 
-		if len(data) < 1:
+		if self.row_count < 1:
 			frappe.throw(
 				_("Import template should contain a Header and atleast one row."),
 				title=_("Template Error"),
 			)
 
-	def get_data_for_import_preview(self):
+		self.columns = self.header.columns
+
+	def iter_rows(self):
+		"""`(index, row)` of the rows of the file that are not empty"""
+		for i, row in enumerate(self.get_data_from_template_file()):
+			if all(v in INVALID_VALUES for v in row):
+				# empty row
+				continue
+
+			yield i, row
+
+	def iter_data_rows(self):
+		"""`Row` objects of the rows after the header"""
+		rows = self.iter_rows()
+		# skip the header
+		next(rows, None)
+		for i, row in rows:
+			yield Row(i, row, self.doctype, self.header, self.import_type)
+
+	def get_data_for_import_preview(self, start=0, page_length=MAX_ROWS_IN_PREVIEW):
 		"""Adds a serial number column as the first column"""
+		start, page_length = cint(start), cint(page_length) or MAX_ROWS_IN_PREVIEW
 
 		columns = [frappe._dict({"header_title": "Sr. No", "skip_import": True})]
 		columns += [col.as_dict() for col in self.columns]
@@ -399,7 +635,10 @@ class ImportFile:
 					"read_only": col.df.read_only,
 				}
 
-		data = [[row.row_number] + row.as_list() for row in self.data]
+		data = [
+			[row.row_number] + row.as_list()
+			for row in islice(self.iter_data_rows(), start, start + page_length)
+		]
 
 		warnings = self.get_warnings()
 
@@ -407,51 +646,56 @@ class ImportFile:
 		out.data = data
 		out.columns = columns
 		out.warnings = warnings
-		total_number_of_rows = len(out.data)
-		if total_number_of_rows > MAX_ROWS_IN_PREVIEW:
-			out.data = out.data[:MAX_ROWS_IN_PREVIEW]
+		out.start = start
+		total_number_of_rows = self.row_count
+		if total_number_of_rows > page_length:
 			out.max_rows_exceeded = True
-			out.max_rows_in_preview = MAX_ROWS_IN_PREVIEW
+			out.max_rows_in_preview = page_length
 			out.total_number_of_rows = total_number_of_rows
 		return out
 
 	def get_payloads_for_import(self):
-		payloads = []
-		# make a copy
-		data = list(self.data)
-		while data:
-			doc, rows, data = self.parse_next_row_for_import(data)
-			payloads.append(frappe._dict(doc=doc, rows=rows))
-		return payloads
-
-	def parse_next_row_for_import(self, data):
+		return list(self.iter_payloads())
+
+	def iter_payloads(self):
+		"""Payloads of the docs in the file, parsed while the file is read"""
+		self.row_warnings = []
+		for rows in self.iter_payload_rows():
+			yield self.get_payload(rows)
+
+	def validate_payloads(self):
+		"""Parse every doc once to collect the warnings of its rows, returns the number of docs"""
+		return sum(1 for payload in self.iter_payloads())
+
+	def iter_payload_rows(self):
 		"""
-		Parses rows that make up a doc. A doc maybe built from a single row or multiple rows.
-		Returns the doc, rows, and data without the rows.
+		Groups of rows that make up a doc. A doc maybe built from a single row or multiple rows.
+		Subsequent rows that have blank values in parent columns are considered as child rows.
 		"""
-		doctypes = self.header.doctypes
+		parent_column_indexes = self.header.get_column_indexes(self.doctype)
+		# if there are child doctypes, find the subsequent rows
+		has_child_rows = len(self.header.doctypes) > 1
+
+		rows = []
+		for row in self.iter_data_rows():
+			row_values = row.get_values(parent_column_indexes)
+			# if the row is blank, it's a child row doc
+			if rows and has_child_rows and all(v in INVALID_VALUES for v in row_values):
+				rows.append(row)
+				continue
 
-		# first row is included by default
-		first_row = data[0]
-		rows = [first_row]
+			# if we encounter a row which has values in parent columns,
+			# then it is the next doc
+			if rows:
+				yield rows
+			rows = [row]
 
-		# if there are child doctypes, find the subsequent rows
-		if len(doctypes) > 1:
-			# subsequent rows that have blank values in parent columns
-			# are considered as child rows
-			parent_column_indexes = self.header.get_column_indexes(self.doctype)
-			parent_row_values = first_row.get_values(parent_column_indexes)
-
-			data_without_first_row = data[1:]
-			for row in data_without_first_row:
-				row_values = row.get_values(parent_column_indexes)
-				# if the row is blank, it's a child row doc
-				if all([v in INVALID_VALUES for v in row_values]):
-					rows.append(row)
-					continue
-				# if we encounter a row which has values in parent columns,
-				# then it is the next doc
-				break
+		if rows:
+			yield rows
+
+	def get_payload(self, rows):
+		"""Parses the doc of a group of rows from `iter_payload_rows`"""
+		doctypes = self.header.doctypes
 
 		parent_doc = None
 		for row in rows:
@@ -466,9 +710,9 @@ class ImportFile:
 					parent_doc[table_df.fieldname] = parent_doc.get(table_df.fieldname, [])
 					parent_doc[table_df.fieldname].append(child_doc)
 
-		doc = parent_doc
+			self.row_warnings += row.warnings
 
-		return doc, rows, data[len(rows) :]
+		return frappe._dict(doc=parent_doc, rows=rows)
 
 	def get_warnings(self):
 		warnings = []
@@ -480,30 +724,29 @@ class ImportFile:
 		for col in self.header.columns:
 			warnings += col.warnings
 
-		# Row warnings
-		for row in self.data:
-			warnings += row.warnings
+		# Row warnings of the last pass over the rows
+		warnings += self.row_warnings
 
 		return warnings
 
 	######
 
-	def read_file(self, file_path: str):
-		extn = os.path.splitext(file_path)[1][1:]
-
-		file_content = None
-
-		file_name = frappe.db.get_value("File", {"file_url": file_path})
-		if file_name:
-			file = frappe.get_doc("File", file_name)
-			file_content = file.get_content()
+	def read_file(self, file_path: str, extension: str):
+		"""Iterator over the rows of a file, read one row at a time except for .xls files"""
+		self.validate_extension(extension)
+		if not os.path.getsize(file_path):
+			frappe.throw(_("Invalid or corrupted content for import"))
 
-		return file_content, extn
+		if extension == "csv":
+			return read_csv_file(file_path)
+		elif extension == "xlsx":
+			return read_xlsx_rows(file_path)
+		elif extension == "xls":
+			with open(file_path, "rb") as f:
+				return iter(read_xls_file_from_attached_file(f.read()))
 
 	def read_content(self, content, extension):
-		error_title = _("Template Error")
-		if extension not in ("csv", "xlsx", "xls"):
-			frappe.throw(_("Import template should be of type .csv, .xlsx or .xls"), title=error_title)
+		self.validate_extension(extension)
 
 		if extension == "csv":
 			data = read_csv_content(content)
@@ -514,6 +757,12 @@ class ImportFile:
 
 		return data
 
+	def validate_extension(self, extension):
+		if extension not in ("csv", "xlsx", "xls"):
+			frappe.throw(
+				_("Import template should be of type .csv, .xlsx or .xls"), title=_("Template Error")
+			)
+
 
 class Row:
 	link_values_exist_map = {}
@@ -716,7 +965,7 @@ class Row:
 
 
 class Header(Row):
-	def __init__(self, index, row, doctype, raw_data, column_to_field_map=None):
+	def __init__(self, index, row, doctype, raw_data=None, column_to_field_map=None):
 		self.index = index
 		self.row_number = index + 1
 		self.data = row
@@ -727,12 +976,15 @@ class Header(Row):
 		self.columns = []
 
 		for j, header in enumerate(row):
-			column_values = [get_item_at_index(r, j) for r in raw_data]
 			map_to_field = column_to_field_map.get(str(j))
-			column = Column(j, header, self.doctype, column_values, map_to_field, self.seen)
+			column = Column(j, header, self.doctype, None, map_to_field, self.seen)
 			self.seen.append(header)
 			self.columns.append(column)
 
+		if raw_data is not None:
+			self.add_values(raw_data)
+			self.validate_values()
+
 		doctypes = []
 		for col in self.columns:
 			if not col.df:
@@ -759,19 +1011,27 @@ class Header(Row):
 	def get_columns(self, indexes):
 		return [self.columns[i] for i in indexes]
 
+	def add_values(self, rows):
+		"""Pass a batch of data rows to the columns, call `validate_values` after the last one"""
+		for col in self.columns:
+			col.add_values([get_item_at_index(r, col.index) for r in rows])
+
+	def validate_values(self):
+		for col in self.columns:
+			col.validate_values()
+
 
 class Column:
 	seen = []
 	fields_column_map = {}
 
-	def __init__(self, index, header, doctype, column_values, map_to_field=None, seen=None):
+	def __init__(self, index, header, doctype, column_values=None, map_to_field=None, seen=None):
 		if seen is None:
 			seen = []
 		self.index = index
 		self.column_number = index + 1
 		self.doctype = doctype
 		self.header_title = header
-		self.column_values = column_values
 		self.map_to_field = map_to_field
 		self.seen = seen
 
@@ -780,9 +1040,18 @@ class Column:
 		self.skip_import = None
 		self.warnings = []
 
+		# summary of the values of the column, collected by `add_values`
+		self.has_values = False
+		self.missing_values = set()
+		self.invalid_values = set()
+		self.date_formats = Counter()
+
 		self.meta = frappe.get_meta(doctype)
 		self.parse()
-		self.validate_values()
+
+		if column_values is not None:
+			self.add_values(column_values)
+			self.validate_values()
 
 	def parse(self):
 		header_title = self.header_title
@@ -853,29 +1122,52 @@ class Column:
 		self.df = df
 		self.skip_import = skip_import
 
-	def guess_date_format_for_column(self):
-		"""Guesses date format for a column by parsing all the values in the column,
-		getting the date format and then returning the one which has the maximum frequency
-		"""
+	def add_values(self, column_values):
+		"""Collect what `validate_values` checks from a batch of values of the column"""
+		if not self.df or self.skip_import:
+			return
 
-		def guess_date_format(d):
-			if isinstance(d, (datetime, date, time)):
-				if self.df.fieldtype == "Date":
-					return "%Y-%m-%d"
-				if self.df.fieldtype == "Datetime":
-					return "%Y-%m-%d %H:%M:%S"
-				if self.df.fieldtype == "Time":
-					return "%H:%M:%S"
-			if isinstance(d, str):
-				return frappe.utils.guess_date_format(d)
+		values = [v for v in column_values if v]
+		if not values:
+			return
 
-		date_formats = [guess_date_format(d) for d in self.column_values]
-		date_formats = [d for d in date_formats if d]
-		if not date_formats:
+		self.has_values = True
+
+		if self.df.fieldtype == "Link":
+			# find all values that dont exist
+			values = {cstr(v) for v in values}
+			exists = {
+				cstr(d.name) for d in frappe.get_all(self.df.options, filters={"name": ("in", list(values))})
+			}
+			self.missing_values.update(values - exists)
+		elif self.df.fieldtype in ("Date", "Time", "Datetime"):
+			date_formats = [self.guess_date_format(d) for d in values]
+			self.date_formats.update(d for d in date_formats if d)
+		elif self.df.fieldtype == "Select":
+			options = get_select_options(self.df)
+			if options:
+				self.invalid_values.update({cstr(v) for v in values} - set(options))
+
+	def guess_date_format(self, d):
+		if isinstance(d, (datetime, date, datetime_time)):
+			if self.df.fieldtype == "Date":
+				return "%Y-%m-%d"
+			if self.df.fieldtype == "Datetime":
+				return "%Y-%m-%d %H:%M:%S"
+			if self.df.fieldtype == "Time":
+				return "%H:%M:%S"
+		if isinstance(d, str):
+			return frappe.utils.guess_date_format(d)
+
+	def guess_date_format_for_column(self):
+		"""Guesses date format for a column from the date formats of all the values in the column,
+		returning the one which has the maximum frequency
+		"""
+		if not self.date_formats:
 			return
 
-		unique_date_formats = set(date_formats)
-		max_occurred_date_format = max(unique_date_formats, key=date_formats.count)
+		unique_date_formats = set(self.date_formats)
+		max_occurred_date_format = self.date_formats.most_common(1)[0][0]
 
 		if len(unique_date_formats) > 1:
 			# fmt: off
@@ -903,18 +1195,12 @@ class Column:
 		if self.skip_import:
 			return
 
-		if not any(self.column_values):
+		if not self.has_values:
 			return
 
 		if self.df.fieldtype == "Link":
-			# find all values that dont exist
-			values = list({cstr(v) for v in self.column_values if v})
-			exists = [
-				cstr(d.name) for d in frappe.get_all(self.df.options, filters={"name": ("in", values)})
-			]
-			not_exists = list(set(values) - set(exists))
-			if not_exists:
-				missing_values = ", ".join(not_exists)
+			if self.missing_values:
+				missing_values = ", ".join(self.missing_values)
 				message = _("The following values do not exist for {0}: {1}")
 				self.warnings.append(
 					{
@@ -946,19 +1232,16 @@ class Column:
 				)
 		elif self.df.fieldtype == "Select":
 			options = get_select_options(self.df)
-			if options:
-				values = {cstr(v) for v in self.column_values if v}
-				invalid = values - set(options)
-				if invalid:
-					valid_values = ", ".join(frappe.bold(o) for o in options)
-					invalid_values = ", ".join(frappe.bold(i) for i in invalid)
-					message = _("The following values are invalid: {0}. Values must be one of {1}")
-					self.warnings.append(
-						{
-							"col": self.column_number,
-							"message": message.format(invalid_values, valid_values),
-						}
-					)
+			if options and self.invalid_values:
+				valid_values = ", ".join(frappe.bold(o) for o in options)
+				invalid_values = ", ".join(frappe.bold(i) for i in self.invalid_values)
+				message = _("The following values are invalid: {0}. Values must be one of {1}")
+				self.warnings.append(
+					{
+						"col": self.column_number,
+						"message": message.format(invalid_values, valid_values),
+					}
+				)
 
 	def as_dict(self):
 		d = frappe._dict()
@@ -1147,6 +1430,16 @@ def get_autoname_field(doctype):
 		return meta.get_field(fieldname)
 
 
+def iter_batches(iterable, size):
+	"""Lists of up to `size` items of any iterable, without reading it all at once"""
+	iterator = iter(iterable)
+	while True:
+		batch = list(islice(iterator, size))
+		if not batch:
+			return
+		yield batch
+
+
 def get_item_at_index(_list, i, default=None):
 	try:
 		a = _list[i]
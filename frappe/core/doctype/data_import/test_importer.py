@@ -4,6 +4,7 @@
 from __future__ import unicode_literals
 
 import unittest
+from unittest.mock import patch
 
 import frappe
 from frappe.core.doctype.data_import.importer import Importer
@@ -61,6 +62,10 @@ class TestImporter(unittest.TestCase):
 		self.assertEqual(len(preview.data), 4)
 		self.assertEqual(len(preview.columns), 16)
 
+		page = data_import.get_preview_from_template(start=1, page_length=2)
+		self.assertEqual(page.data, preview.data[1:3])
+		self.assertEqual(page.total_number_of_rows, 4)
+
 	# ignored on postgres because myisam doesn't exist on pg
 	@run_only_if(db_type_is.MARIADB)
 	def test_data_import_without_mandatory_values(self):
@@ -116,6 +121,24 @@ class TestImporter(unittest.TestCase):
 		self.assertEqual(updated_doc.table_field_1[0].child_description, "child description")
 		self.assertEqual(updated_doc.table_field_1_again[0].child_title, "child title again")
 
+	def test_data_import_in_parallel(self):
+		for name in ("Test", "Test 2", "Test 3"):
+			frappe.delete_doc_if_exists(doctype_name, name)
+
+		import_file = get_import_file("sample_import_file")
+		data_import = self.get_importer(doctype_name, import_file)
+		data_import.db_set("import_in_parallel", 1)
+
+		# one shard per row
+		with patch("frappe.core.doctype.data_import.importer.MIN_SHARD_SIZE", 1):
+			data_import.start_import()
+
+		data_import.reload()
+		import_log = frappe.parse_json(data_import.import_log)
+		self.assertEqual(data_import.status, "Success")
+		self.assertEqual(sorted(log.docname for log in import_log), ["Test", "Test 2", "Test 3"])
+		self.assertEqual(frappe.cache().hgetall("data_import_shard_log|" + data_import.name), {})
+
 	def get_importer(self, doctype, import_file, update=False):
 		data_import = frappe.new_doc("Data Import")
 		data_import.import_type = "Insert New Records" if not update else "Update Existing Records"
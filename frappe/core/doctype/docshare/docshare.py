@@ -55,6 +55,16 @@ class DocShare(Document):
 				)
 			)
 
+	def on_update(self):
+		self.clear_permission_predicates()
+
+	def clear_permission_predicates(self):
+		# shared names are part of the cached list conditions of the user (or everyone)
+		if self.everyone:
+			frappe.cache().delete_value("permission_predicates")
+		else:
+			frappe.cache().hdel("permission_predicates", self.user)
+
 	def after_insert(self):
 		doc = self.get_doc()
 		owner = get_fullname(self.owner)
@@ -70,6 +80,8 @@ class DocShare(Document):
 		if not self.flags.ignore_share_permission:
 			self.check_share_permission()
 
+		self.clear_permission_predicates()
+
 		self.get_doc().add_comment(
 			"Unshared",
 			_("{0} un-shared this document with {1}").format(
@@ -11,7 +11,20 @@ from croniter import croniter
 import frappe
 from frappe.model.document import Document
 from frappe.utils import get_datetime, now_datetime
-from frappe.utils.background_jobs import enqueue, get_jobs
+from frappe.utils.background_jobs import enqueue, is_job_queued
+
+CRON_MAP = {
+	"Yearly": "0 0 1 1 *",
+	"Annual": "0 0 1 1 *",
+	"Monthly": "0 0 1 * *",
+	"Monthly Long": "0 0 1 * *",
+	"Weekly": "0 0 * * 0",
+	"Weekly Long": "0 0 * * 0",
+	"Daily": "0 0 * * *",
+	"Daily Long": "0 0 * * *",
+	"Hourly": "0 * * * *",
+	"Hourly Long": "0 * * * *",
+}
 
 
 class ScheduledJobType(Document):
@@ -23,6 +36,13 @@ class ScheduledJobType(Document):
 			# force logging for all events other than continuous ones (ALL)
 			self.create_log = 1
 
+	def on_update(self):
+		from frappe.utils.scheduler import reset_site_due_time
+
+		self.update_scheduler_index()
+		# the job may be due earlier than the site was expected to be
+		reset_site_due_time(frappe.local.site)
+
 	def enqueue(self, force=False):
 		# enqueue event if last execution is done
 		if self.is_event_due() or force:
@@ -48,30 +68,13 @@ class ScheduledJobType(Document):
 		return self.get_next_execution() <= (current_time or now_datetime())
 
 	def is_job_in_queue(self):
-		queued_jobs = get_jobs(site=frappe.local.site, key="job_type")[frappe.local.site]
-		return self.method in queued_jobs
+		return is_job_queued(self.method, key="job_type")
 
 	def get_next_execution(self):
-		CRON_MAP = {
-			"Yearly": "0 0 1 1 *",
-			"Annual": "0 0 1 1 *",
-			"Monthly": "0 0 1 * *",
-			"Monthly Long": "0 0 1 * *",
-			"Weekly": "0 0 * * 0",
-			"Weekly Long": "0 0 * * 0",
-			"Daily": "0 0 * * *",
-			"Daily Long": "0 0 * * *",
-			"Hourly": "0 * * * *",
-			"Hourly Long": "0 * * * *",
-			"All": "0/" + str((frappe.get_conf().scheduler_interval or 240) // 60) + " * * * *",
-		}
-
 		if not self.cron_format:
-			self.cron_format = CRON_MAP[self.frequency]
+			self.cron_format = get_cron_format(self.frequency)
 
-		return croniter(
-			self.cron_format, get_datetime(self.last_execution or datetime(2000, 1, 1))
-		).get_next(datetime)
+		return get_next_execution(self.cron_format, self.last_execution)
 
 	def execute(self):
 		self.scheduler_log = None
@@ -99,6 +102,7 @@ class ScheduledJobType(Document):
 			# self.get_next_execution will work properly iff self.last_execution is properly set
 			if self.frequency == "All" and status == "Start":
 				self.db_set("last_execution", now_datetime(), update_modified=False)
+				self.update_scheduler_index()
 				frappe.db.commit()
 			return
 		if not self.scheduler_log:
@@ -110,13 +114,35 @@ class ScheduledJobType(Document):
 			self.scheduler_log.db_set("details", frappe.get_traceback())
 		if status == "Start":
 			self.db_set("last_execution", now_datetime(), update_modified=False)
+			self.update_scheduler_index()
 		frappe.db.commit()
 
 	def get_queue_name(self):
 		return "long" if ("Long" in self.frequency) else "default"
 
+	def update_scheduler_index(self):
+		from frappe.utils.scheduler import update_scheduler_index
+
+		update_scheduler_index(frappe.local.site, [self])
+
 	def on_trash(self):
+		from frappe.utils.scheduler import remove_from_scheduler_index
+
 		frappe.db.sql("delete from `tabScheduled Job Log` where scheduled_job_type=%s", self.name)
+		remove_from_scheduler_index(frappe.local.site, [self.name])
+
+
+def get_cron_format(frequency):
+	if frequency == "All":
+		return "0/" + str((frappe.get_conf().scheduler_interval or 240) // 60) + " * * * *"
+
+	return CRON_MAP[frequency]
+
+
+def get_next_execution(cron_format, last_execution=None):
+	return croniter(cron_format, get_datetime(last_execution or datetime(2000, 1, 1))).get_next(
+		datetime
+	)
 
 
 @frappe.whitelist()
@@ -136,10 +162,13 @@ def run_scheduled_job(job_type: str):
 
 
 def sync_jobs(hooks: Dict = None):
+	from frappe.utils.scheduler import clear_scheduler_index
+
 	frappe.reload_doc("core", "doctype", "scheduled_job_type")
 	scheduler_events = hooks or frappe.get_hooks("scheduler_events")
 	all_events = insert_events(scheduler_events)
 	clear_events(all_events)
+	clear_scheduler_index(frappe.local.site)
 
 
 def insert_events(scheduler_events: Dict) -> List:
@@ -118,6 +118,7 @@ class User(Document):
 		self.share_with_self()
 		clear_notifications(user=self.name)
 		frappe.clear_cache(user=self.name)
+		frappe.cache().delete_key("boot_section:user_info")
 		now = frappe.flags.in_test or frappe.flags.in_install
 		self.send_password_notification(self.__new_password)
 		frappe.enqueue(
@@ -376,6 +377,7 @@ class User(Document):
 
 	def on_trash(self):
 		frappe.clear_cache(user=self.name)
+		frappe.cache().delete_key("boot_section:user_info")
 		if self.name in STANDARD_USERS:
 			throw(_("User {0} cannot be deleted").format(self.name))
 
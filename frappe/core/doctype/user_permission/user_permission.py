@@ -22,10 +22,12 @@ class UserPermission(Document):
 
 	def on_update(self):
 		frappe.cache().hdel("user_permissions", self.user)
+		frappe.cache().hdel("permission_predicates", self.user)
 		frappe.publish_realtime("update_user_permissions", user=self.user, after_commit=True)
 
 	def on_trash(self):
 		frappe.cache().hdel("user_permissions", self.user)
+		frappe.cache().hdel("permission_predicates", self.user)
 		frappe.publish_realtime("update_user_permissions", user=self.user, after_commit=True)
 
 	def validate_user_permission(self):
@@ -8,7 +8,9 @@ from __future__ import unicode_literals
 
 import datetime
 import re
+from collections import namedtuple
 from contextlib import suppress
+from functools import lru_cache
 from time import time
 from typing import Dict, List, Union
 
@@ -20,10 +22,82 @@ import frappe.defaults
 import frappe.model.meta
 from frappe import _
 from frappe.database.query import Query
+from frappe.database.replica import get_replica
 from frappe.model.utils.link_count import flush_local_link_count
 from frappe.query_builder.utils import DocType
 from frappe.utils import cast, cint, get_datetime, get_table_name, getdate, now, sbool
 
+# normalized queries are memoized for the query texts (templates with placeholders)
+# that repeat on every request, queries with inlined values longer than this are not
+QUERY_CACHE_SIZE = 4096
+MAX_CACHED_QUERY_LENGTH = 2048
+
+IMPLICIT_COMMIT_COMMANDS = frozenset(("start", "alter", "drop", "create", "begin", "truncate"))
+WRITE_COMMANDS = frozenset(("update", "insert", "delete"))
+TOUCHED_TABLE_COMMANDS = frozenset(("insert", "delete", "update", "alter", "drop", "rename"))
+
+# single_word_regex is designed to match following patterns
+# `tabXxx`, tabXxx and "tabXxx"
+
+# multi_word_regex is designed to match following patterns
+# `tabXxx Xxx` and "tabXxx Xxx"
+
+# ([`"]?) Captures " or ` at the begining of the table name (if provided)
+# \1 matches the first captured group (quote character) at the end of the table name
+# multi word table name must have surrounding quotes.
+
+# (tab([A-Z]\w+)( [A-Z]\w+)*) Captures table names that start with "tab"
+# and are continued with multiple words that start with a captital letter
+# e.g. 'tabXxx' or 'tabXxx Xxx' or 'tabXxx Xxx Xxx' and so on
+SINGLE_WORD_TABLE_REGEX = re.compile(r'([`"]?)(tab([A-Z]\w+))\1')
+MULTI_WORD_TABLE_REGEX = re.compile(r'([`"])(tab([A-Z]\w+)( [A-Z]\w+)+)\1')
+IFNULL_REGEX = re.compile(r"ifnull\(", flags=re.IGNORECASE)
+
+QueryInfo = namedtuple("QueryInfo", ("query", "command", "is_write", "is_ddl", "tables"))
+
+
+def get_query_info(query):
+	"""Returns the normalized query (stripped, `ifnull` replaced with `coalesce`) and its
+	classification as `QueryInfo`, memoized per query text."""
+	if len(query) > MAX_CACHED_QUERY_LENGTH:
+		return parse_query(query)
+
+	return _get_cached_query_info(query)
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _get_cached_query_info(query):
+	return parse_query(query)
+
+
+def parse_query(query):
+	query = query.strip()
+	if "ifnull(" in query.lower():
+		query = IFNULL_REGEX.sub("coalesce(", query)
+
+	words = query.split(None, 1)
+	command = words[0].lower() if words else ""
+
+	tables = ()
+	if command in TOUCHED_TABLE_COMMANDS:
+		tables = tuple(
+			groups[1]
+			for regex in (SINGLE_WORD_TABLE_REGEX, MULTI_WORD_TABLE_REGEX)
+			for groups in regex.findall(query)
+		)
+
+	return QueryInfo(
+		query=query,
+		command=command,
+		is_write=query[:6].lower() in WRITE_COMMANDS,
+		is_ddl=command in IMPLICIT_COMMIT_COMMANDS,
+		tables=tables,
+	)
+
+
+def clear_query_cache():
+	_get_cached_query_info.cache_clear()
+
 
 class Database(object):
 	"""
@@ -52,6 +126,12 @@ class Database(object):
 	]
 	MAX_WRITES_PER_TRANSACTION = 200_000
 
+	# set for connections to read replicas, see `frappe.database.replica`
+	is_replica = False
+
+	# rows fetched per round trip by `stream`
+	STREAM_CHUNK_SIZE = 1000
+
 	class InvalidColumnName(frappe.ValidationError):
 		pass
 
@@ -108,6 +188,10 @@ class Database(object):
 	def get_database_size(self):
 		pass
 
+	def get_replication_lag(self):
+		"""Seconds this replica is behind its primary, `None` if unknown."""
+		raise NotImplementedError
+
 	def sql(
 		self,
 		query,
@@ -121,6 +205,7 @@ class Database(object):
 		auto_commit=0,
 		update=None,
 		explain=False,
+		as_iterator=False,
 	):
 		"""Execute a SQL query and fetch all rows.
 
@@ -134,6 +219,8 @@ class Database(object):
 		:param as_utf8: Encode values as UTF 8.
 		:param auto_commit: Commit after executing the query.
 		:param update: Update this dict to all rows (if returned `as_dict`).
+		:param as_iterator: Return a generator that fetches rows lazily, see `stream`. Can't be
+		        combined with `formatted`, `as_utf8` and `auto_commit`.
 
 		Examples:
 
@@ -148,14 +235,35 @@ class Database(object):
 		                {"name": "a%", "owner":"test@example.com"})
 
 		"""
-		query = str(query)
+		if as_iterator:
+			unsupported = [
+				name
+				for name, value in (
+					("formatted", formatted),
+					("as_utf8", as_utf8),
+					("auto_commit", auto_commit),
+				)
+				if value
+			]
+			if unsupported:
+				raise NotImplementedError(
+					"{0} can't be used with as_iterator".format(", ".join(unsupported))
+				)
 
-		# remove \n \t from start and end of query
-		query = re.sub(r"^\s*|\s*$", "", query)
+			return self.stream(
+				query,
+				values,
+				as_dict=as_dict,
+				as_list=as_list,
+				update=update,
+				debug=debug,
+				explain=explain,
+				ignore_ddl=ignore_ddl,
+			)
 
-		if re.search(r"ifnull\(", query, flags=re.IGNORECASE):
-			# replaces ifnull in query with coalesce
-			query = re.sub(r"ifnull\(", "coalesce(", query, flags=re.IGNORECASE)
+		# stripped, ifnull replaced with coalesce
+		query_info = get_query_info(str(query))
+		query = query_info.query
 
 		if not self._conn:
 			self.connect()
@@ -163,15 +271,19 @@ class Database(object):
 		# in transaction validations
 		self.check_transaction_status(query)
 
-		self.clear_db_table_cache(query)
+		if query_info.command in ("drop", "create"):
+			self.clear_db_table_cache(query)
 
 		# autocommit
 		if auto_commit:
 			self.commit()
 
+		# sampled by `frappe.query_profiler`
+		profiler = getattr(frappe.local, "query_profiler", None)
+
 		# execute
 		try:
-			if debug:
+			if debug or profiler:
 				time_start = time()
 
 			self.log_query(query, values, debug, explain)
@@ -195,6 +307,9 @@ class Database(object):
 				if frappe.flags.in_migrate:
 					self.log_touched_tables(query)
 
+			if profiler:
+				profiler.register(query, time() - time_start)
+
 			if debug:
 				time_end = time()
 				frappe.errprint(("Execution time: {0} sec").format(round(time_end - time_start, 2)))
@@ -241,6 +356,108 @@ class Database(object):
 		else:
 			return self._cursor.fetchall()
 
+	def stream(
+		self,
+		query,
+		values=(),
+		as_dict=False,
+		batch_size=None,
+		update=None,
+		debug=False,
+		as_list=False,
+		explain=False,
+		ignore_ddl=False,
+	):
+		"""Returns a generator over the rows of a (read) query. Rows are fetched in chunks
+		from a server side (unbuffered) cursor instead of loading the whole result in memory.
+
+		The query runs when iteration starts. On MariaDB the cursor uses a separate
+		connection, so rows written in the current (uncommitted) transaction are not seen.
+
+		:param query: SQL query.
+		:param values: List / dict of values to be escaped and substituted in the query.
+		:param as_dict: Yield rows as `frappe._dict`.
+		:param batch_size: Yield lists of `batch_size` rows instead of single rows.
+		:param update: Update this dict to all rows (if `as_dict`).
+		:param as_list: Yield rows as lists instead of tuples.
+		:param ignore_ddl: Yield no rows if a table or column is missing.
+
+		Example:
+
+		        for row in frappe.db.stream("select name, description from tabToDo", as_dict=True):
+		                process(row)
+		"""
+		query = get_query_info(str(query)).query
+
+		if not self._conn:
+			self.connect()
+
+		# in transaction validations
+		self.check_transaction_status(query)
+
+		self.log_query(query, values, debug, explain)
+
+		if values != () and not isinstance(values, (dict, tuple, list)):
+			values = (values,)
+
+		return self._iterate_rows(query, values, as_dict, as_list, batch_size, update, ignore_ddl)
+
+	def _iterate_rows(self, query, values, as_dict, as_list, batch_size, update, ignore_ddl):
+		cursor, close = self.get_streaming_cursor()
+
+		try:
+			# sampled by `frappe.query_profiler`
+			profiler = getattr(frappe.local, "query_profiler", None)
+			if profiler:
+				time_start = time()
+
+			try:
+				if values != ():
+					cursor.execute(query, values)
+				else:
+					cursor.execute(query)
+			except Exception as e:
+				if frappe.conf.db_type == "postgres":
+					self.rollback()
+
+				if ignore_ddl and (self.is_missing_column(e) or self.is_table_missing(e)):
+					return
+
+				raise
+
+			if profiler:
+				profiler.register(query, time() - time_start)
+
+			keys = None
+			while True:
+				rows = cursor.fetchmany(batch_size or self.STREAM_CHUNK_SIZE)
+				if not rows:
+					break
+
+				if as_dict:
+					# named cursors of Postgres have no description before the first fetch
+					if keys is None:
+						keys = [column[0] for column in cursor.description]
+
+					rows = [frappe._dict(zip(keys, row)) for row in rows]
+					if update:
+						for row in rows:
+							row.update(update)
+
+				elif as_list:
+					rows = [list(row) for row in rows]
+
+				if batch_size:
+					yield list(rows)
+				else:
+					yield from rows
+		finally:
+			close()
+
+	def get_streaming_cursor(self):
+		"""Returns `(cursor, close)`: a server side cursor and a function to release it."""
+		raise NotImplementedError
+
 	def log_query(self, query, values, debug, explain):
 		# for debugging in tests
 		if frappe.conf.get("allow_tests") and frappe.cache().get_value("flag_print_sql"):
@@ -303,19 +520,18 @@ class Database(object):
 		"""Raises exception if more than 20,000 `INSERT`, `UPDATE` queries are
 		executed in one transaction. This is to ensure that writes are always flushed otherwise this
 		could cause the system to hang."""
-		if (
-			self.transaction_writes
-			and query
-			and query.strip().split()[0].lower()
-			in ["start", "alter", "drop", "create", "begin", "truncate"]
-		):
+		query_info = get_query_info(query)
+
+		if self.transaction_writes and query_info.is_ddl:
 			raise Exception("This statement can cause implicit commit")
 
-		if query and query.strip().lower() in ("commit", "rollback"):
+		if query_info.query.lower() in ("commit", "rollback"):
 			self.transaction_writes = 0
 
-		if query[:6].lower() in ("update", "insert", "delete"):
+		if query_info.is_write:
 			self.transaction_writes += 1
+			# reads after a write in the same request stay on the primary
+			frappe.flags.wrote_to_primary = True
 			if self.transaction_writes > self.MAX_WRITES_PER_TRANSACTION:
 				if self.auto_commit_on_many_writes:
 					self.commit()
@@ -343,7 +559,7 @@ class Database(object):
 
 	@staticmethod
 	def clear_db_table_cache(query):
-		if query and query.strip().split()[0].lower() in {"drop", "create"}:
+		if query and get_query_info(query).command in ("drop", "create"):
 			frappe.cache().delete_key("db_tables")
 
 	@staticmethod
@@ -525,6 +741,25 @@ class Database(object):
 		):
 			return self.value_cache[(doctype, filters, fieldname)]
 
+		replica = (
+			not for_update
+			and self is getattr(frappe.local, "db", None)
+			and get_replica("get_value")
+		)
+		if replica:
+			return replica.get_values(
+				doctype,
+				filters,
+				fieldname,
+				ignore,
+				as_dict,
+				debug,
+				order_by,
+				update,
+				cache,
+				limit=limit,
+			)
+
 		if not order_by:
 			order_by = "modified desc"
 
@@ -924,16 +1159,24 @@ class Database(object):
 		self.flush_realtime_log()
 		enqueue_jobs_after_commit()
 		flush_local_link_count()
+		self.run_after_commit()
 
 	def add_before_commit(self, method, args=None, kwargs=None):
 		frappe.local.before_commit.append([method, args, kwargs])
 
+	def add_after_commit(self, method, args=None, kwargs=None):
+		"""Call `method` once the current transaction is committed, not if it is rolled back"""
+		frappe.local.after_commit.append([method, args, kwargs])
+
 	@staticmethod
-	def flush_realtime_log():
-		for args in frappe.local.realtime_log:
-			frappe.realtime.emit_via_redis(*args)
+	def run_after_commit():
+		methods, frappe.local.after_commit = frappe.local.after_commit, []
+		for method in methods:
+			frappe.call(method[0], *(method[1] or []), **(method[2] or {}))
 
-		frappe.local.realtime_log = []
+	@staticmethod
+	def flush_realtime_log():
+		frappe.realtime.flush_realtime_log()
 
 	def savepoint(self, save_point):
 		"""Savepoints work as a nested transaction.
@@ -958,6 +1201,7 @@ class Database(object):
 			frappe.local.rollback_observers = []
 
 			frappe.local.realtime_log = []
+			frappe.local.after_commit = []
 			frappe.flags.enqueue_after_commit = []
 
 	def field_exists(self, dt, fn):
@@ -1019,6 +1263,11 @@ class Database(object):
 			cache_count = frappe.cache().get_value("doctype:count:{}".format(dt))
 			if cache_count is not None:
 				return cache_count
+
+		replica = self is getattr(frappe.local, "db", None) and get_replica("count")
+		if replica:
+			return replica.count(dt, filters=filters, debug=debug, cache=cache)
+
 		if filters:
 			conditions, filters = self.build_conditions(filters)
 			count = self.sql(
@@ -1211,63 +1460,73 @@ class Database(object):
 		self.sql("truncate `tab{}`".format(doctype))
 
 	def log_touched_tables(self, query, values=None):
-		if values:
-			query = frappe.safe_decode(self._cursor.mogrify(query, values))
-		if query.strip().lower().split()[0] in ("insert", "delete", "update", "alter", "drop", "rename"):
-			# single_word_regex is designed to match following patterns
-			# `tabXxx`, tabXxx and "tabXxx"
-
-			# multi_word_regex is designed to match following patterns
-			# `tabXxx Xxx` and "tabXxx Xxx"
-
-			# ([`"]?) Captures " or ` at the begining of the table name (if provided)
-			# \1 matches the first captured group (quote character) at the end of the table name
-			# multi word table name must have surrounding quotes.
-
-			# (tab([A-Z]\w+)( [A-Z]\w+)*) Captures table names that start with "tab"
-			# and are continued with multiple words that start with a captital letter
-			# e.g. 'tabXxx' or 'tabXxx Xxx' or 'tabXxx Xxx Xxx' and so on
-
-			single_word_regex = r'([`"]?)(tab([A-Z]\w+))\1'
-			multi_word_regex = r'([`"])(tab([A-Z]\w+)( [A-Z]\w+)+)\1'
-			tables = []
-			for regex in (single_word_regex, multi_word_regex):
-				tables += [groups[1] for groups in re.findall(regex, query)]
-
-			if frappe.flags.touched_tables is None:
-				frappe.flags.touched_tables = set()
-			frappe.flags.touched_tables.update(tables)
-
-	def bulk_insert(self, doctype, fields, values, ignore_duplicates=False):
+		# tables are read from the query text, `values` are only substituted for placeholders
+		tables = get_query_info(query).tables
+		if not tables:
+			return
+
+		if frappe.flags.touched_tables is None:
+			frappe.flags.touched_tables = set()
+		frappe.flags.touched_tables.update(tables)
+
+	def bulk_insert(self, doctype, fields, values, ignore_duplicates=False, chunk_size=10000):
 		"""
 		Insert multiple records at a time
 
 		:param doctype: Doctype name
 		:param fields: list of fields
 		:params values: list of list of values
+		:param ignore_duplicates: skip rows that violate a unique key
+		:param chunk_size: number of rows sent per `INSERT` statement
 		"""
-		insert_list = []
+		values = list(values)
 		fields = ", ".join(["`" + field + "`" for field in fields])
+		query = "INSERT {ignore_duplicates} INTO `tab{doctype}` ({fields}) VALUES ".format(
+			ignore_duplicates="IGNORE" if ignore_duplicates else "",
+			doctype=doctype,
+			fields=fields,
+		)
 
-		for idx, value in enumerate(values):
-			insert_list.append(tuple(value))
-			if idx and (idx % 10000 == 0 or idx < len(values) - 1):
-				self.sql(
-					"""INSERT {ignore_duplicates} INTO `tab{doctype}` ({fields}) VALUES {values}""".format(
-						ignore_duplicates="IGNORE" if ignore_duplicates else "",
-						doctype=doctype,
-						fields=fields,
-						values=", ".join(["%s"] * len(insert_list)),
-					),
-					tuple(insert_list),
-				)
-				insert_list = []
+		for start in range(0, len(values), chunk_size):
+			insert_list = [tuple(value) for value in values[start : start + chunk_size]]
+			self.sql(query + ", ".join(["%s"] * len(insert_list)), tuple(insert_list))
+
+	def bulk_insert_docs(
+		self,
+		docs,
+		chunk_size=1000,
+		ignore_permissions=None,
+		ignore_links=None,
+		ignore_if_duplicate=False,
+		ignore_mandatory=None,
+	):
+		"""Insert multiple new documents using multi-row `INSERT` statements.
+
+		Naming, validations and controller hooks run for every document exactly as in
+		`Document.insert`, but the parent and child rows of all documents are grouped by
+		table and written in chunks of `chunk_size` rows.
+
+		:param docs: list of `Document` objects or dicts
+		:param chunk_size: number of rows sent per `INSERT` statement
+		:param ignore_permissions: Do not check permissions if True.
+		:param ignore_if_duplicate: Skip documents whose name already exists."""
+		from frappe.model.document import bulk_insert
+
+		return bulk_insert(
+			docs,
+			chunk_size=chunk_size,
+			ignore_permissions=ignore_permissions,
+			ignore_links=ignore_links,
+			ignore_if_duplicate=ignore_if_duplicate,
+			ignore_mandatory=ignore_mandatory,
+		)
 
 
 def enqueue_jobs_after_commit():
 	from frappe.utils.background_jobs import (
 		RQ_JOB_FAILURE_TTL,
 		RQ_RESULTS_TTL,
+		add_to_job_index,
 		execute_job,
 		get_queue,
 	)
@@ -1275,13 +1534,15 @@ def enqueue_jobs_after_commit():
 	if frappe.flags.enqueue_after_commit and len(frappe.flags.enqueue_after_commit) > 0:
 		for job in frappe.flags.enqueue_after_commit:
 			q = get_queue(job.get("queue"), is_async=job.get("is_async"))
-			q.enqueue_call(
+			rq_job = q.enqueue_call(
 				execute_job,
 				timeout=job.get("timeout"),
 				kwargs=job.get("queue_args"),
 				failure_ttl=RQ_JOB_FAILURE_TTL,
 				result_ttl=RQ_RESULTS_TTL,
 			)
+			if job.get("is_async"):
+				add_to_job_index(rq_job, job.get("queue_args"))
 		frappe.flags.enqueue_after_commit = []
 
 
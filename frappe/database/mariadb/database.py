@@ -3,6 +3,7 @@ from typing import List, Tuple, Union
 import pymysql
 from pymysql.constants import ER, FIELD_TYPE
 from pymysql.converters import conversions, escape_string
+from pymysql.cursors import SSCursor
 
 import frappe
 from frappe.database.database import Database
@@ -110,6 +111,16 @@ class MariaDBDatabase(Database):
 
 		return db_size[0].get("database_size")
 
+	def get_streaming_cursor(self):
+		# an unbuffered result blocks its connection until consumed, use a separate one
+		conn = self.get_connection()
+		return conn.cursor(SSCursor), conn.close
+
+	def get_replication_lag(self):
+		"""Seconds this replica is behind its primary, `None` if not replicating."""
+		status = self.sql("SHOW SLAVE STATUS", as_dict=True)
+		return status[0].get("Seconds_Behind_Master") if status else None
+
 	@staticmethod
 	def escape(s, percent=True):
 		"""Excape quotes and percent in given string."""
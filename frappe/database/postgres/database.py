@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 from typing import List, Tuple, Union
 
 import psycopg2
@@ -8,7 +9,7 @@ from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 from six import string_types
 
 import frappe
-from frappe.database.database import Database
+from frappe.database.database import MAX_CACHED_QUERY_LENGTH, QUERY_CACHE_SIZE, Database
 from frappe.database.postgres.schema import PostgresTable
 from frappe.utils import cstr, get_table_name
 
@@ -107,6 +108,24 @@ class PostgresDatabase(Database):
 		)
 		return db_size[0].get("database_size")
 
+	def get_streaming_cursor(self):
+		# named cursors are server side, `withhold` as the connection is in autocommit mode
+		cursor = self._conn.cursor(
+			name="frappe_stream_{0}".format(frappe.generate_hash(length=10)), withhold=True
+		)
+		cursor.itersize = self.STREAM_CHUNK_SIZE
+		return cursor, cursor.close
+
+	def get_replication_lag(self):
+		"""Seconds this replica is behind its primary, `None` if not a replica."""
+		return self.sql(
+			"""SELECT CASE
+				WHEN NOT pg_is_in_recovery() THEN NULL
+				WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+				ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+			END"""
+		)[0][0]
+
 	# pylint: disable=W0221
 	def sql(self, *args, **kwargs):
 		if args:
@@ -119,6 +138,9 @@ class PostgresDatabase(Database):
 
 		return super(PostgresDatabase, self).sql(*args, **kwargs)
 
+	def stream(self, query, *args, **kwargs):
+		return super(PostgresDatabase, self).stream(modify_query(query), *args, **kwargs)
+
 	def get_tables(self):
 		return [
 			d[0]
@@ -371,8 +393,20 @@ class PostgresDatabase(Database):
 
 def modify_query(query):
 	""" "Modifies query according to the requirements of postgres"""
-	# replace ` with " for definitions
 	query = str(query)
+	if len(query) > MAX_CACHED_QUERY_LENGTH:
+		return _modify_query(query)
+
+	return _modify_cached_query(query)
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _modify_cached_query(query):
+	return _modify_query(query)
+
+
+def _modify_query(query):
+	# replace ` with " for definitions
 	query = query.replace("`", '"')
 	query = replace_locate_with_strpos(query)
 	# select from requires ""
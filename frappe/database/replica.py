@@ -0,0 +1,202 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# MIT License. See license.txt
+
+"""
+Route reads to read replicas.
+
+Replicas are configured in site config:
+
+	"read_replicas": [
+		{"host": "10.0.0.2", "port": 3306, "max_lag": 10},
+		{"host": "10.0.0.3", "user": "replica_user", "password": "..."}
+	],
+	"replica_routing": {"get_list": 1, "get_value": 1, "count": 1, "read_only": 1}
+
+If `read_replicas` is not set, `replica_host` / `replica_db_port` (as used by
+`frappe.connect_replica`) is used as the only replica. `read_from_replica` alone
+enables routing for `@frappe.read_only` endpoints (reports, list views) as before.
+
+`replica_routing` decides which reads are routed:
+
+- `read_only`: everything inside `@frappe.read_only` endpoints (includes report runs).
+- `get_list`: queries run by `DatabaseQuery.execute` (`frappe.get_list`, `get_all`).
+- `get_value`, `count`: `frappe.db.get_value(s)` and `frappe.db.count`.
+
+`get_list`, `get_value` and `count` are only routed in GET requests, since other
+requests and background jobs usually read values they are about to write.
+
+Reads always stay on the primary once the request or job has written to it, and a
+replica is skipped while its replication lag is unknown or higher than `max_lag`
+(`replica_max_lag`, default 10 seconds), checked at most every
+`replica_lag_check_interval` seconds (default 30).
+"""
+
+import random
+import time
+from contextlib import contextmanager
+
+import frappe
+
+DEFAULT_MAX_LAG = 10
+DEFAULT_LAG_CHECK_INTERVAL = 30
+AUTOMATIC_ROUTES = ("get_list", "get_value", "count")
+
+# per process, (site, host, port) => (checked_at, is_healthy)
+_replica_health = {}
+
+
+def get_replica_configs():
+	conf = frappe.local.conf
+	if conf.read_replicas:
+		return conf.read_replicas
+
+	if conf.replica_host:
+		config = {"host": conf.replica_host, "port": conf.replica_db_port}
+		if conf.different_credentials_for_replica:
+			config.update(user=conf.replica_db_name, password=conf.replica_db_password)
+		return [config]
+
+	return []
+
+
+def is_routing_enabled(purpose):
+	routing = frappe.local.conf.replica_routing or {}
+	if purpose == "read_only" and frappe.local.conf.read_from_replica:
+		return True
+
+	return bool(routing.get(purpose))
+
+
+def get_replica(purpose):
+	"""Returns a connection to a healthy replica for reads of the given `purpose`
+	("read_only", "get_list", "get_value" or "count"), or `None` if the read must go
+	to the primary."""
+	db = getattr(frappe.local, "db", None)
+
+	if (
+		not db
+		or db.is_replica
+		or not is_routing_enabled(purpose)
+		or frappe.flags.wrote_to_primary
+		or db.transaction_writes
+		or frappe.flags.in_test
+		or frappe.flags.in_install
+		or frappe.flags.in_migrate
+		or frappe.flags.in_patch
+	):
+		return None
+
+	if purpose in AUTOMATIC_ROUTES and not is_get_request():
+		return None
+
+	replica = getattr(frappe.local, "replica_db", None)
+	if replica and is_healthy(replica):
+		return replica
+
+	configs = list(get_replica_configs())
+	random.shuffle(configs)
+
+	for config in configs:
+		try:
+			replica = connect(config)
+		except Exception:
+			frappe.logger("database").warning(
+				"Could not connect to replica {0}".format(config.get("host")), exc_info=True
+			)
+			set_health(config, False)
+			continue
+
+		if is_healthy(replica):
+			close_replica()
+			frappe.local.replica_db = replica
+			return replica
+
+		replica.close()
+
+	return None
+
+
+@contextmanager
+def use_replica(purpose):
+	"""Run the reads inside the block on a replica if routing allows it.
+
+	Usage:
+
+	        with use_replica("get_list"):
+	                frappe.db.sql("select ...")
+	"""
+	replica = get_replica(purpose)
+	if not replica:
+		yield
+		return
+
+	primary = frappe.local.db
+	previous_primary = getattr(frappe.local, "primary_db", None)
+	frappe.local.primary_db = primary
+	frappe.local.db = replica
+
+	try:
+		yield
+	finally:
+		frappe.local.db = primary
+		frappe.local.primary_db = previous_primary
+
+
+def connect(config):
+	from frappe.database import get_db
+
+	conf = frappe.local.conf
+	db = get_db(
+		host=config.get("host"),
+		user=config.get("user") or conf.db_name,
+		password=config.get("password") or conf.db_password,
+		port=config.get("port"),
+	)
+	db.is_replica = True
+	db.replica_config = config
+	db._conn = db.get_connection()
+	db._cursor = db._conn.cursor()
+	return db
+
+
+def is_healthy(replica):
+	"""Check replication lag of the replica, cached for `replica_lag_check_interval`."""
+	config = replica.replica_config
+	checked_at, healthy = _replica_health.get(get_health_key(config), (0, False))
+	interval = frappe.local.conf.replica_lag_check_interval or DEFAULT_LAG_CHECK_INTERVAL
+
+	if time.monotonic() - checked_at < interval:
+		return healthy
+
+	max_lag = config.get("max_lag") or frappe.local.conf.replica_max_lag or DEFAULT_MAX_LAG
+	try:
+		lag = replica.get_replication_lag()
+	except Exception:
+		frappe.logger("database").warning(
+			"Could not check replication lag of {0}".format(config.get("host")), exc_info=True
+		)
+		lag = None
+
+	healthy = lag is not None and lag <= max_lag
+	set_health(config, healthy)
+	return healthy
+
+
+def set_health(config, healthy):
+	_replica_health[get_health_key(config)] = (time.monotonic(), healthy)
+
+
+def get_health_key(config):
+	return (frappe.local.site, config.get("host"), config.get("port"))
+
+
+def is_get_request():
+	request = getattr(frappe.local, "request", None)
+	return bool(request) and request.method == "GET"
+
+
+def close_replica():
+	replica = getattr(frappe.local, "replica_db", None)
+	if replica:
+		replica.close()
+		frappe.local.replica_db = None
@@ -0,0 +1,92 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# MIT License. See license.txt
+
+from contextlib import contextmanager
+
+import frappe
+
+
+def create_sequence(sequence_name, start_value=1, cache=1000, db=None):
+	"""Create a native database sequence (MariaDB `SEQUENCE` / Postgres sequence)
+	if it does not exist yet.
+
+	:param sequence_name: name of the sequence, must be a valid identifier.
+	:param start_value: first value handed out by the sequence.
+	:param cache: number of values the database preallocates in memory.
+	:param db: connection to use, defaults to `frappe.db`."""
+	db = db or frappe.db
+	db.sql(
+		"CREATE SEQUENCE IF NOT EXISTS `{0}` START WITH {1} INCREMENT BY 1 CACHE {2}".format(
+			sequence_name, int(start_value), int(cache)
+		)
+	)
+
+
+def sequence_exists(sequence_name, db=None):
+	db = db or frappe.db
+	if db.db_type == "postgres":
+		return bool(
+			db.sql("SELECT 1 FROM pg_class WHERE relkind = 'S' AND relname = %s", sequence_name)
+		)
+
+	return bool(
+		db.sql(
+			"""SELECT 1 FROM information_schema.tables
+			WHERE table_schema = DATABASE() AND table_type = 'SEQUENCE' AND table_name = %s""",
+			sequence_name,
+		)
+	)
+
+
+def get_next_val(sequence_name, db=None):
+	db = db or frappe.db
+	if db.db_type == "postgres":
+		return db.sql("SELECT nextval(%s)", sequence_name)[0][0]
+
+	return db.sql("SELECT NEXTVAL(`{0}`)".format(sequence_name))[0][0]
+
+
+def get_current_val(sequence_name, db=None):
+	"""Highest value the sequence may have handed out, including values preallocated
+	(cached) by other sessions."""
+	db = db or frappe.db
+	if db.db_type == "postgres":
+		return db.sql('SELECT last_value FROM "{0}"'.format(sequence_name))[0][0]
+
+	return db.sql("SELECT `next_not_cached_value` - 1 FROM `{0}`".format(sequence_name))[0][0]
+
+
+def drop_sequence(sequence_name, db=None):
+	db = db or frappe.db
+	db.sql("DROP SEQUENCE IF EXISTS `{0}`".format(sequence_name))
+
+
+@contextmanager
+def autocommit_connection():
+	"""A separate database connection whose statements run in one transaction that is
+	committed as soon as the block exits, so that DDL (implicit commit in MariaDB) and short-lived row locks do
+	not affect the current transaction.
+
+	Usage:
+
+	        with autocommit_connection() as db:
+	                create_sequence("my_sequence", db=db)
+	"""
+	from frappe.database import get_db
+
+	db = get_db(user=frappe.conf.db_name)
+	# don't use `db.connect`, it resets rollback observers of the current transaction
+	db._conn = db.get_connection()
+	db._cursor = db._conn.cursor()
+	if db.db_type == "postgres":
+		# postgres connections are in autocommit mode, row locks would end with the statement
+		db._cursor.execute("begin")
+
+	try:
+		yield db
+		db._cursor.execute("commit")
+	except Exception:
+		db._cursor.execute("rollback")
+		raise
+	finally:
+		db.close()
@@ -5,6 +5,10 @@ from frappe.utils import cstr
 
 queue_prefix = "insert_queue_for_"
 
+# queued items popped per doctype per run, each item holds one or more records
+max_records_per_run = 500
+insert_batch_size = 100
+
 
 def deferred_insert(doctype, records):
 	frappe.cache().rpush(queue_prefix + doctype, records)
@@ -13,23 +17,36 @@ def deferred_insert(doctype, records):
 def save_to_db():
 	queue_keys = frappe.cache().get_keys(queue_prefix)
 	for key in queue_keys:
-		record_count = 0
 		queue_key = get_key_name(key)
 		doctype = get_doctype_name(key)
-		while frappe.cache().llen(queue_key) > 0 and record_count <= 500:
-			records = frappe.cache().lpop(queue_key)
-			records = json.loads(records.decode("utf-8"))
-			if isinstance(records, dict):
-				record_count += 1
-				insert_record(records, doctype)
-				continue
-			for record in records:
-				record_count += 1
-				insert_record(record, doctype)
+
+		records = []
+		for value in frappe.cache().lpop_many(queue_key, max_records_per_run):
+			value = json.loads(value.decode("utf-8"))
+			records.extend([value] if isinstance(value, dict) else value)
+
+		for start in range(0, len(records), insert_batch_size):
+			insert_records(records[start : start + insert_batch_size], doctype)
 
 	frappe.db.commit()
 
 
+def insert_records(records, doctype):
+	"""Insert records with multi-row statements, falling back to one insert per record
+	(skipping invalid ones) if the batch fails."""
+	for record in records:
+		if not record.get("doctype"):
+			record["doctype"] = doctype
+
+	frappe.db.savepoint("deferred_insert")
+	try:
+		frappe.db.bulk_insert_docs(records)
+	except Exception:
+		frappe.db.rollback(save_point="deferred_insert")
+		for record in records:
+			insert_record(record, doctype)
+
+
 def insert_record(record, doctype):
 	if not record.get("doctype"):
 		record["doctype"] = doctype
@@ -0,0 +1,544 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# MIT License. See license.txt
+
+"""
+Rollups of the documents aggregated by Dashboard Charts and Number Cards, so that loading
+a dashboard does not run a `GROUP BY` over the whole table of every chart.
+
+A rollup keeps the sum of a value field and the number of documents per day of a date
+field and per value of a group by field, for the documents of a doctype that match a set
+of filters. Periods of every time grain are summed up from the daily buckets. A rollup is
+built in a background job the first time a chart or card asks for it, and updated as
+documents are saved, submitted, cancelled or deleted. Enable rollups in site config:
+
+	"dashboard_rollups": 1
+
+Rollups are used only when they have the same documents as the live query: filters on
+fields of the doctype with operators that can be evaluated in Python, and users without
+permission conditions on the doctype. Changes that skip `on_change`, like
+`frappe.db.set_value` and bulk updates, are picked up by `rebuild_rollups` every day.
+It also drops the rollups not read for `dashboard_rollup_expiry_days` (default 3).
+
+The buckets of a rollup and its `built` marker are kept in one Redis hash, so that a
+rollup evicted from the cache is built again instead of being read as empty.
+"""
+
+import hashlib
+import json
+import operator
+import time
+
+import redis
+
+import frappe
+from frappe.model import default_fields
+from frappe.model.db_query import DatabaseQuery
+from frappe.utils import cast, cint, cstr, flt, getdate
+from frappe.utils.data import get_filter, make_filter_tuple
+
+SOURCES_KEY = "dashboard_rollup_sources"
+ROLLUP_KEY = "dashboard_rollup|{0}"
+LAST_USED_KEY = "dashboard_rollup_last_used"
+
+# field of the rollup hash set once all buckets are written
+BUILT_FIELD = b"built"
+
+DEFAULT_EXPIRY_DAYS = 3
+
+OPERATORS = {
+	"=": operator.eq,
+	"!=": operator.ne,
+	">": operator.gt,
+	"<": operator.lt,
+	">=": operator.ge,
+	"<=": operator.le,
+	"in": lambda a, b: a in b,
+	"not in": lambda a, b: a not in b,
+}
+
+# fieldtypes of filtered fields, values are compared after `frappe.utils.cast`
+FILTER_FIELDTYPES = (
+	"Currency",
+	"Float",
+	"Percent",
+	"Int",
+	"Check",
+	"Data",
+	"Small Text",
+	"Select",
+	"Link",
+	"Dynamic Link",
+	"Date",
+	"Datetime",
+)
+
+DEFAULT_FIELDTYPES = {
+	"docstatus": "Int",
+	"idx": "Int",
+	"creation": "Datetime",
+	"modified": "Datetime",
+}
+
+
+class Rollup:
+	"""Sums and counts of documents per day and group"""
+
+	def __init__(self, buckets):
+		# {(day, group): [sum, count]}
+		self.buckets = buckets
+
+	def get_daily_totals(self, from_date=None, to_date=None):
+		"""`[day, sum, count]` of the days with documents between the dates, in order"""
+		from_date = getdate(from_date) if from_date else None
+		to_date = getdate(to_date) if to_date else None
+
+		totals = {}
+		for (day, group), (total, count) in self.buckets.items():
+			if not (count and day):
+				continue
+
+			if (from_date and day < from_date) or (to_date and day > to_date):
+				continue
+
+			add_to_totals(totals, day, total, count)
+
+		return [[day] + totals[day] for day in sorted(totals)]
+
+	def get_group_totals(self):
+		"""`[group, sum, count]` of the groups with documents"""
+		totals = {}
+		for (day, group), (total, count) in self.buckets.items():
+			if count:
+				add_to_totals(totals, group, total, count)
+
+		return [[group] + value for group, value in totals.items()]
+
+	def get_total(self):
+		"""`[sum, count]` of all documents"""
+		return [
+			sum(total for total, count in self.buckets.values()),
+			sum(count for total, count in self.buckets.values()),
+		]
+
+
+def add_to_totals(totals, key, total, count):
+	if key in totals:
+		totals[key][0] += total
+		totals[key][1] += count
+	else:
+		totals[key] = [total, count]
+
+
+def get_aggregate(function, total, count):
+	"""Result of the SQL aggregate `function` (count, sum or avg) from a sum and a count"""
+	function = function.lower()
+	if function == "count":
+		return count
+
+	if function == "avg":
+		return total / count if count else 0
+
+	return total
+
+
+def get_rollup(doctype, filters, datefield=None, value_field=None, group_by_field=None):
+	"""`Rollup` of the documents of `doctype` that match `filters`, `None` if the live
+	query has to be run. The rollup is built in the background the first time it is asked
+	for, until then `None` is returned."""
+	if not frappe.conf.dashboard_rollups:
+		return None
+
+	source = get_source(doctype, filters, datefield, value_field, group_by_field)
+	if not (source and can_read_all(doctype)):
+		return None
+
+	sources = frappe.cache().hget(SOURCES_KEY, doctype) or {}
+	if source.key not in sources:
+		# buckets left from before the sources were evicted have missed changes since
+		clear_rollup(source.key)
+		sources[source.key] = source
+		frappe.cache().hset(SOURCES_KEY, doctype, sources)
+
+	buckets = get_buckets(source.key)
+	if buckets is None:
+		enqueue_build(source)
+		return None
+
+	return Rollup(buckets)
+
+
+def get_source(doctype, filters, datefield=None, value_field=None, group_by_field=None):
+	"""Definition of the rollup, `None` if documents can't be matched against `filters`"""
+	meta = frappe.get_meta(doctype)
+	if meta.istable or meta.issingle:
+		return None
+
+	for fieldname in (datefield, value_field, group_by_field):
+		if fieldname and not is_column(meta, fieldname):
+			return None
+
+	if isinstance(filters, dict):
+		filters = [make_filter_tuple(doctype, key, value) for key, value in filters.items()]
+
+	match_filters = []
+	query_filters = []
+	for f in filters or []:
+		f = get_filter(doctype, f)
+		condition = f.operator.lower()
+		fieldtype = get_fieldtype(meta, f.fieldname)
+		if f.doctype != doctype or condition not in OPERATORS or fieldtype not in FILTER_FIELDTYPES:
+			return None
+
+		if condition in ("in", "not in"):
+			values = f.value.split(",") if isinstance(f.value, str) else f.value
+			value = sorted({get_match_value(fieldtype, v) for v in values})
+		else:
+			value = get_match_value(fieldtype, f.value)
+
+		match_filters.append([f.fieldname, condition, value, fieldtype])
+		query_filters.append([doctype, f.fieldname, f.operator, f.value])
+
+	match_filters.sort(key=str)
+	key = hashlib.md5(
+		frappe.safe_encode(
+			frappe.as_json([doctype, datefield, value_field, group_by_field, match_filters])
+		)
+	).hexdigest()
+
+	return frappe._dict(
+		key=key,
+		doctype=doctype,
+		datefield=datefield,
+		value_field=value_field,
+		group_by_field=group_by_field,
+		match_filters=match_filters,
+		query_filters=query_filters,
+	)
+
+
+def is_column(meta, fieldname):
+	return fieldname in default_fields or bool(meta.get_field(fieldname))
+
+
+def get_fieldtype(meta, fieldname):
+	df = meta.get_field(fieldname)
+	if df:
+		return df.fieldtype
+
+	return DEFAULT_FIELDTYPES.get(fieldname, "Data" if fieldname in default_fields else None)
+
+
+def get_match_value(fieldtype, value):
+	"""Value cast like the database compares it, strings are case insensitive on MariaDB"""
+	value = cast(fieldtype, value)
+	if isinstance(value, str) and frappe.db.db_type == "mariadb":
+		value = value.lower()
+
+	return value
+
+
+def can_read_all(doctype):
+	"""Whether list queries of the user on `doctype` have no permission conditions"""
+	query = DatabaseQuery(doctype)
+	try:
+		conditions = query.build_match_conditions()
+	except frappe.PermissionError:
+		return False
+
+	return not (conditions or query.conditions)
+
+
+def get_buckets(key):
+	"""Buckets of the rollup, `None` if it is not built or was evicted from the cache"""
+	cache = frappe.cache()
+	pipeline = cache.pipeline()
+	pipeline.hgetall(cache.make_key(ROLLUP_KEY.format(key)))
+	pipeline.hset(cache.make_key(LAST_USED_KEY), key, cint(time.time()))
+	fields = pipeline.execute()[0]
+	if BUILT_FIELD not in fields:
+		return None
+
+	buckets = {}
+	for field, count in fields.items():
+		if not field.startswith(b"c|"):
+			continue
+
+		bucket = field[2:]
+		day, group = json.loads(bucket)
+		buckets[(getdate(day) if day else None, group)] = [
+			flt(fields.get(b"s|" + bucket)),
+			cint(count),
+		]
+
+	return buckets
+
+
+def get_bucket_field(day, group):
+	return json.dumps([str(day) if day else None, cstr(group) if group not in (None, "") else None])
+
+
+def get_doc_bucket(source, doc):
+	"""`(bucket field, value)` of the document in the rollup, `None` if it is not in it"""
+	if source.datefield and not doc.get(source.datefield):
+		return None
+
+	for fieldname, condition, value, fieldtype in source.match_filters:
+		if not OPERATORS[condition](get_match_value(fieldtype, doc.get(fieldname)), value):
+			return None
+
+	day = getdate(doc.get(source.datefield)) if source.datefield else None
+	group = doc.get(source.group_by_field) if source.group_by_field else None
+	value = flt(doc.get(source.value_field)) if source.value_field else 1
+
+	return get_bucket_field(day, group), value
+
+
+def get_doc_buckets(sources, doc):
+	buckets = {}
+	for source in sources.values():
+		bucket = get_doc_bucket(source, doc)
+		if bucket:
+			buckets[source.key] = bucket
+
+	return buckets
+
+
+def update_rollups(doc, method=None):
+	"""Move the document to its buckets in the rollups of its doctype, called on change"""
+	if not frappe.conf.dashboard_rollups or frappe.flags.in_install:
+		return
+
+	sources = frappe.cache().hget(SOURCES_KEY, doc.doctype)
+	if not sources:
+		return
+
+	previous = doc.flags.dashboard_rollup_buckets
+	if previous is None:
+		doc_before_save = doc.get_doc_before_save()
+		previous = get_doc_buckets(sources, doc_before_save) if doc_before_save else {}
+
+	current = get_doc_buckets(sources, doc)
+	move_doc(previous, current)
+	doc.flags.dashboard_rollup_buckets = current
+
+
+def remove_from_rollups(doc, method=None):
+	"""Remove the document from the rollups of its doctype, called on trash"""
+	if not frappe.conf.dashboard_rollups or frappe.flags.in_install:
+		return
+
+	sources = frappe.cache().hget(SOURCES_KEY, doc.doctype)
+	if not sources:
+		return
+
+	previous = doc.flags.dashboard_rollup_buckets
+	if previous is None:
+		previous = get_doc_buckets(sources, doc)
+
+	move_doc(previous, {})
+	doc.flags.dashboard_rollup_buckets = {}
+
+
+def move_doc(previous, current):
+	pending = get_pending_updates()
+	for key in set(previous) | set(current):
+		if previous.get(key) == current.get(key):
+			continue
+
+		if key in previous:
+			field, value = previous[key]
+			pending.add(key, field, -value, -1)
+
+		if key in current:
+			field, value = current[key]
+			pending.add(key, field, value, 1)
+
+
+class PendingUpdates:
+	"""Changes to the buckets in the current transaction, written to Redis once it is
+	committed and dropped on rollback"""
+
+	def __init__(self):
+		# {key: {field: [sum, count]}}
+		self.updates = {}
+
+	def add(self, key, field, value, count):
+		if not self.updates:
+			frappe.local.rollback_observers.append(self)
+			frappe.db.add_after_commit("frappe.desk.dashboard_rollup.flush_updates")
+
+		add_to_totals(self.updates.setdefault(key, {}), field, value, count)
+
+	def on_rollback(self):
+		self.updates = {}
+
+	def flush(self):
+		if not self.updates:
+			return
+
+		cache = frappe.cache()
+		pipeline = cache.pipeline()
+		for key, fields in self.updates.items():
+			rollup_key = cache.make_key(ROLLUP_KEY.format(key))
+			for field, (value, count) in fields.items():
+				pipeline.hincrbyfloat(rollup_key, "s|" + field, value)
+				pipeline.hincrby(rollup_key, "c|" + field, count)
+
+		pipeline.execute()
+		self.updates = {}
+
+
+def get_pending_updates():
+	if not getattr(frappe.local, "dashboard_rollup_updates", None):
+		frappe.local.dashboard_rollup_updates = PendingUpdates()
+
+	return frappe.local.dashboard_rollup_updates
+
+
+def flush_updates():
+	if getattr(frappe.local, "dashboard_rollup_updates", None):
+		frappe.local.dashboard_rollup_updates.flush()
+
+
+def enqueue_build(source):
+	frappe.enqueue(
+		"frappe.desk.dashboard_rollup.build_rollup",
+		queue="long",
+		job_name="dashboard_rollup|" + source.key,
+		deduplicate=True,
+		source=source,
+		now=frappe.flags.in_test,
+	)
+
+
+def build_rollup(source):
+	"""Fill the buckets of a rollup from the documents in the database.
+
+	Updates written to the rollup while the documents are read are added to the result,
+	instead of being overwritten by it."""
+	source = frappe._dict(source)
+	cache = frappe.cache()
+	rollup_key = cache.make_key(ROLLUP_KEY.format(source.key))
+	pipeline = cache.pipeline()
+	pipeline.hgetall(rollup_key)
+	fields_before = pipeline.execute()[0]
+
+	group_by = []
+	fields = []
+	if source.datefield:
+		fields.append("date({0}) as _day".format(source.datefield))
+		group_by.append("_day")
+
+	if source.group_by_field:
+		fields.append("{0} as _group".format(source.group_by_field))
+		group_by.append("_group")
+
+	fields += ["sum({0})".format(source.value_field or "1"), "count(*)"]
+	rows = frappe.get_all(
+		source.doctype,
+		fields=fields,
+		filters=source.query_filters,
+		group_by=", ".join(group_by),
+		order_by=", ".join(group_by) or "count(*)",
+		as_list=True,
+	)
+
+	buckets = {BUILT_FIELD: 1}
+	for row in rows:
+		*columns, total, count = row
+		if not count:
+			continue
+
+		day = columns.pop(0) if source.datefield else None
+		group = columns.pop(0) if source.group_by_field else None
+		field = get_bucket_field(day, group)
+
+		# empty and null groups end up in the same bucket
+		field = frappe.safe_encode(field)
+		buckets[b"s|" + field] = buckets.get(b"s|" + field, 0) + flt(total)
+		buckets[b"c|" + field] = buckets.get(b"c|" + field, 0) + cint(count)
+
+	with cache.pipeline() as pipeline:
+		while True:
+			try:
+				pipeline.watch(rollup_key)
+				fields = add_updates_since(buckets, fields_before, pipeline.hgetall(rollup_key))
+				pipeline.multi()
+				pipeline.delete(rollup_key)
+				pipeline.hset(rollup_key, mapping=fields)
+				pipeline.execute()
+				break
+			except redis.WatchError:
+				# updated while writing, read the updates again
+				continue
+
+
+def add_updates_since(buckets, fields_before, fields_after):
+	"""`buckets` with the changes between two reads of the rollup hash added"""
+	if BUILT_FIELD in fields_before and BUILT_FIELD not in fields_after:
+		# cleared or evicted in between, everything left was added since
+		fields_before = {}
+
+	buckets = dict(buckets)
+	for field, value in fields_after.items():
+		if field.startswith(b"s|"):
+			change = flt(value) - flt(fields_before.get(field))
+		elif field.startswith(b"c|"):
+			change = cint(value) - cint(fields_before.get(field))
+		else:
+			continue
+
+		if change:
+			buckets[field] = buckets.get(field, 0) + change
+
+	return buckets
+
+
+def rebuild_rollups():
+	"""Build all rollups again, dropping the rollups that were not read recently or can't
+	be built anymore"""
+	if not frappe.conf.dashboard_rollups:
+		return
+
+	cache = frappe.cache()
+	expiry_days = cint(frappe.conf.dashboard_rollup_expiry_days) or DEFAULT_EXPIRY_DAYS
+	expired = time.time() - expiry_days * 86400
+	last_used = {
+		frappe.safe_decode(key): cint(value)
+		for key, value in cache.hscan_iter(cache.make_key(LAST_USED_KEY))
+	}
+
+	for doctype, sources in cache.hgetall(SOURCES_KEY).items():
+		doctype = frappe.safe_decode(doctype)
+		for source in list(sources.values()):
+			if last_used.get(source.key, 0) < expired:
+				# not read recently, like rollups of dynamic date filters that change daily
+				del sources[source.key]
+				clear_rollup(source.key)
+				continue
+
+			try:
+				build_rollup(source)
+			except Exception:
+				frappe.log_error(title="Dashboard Rollup build failed for {0}".format(doctype))
+				del sources[source.key]
+				clear_rollup(source.key)
+
+		if sources:
+			cache.hset(SOURCES_KEY, doctype, sources)
+		else:
+			cache.hdel(SOURCES_KEY, doctype)
+
+
+def clear_rollups():
+	"""Remove all rollups, they are registered again as charts and cards ask for them"""
+	for sources in frappe.cache().hgetall(SOURCES_KEY).values():
+		for key in sources:
+			clear_rollup(key)
+
+	frappe.cache().delete_value(SOURCES_KEY)
+
+
+def clear_rollup(key):
+	frappe.cache().delete_value(ROLLUP_KEY.format(key))
+	frappe.cache().hdel(LAST_USED_KEY, key)
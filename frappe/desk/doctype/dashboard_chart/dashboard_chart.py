@@ -6,11 +6,13 @@ from __future__ import unicode_literals
 
 import datetime
 import json
+import time
 
 import frappe
 from frappe import _
 from frappe.boot import get_allowed_report_names
 from frappe.config import get_modules_from_all_apps_for_user
+from frappe.desk.dashboard_rollup import get_aggregate, get_rollup
 from frappe.model.document import Document
 from frappe.model.naming import append_number_if_name_exists
 from frappe.modules.export_file import export_to_files
@@ -208,17 +210,21 @@ def get_chart_config(chart, filters, timespan, timegrain, from_date, to_date):
 	from_date = from_date.strftime("%Y-%m-%d")
 	to_date = to_date
 
-	filters.append([doctype, datefield, ">=", from_date, False])
-	filters.append([doctype, datefield, "<=", to_date, False])
+	rollup = get_rollup(doctype, filters, datefield=datefield, value_field=chart.value_based_on)
+	if rollup:
+		data = rollup.get_daily_totals(from_date, to_date)
+	else:
+		filters.append([doctype, datefield, ">=", from_date, False])
+		filters.append([doctype, datefield, "<=", to_date, False])
 
-	data = frappe.db.get_list(
-		doctype,
-		fields=["{} as _unit".format(datefield), "SUM({})".format(value_field), "COUNT(*)"],
-		filters=filters,
-		group_by="_unit",
-		order_by="_unit asc",
-		as_list=True,
-	)
+		data = frappe.db.get_list(
+			doctype,
+			fields=["{} as _unit".format(datefield), "SUM({})".format(value_field), "COUNT(*)"],
+			filters=filters,
+			group_by="_unit",
+			order_by="_unit asc",
+			as_list=True,
+		)
 
 	result = get_result(data, timegrain, from_date, to_date, chart.chart_type)
 
@@ -242,6 +248,17 @@ def get_heatmap_chart_config(chart, filters, heatmap_year):
 	year_start_date = datetime.date(year, 1, 1).strftime("%Y-%m-%d")
 	next_year_start_date = datetime.date(year + 1, 1, 1).strftime("%Y-%m-%d")
 
+	rollup = get_rollup(doctype, filters, datefield=datefield, value_field=chart.value_based_on)
+	if rollup:
+		days = rollup.get_daily_totals(year_start_date, datetime.date(year, 12, 31))
+		return {
+			"labels": [],
+			"dataPoints": {
+				cint(time.mktime(day.timetuple())): get_aggregate(aggregate_function, total, count)
+				for day, total, count in days
+			},
+		}
+
 	filters.append([doctype, datefield, ">", "{date}".format(date=year_start_date), False])
 	filters.append([doctype, datefield, "<", "{date}".format(date=next_year_start_date), False])
 
@@ -281,19 +298,20 @@ def get_group_by_chart_config(chart, filters):
 	group_by_field = chart.group_by_based_on
 	doctype = chart.document_type
 
-	data = frappe.db.get_list(
+	rollup = get_rollup(
 		doctype,
-		fields=[
-			"{} as name".format(group_by_field),
-			"{aggregate_function}({value_field}) as count".format(
-				aggregate_function=aggregate_function, value_field=value_field
-			),
-		],
-		filters=filters,
-		group_by=group_by_field,
-		order_by="count desc",
-		ignore_ifnull=True,
+		filters,
+		value_field=chart.aggregate_function_based_on,
+		group_by_field=group_by_field,
 	)
+	if rollup:
+		data = [
+			{"name": group, "count": get_aggregate(aggregate_function, total, count)}
+			for group, total, count in rollup.get_group_totals()
+		]
+		data.sort(key=lambda item: item["count"], reverse=True)
+	else:
+		data = get_group_by_data(doctype, filters, group_by_field, aggregate_function, value_field)
 
 	if data:
 		chart_config = {
@@ -306,6 +324,22 @@ def get_group_by_chart_config(chart, filters):
 		return None
 
 
+def get_group_by_data(doctype, filters, group_by_field, aggregate_function, value_field):
+	return frappe.db.get_list(
+		doctype,
+		fields=[
+			"{} as name".format(group_by_field),
+			"{aggregate_function}({value_field}) as count".format(
+				aggregate_function=aggregate_function, value_field=value_field
+			),
+		],
+		filters=filters,
+		group_by=group_by_field,
+		order_by="count desc",
+		ignore_ifnull=True,
+	)
+
+
 def get_aggregate_function(chart_type):
 	return {
 		"Sum": "SUM",
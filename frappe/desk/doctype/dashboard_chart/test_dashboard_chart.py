@@ -11,6 +11,14 @@ from unittest.mock import patch
 from dateutil.relativedelta import relativedelta
 
 import frappe
+from frappe.desk.dashboard_rollup import (
+	SOURCES_KEY,
+	build_rollup,
+	clear_rollups,
+	flush_updates,
+	get_bucket_field,
+	get_pending_updates,
+)
 from frappe.desk.doctype.dashboard_chart.dashboard_chart import get
 from frappe.tests.utils import FrappeTestCase
 from frappe.utils import formatdate, get_last_day, getdate
@@ -268,6 +276,104 @@ class TestDashboardChart(FrappeTestCase):
 				sorted(result.get("labels")), sorted(["01-19-2019", "01-05-2019", "01-12-2019"])
 			)
 
+	def test_dashboard_chart_rollup(self):
+		insert_test_records()
+		frappe.delete_doc_if_exists("Dashboard Chart", "Test Rollup Dashboard Chart")
+		frappe.delete_doc_if_exists("Dashboard Chart", "Test Rollup Group By Dashboard Chart")
+
+		frappe.get_doc(
+			dict(
+				doctype="Dashboard Chart",
+				chart_name="Test Rollup Dashboard Chart",
+				chart_type="Sum",
+				document_type="Communication",
+				based_on="communication_date",
+				value_based_on="rating",
+				timespan="Select Date Range",
+				time_interval="Weekly",
+				from_date=datetime(2018, 12, 30),
+				to_date=datetime(2019, 1, 15),
+				filters_json="[]",
+				timeseries=1,
+			)
+		).insert()
+		frappe.get_doc(
+			dict(
+				doctype="Dashboard Chart",
+				chart_name="Test Rollup Group By Dashboard Chart",
+				chart_type="Group By",
+				document_type="ToDo",
+				group_by_based_on="status",
+				filters_json="[]",
+			)
+		).insert()
+
+		live_group_by = get(chart_name="Test Rollup Group By Dashboard Chart", refresh=1)
+
+		clear_rollups()
+		self.addCleanup(clear_rollups)
+
+		with patch.dict(frappe.conf, {"dashboard_rollups": 1}), patch.object(
+			frappe.utils.data, "get_first_day_of_the_week", return_value="Monday"
+		):
+			# rollups are built the first time they are asked for
+			result = get(chart_name="Test Rollup Dashboard Chart", refresh=1)
+			self.assertEqual(result.get("datasets")[0].get("values"), [50.0, 300.0, 800.0, 0.0])
+			get(chart_name="Test Rollup Group By Dashboard Chart", refresh=1)
+
+			# read from the rollup, without the live query
+			with patch(
+				"frappe.desk.doctype.dashboard_chart.dashboard_chart.get_group_by_data"
+			) as get_group_by_data:
+				result = get(chart_name="Test Rollup Group By Dashboard Chart", refresh=1)
+				self.assertEqual(get_group_counts(result), get_group_counts(live_group_by))
+				get_group_by_data.assert_not_called()
+
+			# evicted rollups are read live and built again, not read as empty
+			frappe.cache().delete_keys("dashboard_rollup|")
+
+			result = get(chart_name="Test Rollup Dashboard Chart", refresh=1)
+			self.assertEqual(result.get("datasets")[0].get("values"), [50.0, 300.0, 800.0, 0.0])
+
+			# documents are moved between buckets as they change
+			create_new_communication("Communication 7", datetime(2019, 1, 14), 25)
+			communication = frappe.get_doc("Communication", {"subject": "Communication 1"})
+			communication.communication_date = datetime(2019, 1, 9)
+			communication.save()
+			flush_updates()
+
+			result = get(chart_name="Test Rollup Dashboard Chart", refresh=1)
+			self.assertEqual(result.get("datasets")[0].get("values"), [0.0, 300.0, 850.0, 25.0])
+
+			frappe.delete_doc("Communication", communication.name)
+			frappe.delete_doc(
+				"Communication", frappe.db.get_value("Communication", {"subject": "Communication 7"})
+			)
+			flush_updates()
+
+			result = get(chart_name="Test Rollup Dashboard Chart", refresh=1)
+			self.assertEqual(result.get("datasets")[0].get("values"), [0.0, 300.0, 800.0, 0.0])
+
+			# updates written while a rollup is built are not overwritten by the build
+			source = list(frappe.cache().hget(SOURCES_KEY, "Communication").values())[0]
+			get_all = frappe.get_all
+
+			def get_all_and_update(*args, **kwargs):
+				rows = get_all(*args, **kwargs)
+				get_pending_updates().add(source.key, get_bucket_field("2019-01-14", None), 25, 1)
+				flush_updates()
+				return rows
+
+			with patch.object(frappe, "get_all", side_effect=get_all_and_update):
+				build_rollup(source)
+
+			result = get(chart_name="Test Rollup Dashboard Chart", refresh=1)
+			self.assertEqual(result.get("datasets")[0].get("values"), [0.0, 300.0, 800.0, 25.0])
+
+
+def get_group_counts(result):
+	return sorted(zip(result.get("labels"), result.get("datasets")[0].get("values")))
+
 
 def insert_test_records():
 	create_new_communication("Communication 1", datetime(2018, 12, 30), 50)
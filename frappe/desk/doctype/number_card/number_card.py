@@ -8,6 +8,7 @@ import frappe
 from frappe import _
 from frappe.boot import get_allowed_report_names
 from frappe.config import get_modules_from_all_apps_for_user
+from frappe.desk.dashboard_rollup import get_aggregate, get_rollup
 from frappe.model.document import Document
 from frappe.model.naming import append_number_if_name_exists
 from frappe.modules.export_file import export_to_files
@@ -132,6 +133,15 @@ def get_result(doc, filters, to_date=None):
 	if not filters:
 		filters = []
 
+	if not to_date and function in ("count", "sum", "avg"):
+		rollup = get_rollup(
+			doc.document_type,
+			filters,
+			value_field=doc.aggregate_function_based_on if function != "count" else None,
+		)
+		if rollup:
+			return cint(get_aggregate(function, *rollup.get_total()))
+
 	if to_date:
 		filters.append([doc.document_type, "creation", "<", to_date])
 
@@ -374,15 +374,16 @@ def export_query():
 
 		columns = get_columns_dict(data.columns)
 
+		from frappe.utils.export_file import get_temp_file, send_file
 		from frappe.utils.xlsxutils import make_xlsx
 
 		data["result"] = handle_duration_fieldtype_values(data.get("result"), data.get("columns"))
 		xlsx_data, column_widths = build_xlsx_data(columns, data, visible_idx, include_indentation)
-		xlsx_file = make_xlsx(xlsx_data, "Query Report", column_widths=column_widths)
+		xlsx_file = make_xlsx(
+			xlsx_data, "Query Report", column_widths=column_widths, file=get_temp_file()
+		)
 
-		frappe.response["filename"] = report_name + ".xlsx"
-		frappe.response["filecontent"] = xlsx_file.getvalue()
-		frappe.response["type"] = "binary"
+		send_file(xlsx_file, report_name + ".xlsx")
 
 
 def handle_duration_fieldtype_values(result, columns):
@@ -420,6 +421,7 @@ def handle_duration_fieldtype_values(result, columns):
 def build_xlsx_data(columns, data, visible_idx, include_indentation, ignore_visible_idx=False):
 	result = [[]]
 	column_widths = []
+	visible_idx = set(visible_idx or ())
 
 	for column in data.columns:
 		if column.get("hidden"):
@@ -589,13 +591,15 @@ def get_filtered_data(ref_doctype, columns, data, user):
 	result = []
 	linked_doctypes = get_linked_doctypes(columns, data)
 	match_filters_per_doctype = get_user_match_filters(linked_doctypes, user=user)
-	shared = frappe.share.get_shared(ref_doctype, user)
+	shared = set(frappe.share.get_shared(ref_doctype, user))
 	columns_dict = get_columns_dict(columns)
 
 	role_permissions = get_role_permissions(frappe.get_meta(ref_doctype), user)
 	if_owner = role_permissions.get("if_owner", {}).get("report")
 
 	if match_filters_per_doctype:
+		denied_values = get_denied_values(data, linked_doctypes, match_filters_per_doctype, columns_dict)
+
 		for row in data:
 			# Why linked_doctypes.get(ref_doctype)? because if column is empty, linked_doctypes[ref_doctype] is removed
 			if linked_doctypes.get(ref_doctype) and shared and row[linked_doctypes[ref_doctype]] in shared:
@@ -609,6 +613,7 @@ def get_filtered_data(ref_doctype, columns, data, user):
 				if_owner,
 				columns_dict,
 				user,
+				denied_values,
 			):
 				result.append(row)
 	else:
@@ -625,6 +630,7 @@ def has_match(
 	if_owner,
 	columns_dict,
 	user,
+	denied_values=None,
 ):
 	"""Returns True if after evaluating permissions for each linked doctype
 	- There is an owner match for the ref_doctype
@@ -636,6 +642,9 @@ def has_match(
 	Each doctype could have multiple conflicting user permission doctypes.
 	Hence even if one of the sets allows a match, it is true.
 	This behavior is equivalent to the trickling of user permissions of linked doctypes to the ref doctype.
+
+	Pass `denied_values` from `get_denied_values` to check the values of the row with set
+	lookups, instead of checking if each value that is not allowed exists.
 	"""
 	resultant_match = True
 
@@ -653,24 +662,25 @@ def has_match(
 				matched_for_doctype = True
 
 		if not matched_for_doctype:
-			for match_filters in filter_list:
+			for i, match_filters in enumerate(filter_list):
 				match = True
 				for dt, idx in linked_doctypes.items():
 					# case handled above
 					if dt == "User" and columns_dict[idx] == columns_dict.get("owner"):
 						continue
 
-					cell_value = None
-					if isinstance(row, dict):
-						cell_value = row.get(idx)
-					elif isinstance(row, (list, tuple)):
-						cell_value = row[idx]
-
-					if (
-						dt in match_filters
-						and cell_value not in match_filters.get(dt)
-						and frappe.db.exists(dt, cell_value)
-					):
+					cell_value = get_cell_value(row, idx)
+
+					if denied_values is not None:
+						denied = cell_value in denied_values[doctype][i].get(dt, ())
+					else:
+						denied = (
+							dt in match_filters
+							and cell_value not in match_filters.get(dt)
+							and frappe.db.exists(dt, cell_value)
+						)
+
+					if denied:
 						match = False
 						break
 
@@ -690,6 +700,81 @@ def has_match(
 	return resultant_match
 
 
+def get_denied_values(data, linked_doctypes, doctype_match_filters, columns_dict):
+	"""Values of the link columns that fail each set of match filters, i.e. values that are
+	not allowed by the set but exist. Returns `{doctype: [{linked doctype: values}]}`, in the
+	order of the match filters of each doctype.
+
+	Only the distinct values of each column are checked, the values that exist are found
+	with one query per batch of values.
+	"""
+	column_values = {}
+	for dt, idx in linked_doctypes.items():
+		# owner is matched by `has_match`
+		if dt == "User" and columns_dict[idx] == columns_dict.get("owner"):
+			continue
+
+		column_values[dt] = {get_cell_value(row, idx) for row in data if row}
+
+	existing_values = {dt: set() for dt in column_values}
+	checked_values = {dt: set() for dt in column_values}
+
+	denied_values = {}
+	for doctype, filter_list in doctype_match_filters.items():
+		denied_values[doctype] = []
+		for match_filters in filter_list:
+			denied = {}
+			for dt, values in column_values.items():
+				if dt not in match_filters:
+					continue
+
+				not_allowed = values - set(match_filters[dt])
+				unchecked = not_allowed - checked_values[dt]
+				if unchecked:
+					existing_values[dt] |= get_existing_values(dt, unchecked)
+					checked_values[dt] |= unchecked
+
+				denied[dt] = not_allowed & existing_values[dt]
+
+			denied_values[doctype].append(denied)
+
+	return denied_values
+
+
+def get_existing_values(doctype, values):
+	"""Values that `frappe.db.exists(doctype, value)` is true for"""
+	names, others = [], []
+	for value in values:
+		if value and isinstance(value, string_types):
+			names.append(value)
+		else:
+			others.append(value)
+
+	# names compare case insensitive on MariaDB
+	normalize = (lambda v: v.lower()) if frappe.db.db_type == "mariadb" else (lambda v: v)
+
+	if frappe.get_meta(doctype).issingle:
+		# singles have no table, `frappe.db.exists` only matches their own name
+		others.extend(names)
+		names = []
+
+	existing = set()
+	for batch in frappe.utils.create_batch(names, 1000):
+		found = frappe.get_all(doctype, filters={"name": ("in", batch)}, pluck="name")
+		found = {normalize(cstr(name)) for name in found}
+		existing.update(name for name in batch if normalize(name) in found)
+
+	existing.update(value for value in others if frappe.db.exists(doctype, value))
+	return existing
+
+
+def get_cell_value(row, idx):
+	if isinstance(row, dict):
+		return row.get(idx)
+	elif isinstance(row, (list, tuple)):
+		return row[idx]
+
+
 def get_linked_doctypes(columns, data):
 	linked_doctypes = {}
 
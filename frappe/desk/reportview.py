@@ -7,7 +7,7 @@ from __future__ import unicode_literals
 
 import json
 
-from six import StringIO, string_types
+from six import string_types
 from six.moves import range
 
 import frappe
@@ -17,7 +17,13 @@ from frappe.core.doctype.access_log.access_log import make_access_log
 from frappe.model import default_fields, optional_fields
 from frappe.model.base_document import get_controller
 from frappe.model.db_query import DatabaseQuery
-from frappe.utils import cstr, format_duration
+from frappe.utils import format_duration
+from frappe.utils.export_file import (
+	enqueue_export,
+	get_temp_file,
+	send_file,
+	should_export_in_background,
+)
 
 
 @frappe.whitelist()
@@ -356,47 +362,100 @@ def export_query():
 		filters=form_params.filters,
 	)
 
-	db_query = DatabaseQuery(doctype)
-	ret = db_query.execute(**form_params)
+	extension = "csv" if file_format_type == "CSV" else "xlsx"
+	filename = "{0}.{1}".format(title, extension)
+	export_kwargs = dict(
+		doctype=doctype,
+		form_params=form_params,
+		file_format_type=file_format_type,
+		add_totals_row=add_totals_row,
+	)
 
-	if add_totals_row:
-		ret = append_totals_row(ret)
+	if should_export_in_background(get_export_row_count(doctype, form_params)):
+		enqueue_export("frappe.desk.reportview.write_export", filename, **export_kwargs)
+		return
 
-	data = [["Sr"] + get_labels(db_query.fields, doctype)]
-	for i, row in enumerate(ret):
-		data.append([i + 1] + list(row))
+	f = get_temp_file()
+	write_export(f, **export_kwargs)
+	send_file(f, filename)
 
-	data = handle_duration_fieldtype_values(doctype, data, db_query.fields)
 
-	if file_format_type == "CSV":
+def write_export(f, doctype, form_params, file_format_type, add_totals_row=None):
+	"""Write the rows of a report builder export to a binary file as they are fetched"""
+	db_query = DatabaseQuery(doctype)
+	ret = db_query.execute(**form_params, as_iterator=True)
+
+	if add_totals_row:
+		ret = iter_with_totals_row(ret)
 
-		# convert to csv
-		import csv
+	data = get_export_rows(doctype, db_query.fields, ret)
 
+	if file_format_type == "CSV":
+		from frappe.utils.csvutils import write_csv
 		from frappe.utils.xlsxutils import handle_html
 
-		f = StringIO()
-		writer = csv.writer(f)
-		for r in data:
-			# encode only unicode type strings and not int, floats etc.
-			writer.writerow(
+		# encode only unicode type strings and not int, floats etc.
+		write_csv(
+			(
 				[handle_html(frappe.as_unicode(v)) if isinstance(v, string_types) else v for v in r]
-			)
-
-		f.seek(0)
-		frappe.response["result"] = cstr(f.read())
-		frappe.response["type"] = "csv"
-		frappe.response["doctype"] = title
+				for r in data
+			),
+			f,
+		)
 
 	elif file_format_type == "Excel":
-
 		from frappe.utils.xlsxutils import make_xlsx
 
-		xlsx_file = make_xlsx(data, doctype)
+		make_xlsx(data, doctype, file=f)
+
+
+def get_export_row_count(doctype, form_params):
+	# Postgres rejects ordering the count by a column of the report
+	count_params = frappe._dict(
+		form_params,
+		fields=["count(`tab{0}`.name)".format(doctype)],
+		group_by=None,
+		order_by=None,
+		as_list=True,
+	)
+	count_params.pop("with_comment_count", None)
+	return execute(doctype, **count_params)[0][0]
+
+
+def get_export_rows(doctype, fields, rows):
+	"""Lazily yield the header and the numbered, formatted rows of an export."""
+	yield ["Sr"] + get_labels(fields, doctype)
+
+	duration_fields = get_duration_fields(doctype, fields)
+	for i, row in enumerate(rows):
+		row = [i + 1] + list(row)
+		for index, df in duration_fields:
+			if row[index]:
+				row[index] = format_duration(row[index], df.hide_days)
+		yield row
 
-		frappe.response["filename"] = title + ".xlsx"
-		frappe.response["filecontent"] = xlsx_file.getvalue()
-		frappe.response["type"] = "binary"
+
+def iter_with_totals_row(rows):
+	"""Yield rows followed by a row with totals of the numeric columns."""
+	totals = None
+
+	for row in rows:
+		if totals is None:
+			totals = [""] * len(row)
+
+		for i in range(len(row)):
+			if isinstance(row[i], (float, int)):
+				totals[i] = (totals[i] or 0) + row[i]
+
+		yield row
+
+	if totals is None:
+		return
+
+	if not isinstance(totals[0], (int, float)):
+		totals[0] = "Total"
+
+	yield totals
 
 
 def append_totals_row(data):
@@ -443,7 +502,9 @@ def get_labels(fields, doctype):
 	return labels
 
 
-def handle_duration_fieldtype_values(doctype, data, fields):
+def get_duration_fields(doctype, fields):
+	"""Returns `(index in export row, docfield)` of the Duration fields in `fields`."""
+	duration_fields = []
 	for field in fields:
 		key = field.split(" as ")[0]
 
@@ -459,12 +520,18 @@ def handle_duration_fieldtype_values(doctype, data, fields):
 		df = frappe.get_meta(parenttype).get_field(fieldname)
 
 		if df and df.fieldtype == "Duration":
-			index = fields.index(field) + 1
-			for i in range(1, len(data)):
-				val_in_seconds = data[i][index]
-				if val_in_seconds:
-					duration_val = format_duration(val_in_seconds, df.hide_days)
-					data[i][index] = duration_val
+			duration_fields.append((fields.index(field) + 1, df))
+
+	return duration_fields
+
+
+def handle_duration_fieldtype_values(doctype, data, fields):
+	for index, df in get_duration_fields(doctype, fields):
+		for i in range(1, len(data)):
+			val_in_seconds = data[i][index]
+			if val_in_seconds:
+				duration_val = format_duration(val_in_seconds, df.hide_days)
+				data[i][index] = duration_val
 	return data
 
 
@@ -7,6 +7,7 @@ import json
 import quopri
 import smtplib
 import sys
+import time
 from email.parser import Parser
 
 from html2text import html2text
@@ -20,6 +21,7 @@ from frappe.email.email_body import add_attachment, get_email, get_formatted_htm
 from frappe.email.smtp import SMTPServer, get_outgoing_email_account
 from frappe.utils import (
 	add_days,
+	add_to_date,
 	cint,
 	cstr,
 	get_hook_method,
@@ -32,6 +34,18 @@ from frappe.utils import (
 from frappe.utils.verified_command import get_signed_params, verify_request
 
 
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_BATCH_JOBS = 4
+# seconds a batch job keeps claiming emails, below the timeout of the short queue
+DEFAULT_BATCH_TIME = 240
+# minutes after which emails left in Sending by a killed batch are queued again
+STALE_SENDING_MINUTES = 15
+# columns of Email Queue that `send_one` needs
+EMAIL_QUEUE_FIELDS = """name, status, communication, message, sender, reference_doctype,
+	reference_name, unsubscribe_param, unsubscribe_method, expose_recipients,
+	show_as_cc, add_unsubscribe_link, attachments, retry"""
+
+
 class EmailLimitCrossedError(frappe.ValidationError):
 	pass
 
@@ -409,33 +423,42 @@ def flush(from_test=False):
 		msgprint(_("Emails are muted"))
 		from_test = True
 
+	if cint(frappe.db.get_default("suspend_email_queue")) == 1:
+		return
+
+	reclaim_stale_emails(auto_commit=auto_commit)
+	queue = get_queue()
+
+	if from_test:
+		for email in queue:
+			if cint(frappe.db.get_default("suspend_email_queue")) == 1:
+				break
+			send_one(email.name, auto_commit)
+		return
+
 	try:
 		queued_jobs = set(get_jobs(site=frappe.local.site, key="job_name")[frappe.local.site])
 	except Exception:
 		queued_jobs = set()
 
-	for email in get_queue():
-
-		if cint(frappe.db.get_default("suspend_email_queue")) == 1:
-			break
-
-		if email.name:
-			job_name = f"email_queue_sendmail_{email.name}"
-
-			if from_test:
-				send_one(email.name, auto_commit)
-			else:
-				if job_name in queued_jobs:
-					frappe.logger().debug(f"Not queueing job {job_name} because it is in queue already")
-					continue
-
-				send_one_args = {
-					"email": email.name,
-					"auto_commit": auto_commit,
-				}
-				enqueue(
-					method="frappe.email.queue.send_one", queue="short", job_name=job_name, **send_one_args
-				)
+	# batches claim their emails when they run, so jobs are numbered and not per email
+	batch_size = get_email_batch_size()
+	batch_jobs = min(
+		cint(frappe.conf.email_queue_batch_jobs) or DEFAULT_BATCH_JOBS,
+		(len(queue) + batch_size - 1) // batch_size,
+	)
+	for i in range(batch_jobs):
+		job_name = f"email_queue_send_batch_{i}"
+		if job_name in queued_jobs:
+			frappe.logger().debug(f"Not queueing job {job_name} because it is in queue already")
+			continue
+
+		enqueue(
+			method="frappe.email.queue.send_batch",
+			queue="short",
+			job_name=job_name,
+			batch_size=batch_size,
+		)
 
 
 def get_queue():
@@ -455,27 +478,235 @@ def get_queue():
 	)
 
 
-def send_one(email, smtpserver=None, auto_commit=True, now=False):
-	"""Send Email Queue with given smtpserver"""
+def get_email_batch_size():
+	return cint(frappe.conf.email_queue_batch_size) or DEFAULT_BATCH_SIZE
 
-	email = frappe.db.sql(
-		"""select
-			name, status, communication, message, sender, reference_doctype,
-			reference_name, unsubscribe_param, unsubscribe_method, expose_recipients,
-			show_as_cc, add_unsubscribe_link, attachments, retry
+
+def get_email_batch_time():
+	return cint(frappe.conf.email_queue_batch_time) or DEFAULT_BATCH_TIME
+
+
+def send_batch(batch_size=None, auto_commit=True):
+	"""Keep claiming batches of queued emails and sending them until the queue is empty
+	or `email_queue_batch_time` seconds have passed.
+
+	Emails are only claimed once per job, emails that failed or were held back by a
+	rate limit are left for the next job."""
+	batch_size = batch_size or get_email_batch_size()
+	started = now_datetime()
+	deadline = time.monotonic() + get_email_batch_time()
+
+	while time.monotonic() < deadline:
+		if frappe.are_emails_muted() or cint(frappe.db.get_default("suspend_email_queue")) == 1:
+			return
+
+		emails = claim_emails(batch_size, auto_commit=auto_commit, claimed_before=started)
+		if not emails:
+			return
+
+		send_claimed_emails(emails, auto_commit=auto_commit)
+
+
+def send_claimed_emails(emails, auto_commit=True):
+	"""Send claimed emails, grouped by outgoing Email Account.
+
+	Each account's emails are sent over a single SMTP connection and within the
+	account's `rate_limit` (emails per minute). Emails that are not sent because of
+	the rate limit are put back in the queue for the next batch."""
+	recipient_counts = get_unsent_recipient_counts([email.name for email in emails])
+	unsent = {email.name: email for email in emails}
+	smtpservers = []
+
+	try:
+		for email_account, account_emails in group_by_email_account(emails):
+			# set up once for all of the account's emails, `send_one` does not redo it for claimed ones
+			smtpserver = SMTPServer(email_account=email_account)
+			smtpservers.append(smtpserver)
+
+			for email in account_emails:
+				if cint(frappe.db.get_default("suspend_email_queue")) == 1:
+					return
+
+				if not check_email_rate_limit(email_account, recipient_counts.get(email.name, 1)):
+					break
+
+				send_one(email, smtpserver, auto_commit, claimed=True)
+				del unsent[email.name]
+
+	finally:
+		release_emails(unsent.values(), auto_commit=auto_commit)
+		for smtpserver in smtpservers:
+			smtpserver.quit()
+
+
+def claim_emails(limit, auto_commit=True, claimed_before=None):
+	"""Mark up to `limit` queued emails as Sending and return them (with their previous status).
+
+	Rows locked by a concurrent batch are skipped where the database supports it, so
+	parallel batches claim different emails instead of waiting for each other.
+
+	:param claimed_before: Skip emails modified after this, i.e. already attempted."""
+	skip_locked = " skip locked" if supports_skip_locked() else ""
+	modified_condition = " and modified < %(claimed_before)s" if claimed_before else ""
+	emails = frappe.db.sql(
+		"""select {fields}
 		from
 			`tabEmail Queue`
 		where
-			name=%s
-		for update""",
-		email,
+			(status='Not Sent' or status='Partially Sent') and
+			(send_after is null or send_after < %(now)s){modified_condition}
+		order
+			by priority desc, creation asc
+		limit {limit}
+		for update{skip_locked}""".format(
+			fields=EMAIL_QUEUE_FIELDS,
+			modified_condition=modified_condition,
+			limit=cint(limit),
+			skip_locked=skip_locked,
+		),
+		{"now": now_datetime(), "claimed_before": claimed_before},
 		as_dict=True,
 	)
 
-	if len(email):
-		email = email[0]
-	else:
-		return
+	if emails:
+		frappe.db.sql(
+			"""update `tabEmail Queue` set status='Sending', modified=%s where name in %s""",
+			(now_datetime(), tuple(email.name for email in emails)),
+		)
+
+	if auto_commit:
+		frappe.db.commit()
+
+	return emails
+
+
+def release_emails(emails, auto_commit=True):
+	"""Put claimed emails that were not attempted back in the queue with their previous status."""
+	names_by_status = {}
+	for email in emails:
+		names_by_status.setdefault(email.status, []).append(email.name)
+
+	for status, names in names_by_status.items():
+		frappe.db.sql(
+			"""update `tabEmail Queue` set status=%s where name in %s and status='Sending'""",
+			(status, tuple(names)),
+			auto_commit=auto_commit,
+		)
+
+
+def reclaim_stale_emails(auto_commit=True):
+	"""Queue emails again that were claimed by a batch job that never finished them,
+	e.g. because the worker was killed."""
+	cutoff = add_to_date(now_datetime(), minutes=-STALE_SENDING_MINUTES)
+
+	frappe.db.sql(
+		"""update `tabEmail Queue` set status='Partially Sent'
+		where status='Sending' and modified < %s and name in (
+			select parent from `tabEmail Queue Recipient` where status='Sent')""",
+		cutoff,
+	)
+	frappe.db.sql(
+		"""update `tabEmail Queue` set status='Not Sent'
+		where status='Sending' and modified < %s""",
+		cutoff,
+	)
+
+	if auto_commit:
+		frappe.db.commit()
+
+
+def supports_skip_locked():
+	"""`SKIP LOCKED` is supported by PostgreSQL, MariaDB 10.6+ and MySQL 8+"""
+	if frappe.db.db_type == "postgres":
+		return True
+
+	version = frappe.db.sql("select version()")[0][0]
+	major, minor = (cint(part) for part in version.split(".")[:2])
+	if "mariadb" in version.lower():
+		return (major, minor) >= (10, 6)
+
+	return major >= 8
+
+
+def get_unsent_recipient_counts(names):
+	return dict(
+		frappe.db.sql(
+			"""select parent, count(*) from `tabEmail Queue Recipient`
+			where parent in %s and status='Not Sent'
+			group by parent""",
+			(tuple(names),),
+		)
+	)
+
+
+def group_by_email_account(emails):
+	"""Returns `[(email_account, emails), ...]` in the order the accounts first appear"""
+	groups = {}
+	accounts = {}
+
+	for email in emails:
+		key = (email.reference_doctype, email.sender)
+		if key not in accounts:
+			# the outgoing account cache falls back to "default" for any sender, see `send_one`
+			frappe.local.outgoing_email_account = {}
+			accounts[key] = get_outgoing_email_account(
+				raise_exception_not_set=False, append_to=email.reference_doctype, sender=email.sender
+			)
+
+		email_account = accounts[key]
+		account_name = email_account.name if email_account else None
+		groups.setdefault(account_name, (email_account, []))[1].append(email)
+
+	return list(groups.values())
+
+
+def check_email_rate_limit(email_account, count):
+	"""Count `count` emails against the account's emails per minute, `False` if that
+	would exceed its `rate_limit`. An email is never held back in an unused minute."""
+	rate_limit = cint(email_account.get("rate_limit")) if email_account else 0
+	if not rate_limit:
+		return True
+
+	cache = frappe.cache()
+	key = cache.make_key(
+		"email_rate_limit:{0}:{1}".format(email_account.name, int(time.time() // 60))
+	)
+
+	pipeline = cache.pipeline()
+	pipeline.incrby(key, count)
+	pipeline.expire(key, 120)
+	sent = pipeline.execute()[0]
+
+	if sent > rate_limit and sent != count:
+		cache.decrby(key, count)
+		return False
+
+	return True
+
+
+def send_one(email, smtpserver=None, auto_commit=True, now=False, claimed=False):
+	"""Send Email Queue with given smtpserver
+
+	:param email: Email Queue name, or its row as returned by `claim_emails` if `claimed`.
+	:param claimed: Email is already marked as Sending by `send_batch`, and `smtpserver` is
+		set up for its email account."""
+
+	if not claimed:
+		email = frappe.db.sql(
+			"""select {fields}
+			from
+				`tabEmail Queue`
+			where
+				name=%s
+			for update""".format(fields=EMAIL_QUEUE_FIELDS),
+			email,
+			as_dict=True,
+		)
+
+		if len(email):
+			email = email[0]
+		else:
+			return
 
 	recipients_list = frappe.db.sql(
 		"""select name, recipient, status from
@@ -491,7 +722,9 @@ def send_one(email, smtpserver=None, auto_commit=True, now=False):
 	if cint(frappe.db.get_default("suspend_email_queue")) == 1:
 		return
 
-	if email.status not in ("Not Sent", "Partially Sent"):
+	if email.status not in ("Not Sent", "Partially Sent") and not (
+		claimed and email.status == "Sending"
+	):
 		# rollback to release lock and return
 		frappe.db.rollback()
 		return
@@ -506,6 +739,7 @@ def send_one(email, smtpserver=None, auto_commit=True, now=False):
 		frappe.get_doc("Communication", email.communication).set_delivery_status(commit=auto_commit)
 
 	email_sent_to_any_recipient = None
+	sent_recipients = []
 
 	try:
 		message = None
@@ -514,11 +748,12 @@ def send_one(email, smtpserver=None, auto_commit=True, now=False):
 			if not smtpserver:
 				smtpserver = SMTPServer()
 
-			# to avoid always using default email account for outgoing
-			if getattr(frappe.local, "outgoing_email_account", None):
-				frappe.local.outgoing_email_account = {}
+			if not claimed:
+				# to avoid always using default email account for outgoing
+				if getattr(frappe.local, "outgoing_email_account", None):
+					frappe.local.outgoing_email_account = {}
 
-			smtpserver.setup_email_account(email.reference_doctype, sender=email.sender)
+				smtpserver.setup_email_account(email.reference_doctype, sender=email.sender)
 
 		for recipient in recipients_list:
 			if recipient.status != "Not Sent":
@@ -534,12 +769,9 @@ def send_one(email, smtpserver=None, auto_commit=True, now=False):
 					smtpserver.sess.sendmail(email.sender, recipient.recipient, message)
 
 			recipient.status = "Sent"
-			frappe.db.sql(
-				"""update `tabEmail Queue Recipient` set status='Sent', modified=%s where name=%s""",
-				(now_datetime(), recipient.name),
-				auto_commit=auto_commit,
-			)
+			sent_recipients.append(recipient.name)
 
+		set_recipients_as_sent(sent_recipients, auto_commit)
 		email_sent_to_any_recipient = any("Sent" == s.status for s in recipients_list)
 
 		# if all are sent set status
@@ -575,8 +807,12 @@ def send_one(email, smtpserver=None, auto_commit=True, now=False):
 	):
 
 		# bad connection/timeout, retry later
+		if smtpserver:
+			# reconnect for the next email of the batch
+			smtpserver.quit()
 
-		if email_sent_to_any_recipient:
+		set_recipients_as_sent(sent_recipients, auto_commit)
+		if email_sent_to_any_recipient or sent_recipients:
 			frappe.db.sql(
 				"""update `tabEmail Queue` set status='Partially Sent', modified=%s where name=%s""",
 				(now_datetime(), email.name),
@@ -597,6 +833,8 @@ def send_one(email, smtpserver=None, auto_commit=True, now=False):
 
 	except Exception as e:
 		frappe.db.rollback()
+		set_recipients_as_sent(sent_recipients, auto_commit)
+		email_sent_to_any_recipient = email_sent_to_any_recipient or bool(sent_recipients)
 
 		if email.retry < get_email_retry_limit():
 			frappe.db.sql(
@@ -630,6 +868,15 @@ def send_one(email, smtpserver=None, auto_commit=True, now=False):
 		frappe.log_error(title="frappe.email.queue.flush")
 
 
+def set_recipients_as_sent(names, auto_commit=True):
+	if names:
+		frappe.db.sql(
+			"""update `tabEmail Queue Recipient` set status='Sent', modified=%s where name in %s""",
+			(now_datetime(), tuple(names)),
+			auto_commit=auto_commit,
+		)
+
+
 def prepare_message(email, recipient, recipients_list):
 	message = email.message
 	if not message:
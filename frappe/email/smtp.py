@@ -114,8 +114,11 @@ def get_default_outgoing_email_account(raise_exception_not_set=True):
 	 "auto_email_id": "emails@example.com",
 	 "email_sender_name": "Example Notifications",
 	 "always_use_account_email_id_as_sender": 0,
-	 "always_use_account_name_as_sender_name": 0
+	 "always_use_account_name_as_sender_name": 0,
+	 "mail_rate_limit": 0
 	}
+
+	`mail_rate_limit` (emails per minute) is set as `rate_limit` of the returned account.
 	"""
 	email_account = _get_email_account({"enable_outgoing": 1, "default_outgoing": 1})
 	if email_account:
@@ -141,6 +144,7 @@ def get_default_outgoing_email_account(raise_exception_not_set=True):
 				"always_use_account_name_as_sender_name": frappe.conf.get(
 					"always_use_account_name_as_sender_name", 0
 				),
+				"rate_limit": frappe.conf.get("mail_rate_limit"),
 			}
 		)
 		email_account.from_site_config = True
@@ -174,6 +178,7 @@ class SMTPServer:
 		append_to=None,
 		use_oauth=0,
 		access_token=None,
+		email_account=None,
 	):
 		# get defaults from mail settings
 
@@ -191,13 +196,19 @@ class SMTPServer:
 			self.password = password
 			self.use_oauth = use_oauth
 			self.access_token = access_token
+		elif email_account:
+			self.set_email_account(email_account)
 		else:
 			self.setup_email_account(append_to)
 
 	def setup_email_account(self, append_to=None, sender=None):
-		self.email_account = get_outgoing_email_account(
-			raise_exception_not_set=False, append_to=append_to, sender=sender
+		self.set_email_account(
+			get_outgoing_email_account(raise_exception_not_set=False, append_to=append_to, sender=sender)
 		)
+
+	def set_email_account(self, email_account):
+		"""Use `email_account` as returned by `get_outgoing_email_account`"""
+		self.email_account = email_account
 		if self.email_account:
 			self.server = self.email_account.smtp_server
 			self.login = getattr(self.email_account, "login_id", None) or self.email_account.email_id
@@ -289,3 +300,15 @@ class SMTPServer:
 		except smtplib.SMTPException:
 			frappe.msgprint(_("Unable to send emails at this time"))
 			raise
+
+	def quit(self):
+		"""Close the session if open, the next use of `sess` connects again"""
+		if not self._sess:
+			return
+
+		try:
+			self._sess.quit()
+		except (smtplib.SMTPException, _socket.error):
+			pass
+
+		self._sess = None
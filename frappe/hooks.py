@@ -154,6 +154,7 @@ doc_events = {
 			"frappe.desk.notifications.clear_doctype_notifications",
 			"frappe.workflow.doctype.workflow_action.workflow_action.process_workflow_actions",
 			"frappe.event_streaming.doctype.event_update_log.event_update_log.notify_consumers",
+			"frappe.desk.dashboard_rollup.remove_from_rollups",
 		],
 		"on_update_after_submit": [
 			"frappe.workflow.doctype.workflow_action.workflow_action.process_workflow_actions"
@@ -161,6 +162,7 @@ doc_events = {
 		"on_change": [
 			"frappe.social.doctype.energy_point_rule.energy_point_rule.process_energy_points",
 			"frappe.automation.doctype.milestone_tracker.milestone_tracker.evaluate_milestone",
+			"frappe.desk.dashboard_rollup.update_rollups",
 		],
 	},
 	"Event": {
@@ -197,6 +199,7 @@ scheduler_events = {
 		"frappe.integrations.doctype.razorpay_settings.razorpay_settings.capture_payment",
 		"frappe.utils.global_search.sync_global_search",
 		"frappe.monitor.flush",
+		"frappe.sessions.flush_session_updates",
 	],
 	"hourly": [
 		"frappe.model.utils.link_count.update_link_count",
@@ -231,6 +234,7 @@ scheduler_events = {
 		"frappe.integrations.doctype.s3_backup_settings.s3_backup_settings.take_backups_daily",
 		"frappe.email.doctype.auto_email_report.auto_email_report.send_daily",
 		"frappe.integrations.doctype.google_drive.google_drive.daily_backup",
+		"frappe.desk.dashboard_rollup.rebuild_rollups",
 	],
 	"weekly_long": [
 		"frappe.integrations.doctype.dropbox_settings.dropbox_settings.take_backups_weekly",
@@ -371,15 +375,23 @@ global_search_doctypes = {
 before_request = [
 	"frappe.recorder.record",
 	"frappe.monitor.start",
+	"frappe.query_profiler.start",
 	"frappe.rate_limiter.apply",
 ]
-after_request = ["frappe.rate_limiter.update", "frappe.monitor.stop", "frappe.recorder.dump"]
+after_request = [
+	"frappe.rate_limiter.update",
+	"frappe.query_profiler.stop",
+	"frappe.monitor.stop",
+	"frappe.recorder.dump",
+]
 
 # Background Job Hooks
 before_job = [
 	"frappe.monitor.start",
+	"frappe.query_profiler.start",
 ]
 after_job = [
+	"frappe.query_profiler.stop",
 	"frappe.monitor.stop",
 	"frappe.utils.file_lock.release_document_locks",
 ]
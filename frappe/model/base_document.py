@@ -4,6 +4,7 @@
 from __future__ import unicode_literals
 
 import datetime
+from functools import lru_cache
 
 from six import iteritems, string_types
 
@@ -391,8 +392,8 @@ class BaseDocument(object):
 		fieldname = [df.fieldname for df in self.meta.get_table_fields() if df.options == doctype]
 		return fieldname[0] if fieldname else None
 
-	def db_insert(self):
-		"""INSERT the document (with valid columns) in the database."""
+	def get_values_for_db_insert(self):
+		"""Set name and timestamps if missing and return the column values to be inserted."""
 		if not self.name:
 			# name will be set by document class in most cases
 			set_new_name(self)
@@ -402,21 +403,16 @@ class BaseDocument(object):
 			self.created_by = self.modified_by = frappe.session.user
 
 		# if doctype is "DocType", don't insert null values as we don't know who is valid yet
-		d = self.get_valid_dict(
+		return self.get_valid_dict(
 			convert_dates_to_str=True, ignore_nulls=self.doctype in DOCTYPES_FOR_DOCTYPE
 		)
 
-		columns = list(d)
+	def db_insert(self):
+		"""INSERT the document (with valid columns) in the database."""
+		d = self.get_values_for_db_insert()
+
 		try:
-			frappe.db.sql(
-				"""INSERT INTO `tab{doctype}` ({columns})
-					VALUES ({values})""".format(
-					doctype=self.doctype,
-					columns=", ".join(["`" + c + "`" for c in columns]),
-					values=", ".join(["%s"] * len(columns)),
-				),
-				list(d.values()),
-			)
+			frappe.db.sql(get_insert_query(self.doctype, tuple(d)), list(d.values()))
 		except Exception as e:
 			if frappe.db.is_primary_key_violation(e):
 				if self.meta.autoname == "hash":
@@ -457,16 +453,8 @@ class BaseDocument(object):
 		name = d["name"]
 		del d["name"]
 
-		columns = list(d)
-
 		try:
-			frappe.db.sql(
-				"""UPDATE `tab{doctype}`
-				SET {values} WHERE `name`=%s""".format(
-					doctype=self.doctype, values=", ".join(["`" + c + "`=%s" for c in columns])
-				),
-				list(d.values()) + [name],
-			)
+			frappe.db.sql(get_update_query(self.doctype, tuple(d)), list(d.values()) + [name])
 		except Exception as e:
 			if frappe.db.is_unique_key_violation(e):
 				self.show_unique_validation_message(e)
@@ -594,8 +582,49 @@ class BaseDocument(object):
 
 		return missing
 
-	def get_invalid_links(self, is_submittable=False):
-		"""Returns list of invalid links and also updates fetch values if not set"""
+	def get_links_to_validate(self):
+		"""Returns list of `(df, doctype, docname, fields_to_fetch)` for every Link and
+		Dynamic Link field that has a value"""
+		links = []
+
+		for df in self.meta.get_link_fields() + self.meta.get(
+			"fields", {"fieldtype": ("=", "Dynamic Link")}
+		):
+			docname = self.get(df.fieldname)
+
+			if not docname:
+				continue
+
+			if df.fieldtype == "Link":
+				doctype = df.options
+				if not doctype:
+					frappe.throw(_("Options not set for link field {0}").format(df.fieldname))
+			else:
+				doctype = self.get(df.options)
+				if not doctype:
+					frappe.throw(_("{0} must be set first").format(self.meta.get_label(df.options)))
+
+			# get a map of values ot fetch along with this link query
+			# that are mapped as link_fieldname.source_fieldname in Options of
+			# Readonly or Data or Text type fields
+
+			fields_to_fetch = [
+				_df
+				for _df in self.meta.get_fields_to_fetch(df.fieldname)
+				if not _df.get("fetch_if_empty")
+				or (_df.get("fetch_if_empty") and not self.get(_df.fieldname))
+			]
+
+			links.append((df, doctype, docname, fields_to_fetch))
+
+		return links
+
+	def get_invalid_links(self, is_submittable=False, link_values=None):
+		"""Returns list of invalid links and also updates fetch values if not set
+
+		:param is_submittable: check for cancelled links (parent is submittable).
+		:param link_values: values prefetched by `get_link_values`, fetched for this
+		        document alone if not passed."""
 
 		def get_msg(df, docname):
 			if self.parentfield:
@@ -605,70 +634,49 @@ class BaseDocument(object):
 
 		invalid_links = []
 		cancelled_links = []
+		is_submittable = is_submittable or self.meta.is_submittable
 
-		for df in self.meta.get_link_fields() + self.meta.get(
-			"fields", {"fieldtype": ("=", "Dynamic Link")}
-		):
-			docname = self.get(df.fieldname)
-
-			if docname:
-				if df.fieldtype == "Link":
-					doctype = df.options
-					if not doctype:
-						frappe.throw(_("Options not set for link field {0}").format(df.fieldname))
-				else:
-					doctype = self.get(df.options)
-					if not doctype:
-						frappe.throw(_("{0} must be set first").format(self.meta.get_label(df.options)))
-
-				# MySQL is case insensitive. Preserve case of the original docname in the Link Field.
-
-				# get a map of values ot fetch along with this link query
-				# that are mapped as link_fieldname.source_fieldname in Options of
-				# Readonly or Data or Text type fields
+		links = self.get_links_to_validate()
+		if link_values is None:
+			link_values = get_link_values(links, is_submittable)
 
-				fields_to_fetch = [
-					_df
-					for _df in self.meta.get_fields_to_fetch(df.fieldname)
-					if not _df.get("fetch_if_empty")
-					or (_df.get("fetch_if_empty") and not self.get(_df.fieldname))
-				]
-				if not frappe.get_meta(doctype).get("is_virtual"):
-					if not fields_to_fetch:
-						# cache a single value type
-						values = frappe._dict(name=frappe.db.get_value(doctype, docname, "name", cache=True))
-					else:
-						values_to_fetch = ["name"] + [_df.fetch_from.split(".")[-1] for _df in fields_to_fetch]
+		for df, doctype, docname, fields_to_fetch in links:
+			meta = frappe.get_meta(doctype)
 
-						# don't cache if fetching other values too
-						values = frappe.db.get_value(doctype, docname, values_to_fetch, as_dict=True)
+			if meta.get("is_virtual"):
+				values = frappe.get_doc(doctype, docname)
 
-				if frappe.get_meta(doctype).issingle:
-					values.name = doctype
+			elif meta.issingle:
+				values_to_fetch = ["name"] + [_df.fetch_from.split(".")[-1] for _df in fields_to_fetch]
+				values = frappe._dict(
+					frappe.db.get_value(doctype, docname, values_to_fetch, as_dict=True) or {}
+				)
+				values.name = doctype
 
-				if frappe.get_meta(doctype).get("is_virtual"):
-					values = frappe.get_doc(doctype, docname)
+			else:
+				# MySQL is case insensitive. Preserve case of the original docname in the Link Field.
+				values = link_values.get(doctype, {}).get(get_link_key(docname))
 
-				if values:
-					setattr(self, df.fieldname, values.name)
+			if not values:
+				invalid_links.append((df.fieldname, docname, get_msg(df, docname)))
+				continue
 
-					for _df in fields_to_fetch:
-						if self.is_new() or self.docstatus != 1 or _df.allow_on_submit:
-							self.set_fetch_from_value(doctype, _df, values)
+			setattr(self, df.fieldname, values.name)
 
-					notify_link_count(doctype, docname)
+			for _df in fields_to_fetch:
+				if self.is_new() or self.docstatus != 1 or _df.allow_on_submit:
+					self.set_fetch_from_value(doctype, _df, values)
 
-					if not values.name:
-						invalid_links.append((df.fieldname, docname, get_msg(df, docname)))
+			notify_link_count(doctype, docname)
 
-					elif (
-						df.fieldname != "amended_from"
-						and (is_submittable or self.meta.is_submittable)
-						and frappe.get_meta(doctype).is_submittable
-						and cint(frappe.db.get_value(doctype, docname, "docstatus")) == 2
-					):
+			if (
+				df.fieldname != "amended_from"
+				and is_submittable
+				and meta.is_submittable
+				and cint(values.docstatus) == 2
+			):
 
-						cancelled_links.append((df.fieldname, docname, get_msg(df, docname)))
+				cancelled_links.append((df.fieldname, docname, get_msg(df, docname)))
 
 		return invalid_links, cancelled_links
 
@@ -1095,6 +1103,62 @@ class BaseDocument(object):
 				extract_images_from_doc(self, df.fieldname)
 
 
+@lru_cache(maxsize=1024)
+def get_insert_query(doctype, columns):
+	"""Returns the `INSERT` statement for `columns` of `doctype`. The same text is returned
+	for every call so that it is parsed only once by `frappe.db.sql`."""
+	return "INSERT INTO `tab{doctype}` ({columns}) VALUES ({values})".format(
+		doctype=doctype,
+		columns=", ".join(["`" + c + "`" for c in columns]),
+		values=", ".join(["%s"] * len(columns)),
+	)
+
+
+@lru_cache(maxsize=1024)
+def get_update_query(doctype, columns):
+	"""Returns the `UPDATE` statement (by `name`) for `columns` of `doctype`."""
+	return "UPDATE `tab{doctype}` SET {values} WHERE `name`=%s".format(
+		doctype=doctype, values=", ".join(["`" + c + "`=%s" for c in columns])
+	)
+
+
+def get_link_key(docname):
+	"""Key to look up a link value in `get_link_values`, matches the way the database
+	compares names (MariaDB is case insensitive and ignores trailing spaces)."""
+	docname = cstr(docname)
+	if frappe.db.db_type == "postgres":
+		return docname
+	return docname.rstrip().lower()
+
+
+def get_link_values(links, is_submittable=False):
+	"""Fetch linked documents for a list of `(df, doctype, docname, fields_to_fetch)` as
+	returned by `BaseDocument.get_links_to_validate`.
+
+	All names (and `fetch_from` fields) of a doctype are fetched in a single query.
+	Returns `{doctype: {link_key: values}}`."""
+	to_fetch = {}
+	for df, doctype, docname, fields_to_fetch in links:
+		meta = frappe.get_meta(doctype)
+		if meta.issingle or meta.get("is_virtual"):
+			continue
+
+		names, fields = to_fetch.setdefault(doctype, (set(), {"name"}))
+		names.add(docname)
+		fields.update(_df.fetch_from.split(".")[-1] for _df in fields_to_fetch)
+		if is_submittable and meta.is_submittable:
+			fields.add("docstatus")
+
+	link_values = {}
+	for doctype, (names, fields) in to_fetch.items():
+		values = frappe.db.get_values(
+			doctype, {"name": ("in", list(names))}, list(fields), as_dict=True
+		)
+		link_values[doctype] = {get_link_key(d.name): d for d in values}
+
+	return link_values
+
+
 def _filter(data, filters, limit=None):
 	"""pass filters as:
 	{"key": "val", "key": ["!=", "val"],
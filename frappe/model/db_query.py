@@ -19,6 +19,7 @@ import frappe.permissions
 import frappe.share
 from frappe import _
 from frappe.core.doctype.server_script.server_script_utils import get_server_script_map
+from frappe.database.replica import use_replica
 from frappe.model import get_permitted_fields, optional_fields
 from frappe.model.meta import get_table_columns
 from frappe.model.utils.user_settings import get_user_settings, update_user_settings
@@ -47,6 +48,9 @@ STRICT_UNION_PATTERN = re.compile(r".*\s(union).*\s")
 ORDER_GROUP_PATTERN = re.compile(r".*[^a-z0-9-_ ,`'\"\.\(\)].*")
 FN_PARAMS_PATTERN = re.compile(r".*?\((.*)\).*")
 
+# user permission values beyond this are selected by a subquery instead of an IN list
+MAX_INLINE_USER_PERMISSIONS = 500
+
 
 class DatabaseQuery(object):
 	def __init__(self, doctype, user=None):
@@ -92,6 +96,7 @@ class DatabaseQuery(object):
 		strict=True,
 		pluck=None,
 		ignore_ddl=False,
+		as_iterator=False,
 	) -> List:
 		if (
 			not ignore_permissions
@@ -156,6 +161,7 @@ class DatabaseQuery(object):
 		self.return_query = return_query
 		self.strict = strict
 		self.ignore_ddl = ignore_ddl
+		self.as_iterator = as_iterator
 
 		# for contextual user permission check
 		# to determine which user permission is applicable on link field of specific doctype
@@ -174,7 +180,7 @@ class DatabaseQuery(object):
 		if return_query:
 			return result
 
-		if with_comment_count and not as_list and self.doctype:
+		if with_comment_count and not as_list and self.doctype and not as_iterator:
 			self.add_comment_count(result)
 
 		if save_user_settings:
@@ -182,6 +188,8 @@ class DatabaseQuery(object):
 			self.update_user_settings()
 
 		if pluck:
+			if as_iterator:
+				return (d[pluck] for d in result)
 			return [d[pluck] for d in result]
 
 		return result
@@ -210,13 +218,15 @@ class DatabaseQuery(object):
 		if self.return_query:
 			return query
 		else:
-			return frappe.db.sql(
-				query,
-				as_dict=not self.as_list,
-				debug=self.debug,
-				update=self.update,
-				ignore_ddl=self.ignore_ddl,
-			)
+			with use_replica("get_list"):
+				return frappe.db.sql(
+					query,
+					as_dict=not self.as_list,
+					debug=self.debug,
+					update=self.update,
+					ignore_ddl=self.ignore_ddl,
+					as_iterator=self.as_iterator,
+				)
 
 	def prepare_args(self):
 		self.parse_args()
@@ -790,44 +800,24 @@ class DatabaseQuery(object):
 
 	def build_match_conditions(self, as_condition=True):
 		"""add match conditions if applicable"""
-		self.match_filters = []
-		self.match_conditions = []
-		only_if_shared = False
 		if not self.user:
 			self.user = frappe.session.user
 
 		if not self.tables:
 			self.extract_tables()
 
-		meta = frappe.get_meta(self.doctype)
-		role_permissions = frappe.permissions.get_role_permissions(meta, user=self.user)
-		self.shared = frappe.share.get_shared(self.doctype, self.user)
+		predicate = self.get_permission_predicate()
+		self.shared = list(predicate.shared)
+		self.match_conditions = list(predicate.match_conditions)
+		self.match_filters = copy.deepcopy(predicate.match_filters)
+		only_if_shared = predicate.only_if_shared
 
-		if (
-			not meta.istable
-			and not (role_permissions.get("select") or role_permissions.get("read"))
-			and not self.flags.ignore_permissions
-			and not has_any_user_permission_for_doctype(self.doctype, self.user, self.reference_doctype)
-		):
-			only_if_shared = True
+		if only_if_shared:
 			if not self.shared:
 				frappe.throw(_("No permission to read {0}").format(_(self.doctype)), frappe.PermissionError)
 			else:
 				self.conditions.append(self.get_share_condition())
 
-		else:
-			# skip user perm check if owner constraint is required
-			if requires_owner_constraint(role_permissions):
-				self.match_conditions.append(
-					f"`tab{self.doctype}`.`owner` = {frappe.db.escape(self.user, percent=False)}"
-				)
-
-			# add user permission only if role has read perm
-			elif role_permissions.get("read") or role_permissions.get("select"):
-				# get user permissions
-				user_permissions = frappe.permissions.get_user_permissions(self.user)
-				self.add_user_permissions(user_permissions)
-
 		if as_condition:
 			conditions = ""
 			if self.match_conditions:
@@ -849,6 +839,53 @@ class DatabaseQuery(object):
 		else:
 			return self.match_filters
 
+	def get_permission_predicate(self):
+		"""Returns the role, share and user permission part of the match conditions of
+		`self.user`, cached per user until their permissions or shares change."""
+		key = (self.doctype, self.reference_doctype, bool(self.flags.ignore_permissions))
+		predicates = frappe.cache().hget("permission_predicates", self.user) or {}
+
+		if key not in predicates:
+			predicates[key] = self.compile_permission_predicate()
+			frappe.cache().hset("permission_predicates", self.user, predicates)
+
+		return predicates[key]
+
+	def compile_permission_predicate(self):
+		self.match_filters = []
+		self.match_conditions = []
+
+		meta = frappe.get_meta(self.doctype)
+		role_permissions = frappe.permissions.get_role_permissions(meta, user=self.user)
+		shared = frappe.share.get_shared(self.doctype, self.user)
+
+		only_if_shared = (
+			not meta.istable
+			and not (role_permissions.get("select") or role_permissions.get("read"))
+			and not self.flags.ignore_permissions
+			and not has_any_user_permission_for_doctype(self.doctype, self.user, self.reference_doctype)
+		)
+
+		if not only_if_shared:
+			# skip user perm check if owner constraint is required
+			if requires_owner_constraint(role_permissions):
+				self.match_conditions.append(
+					f"`tab{self.doctype}`.`owner` = {frappe.db.escape(self.user, percent=False)}"
+				)
+
+			# add user permission only if role has read perm
+			elif role_permissions.get("read") or role_permissions.get("select"):
+				# get user permissions
+				user_permissions = frappe.permissions.get_user_permissions(self.user)
+				self.add_user_permissions(user_permissions)
+
+		return frappe._dict(
+			shared=shared,
+			only_if_shared=only_if_shared,
+			match_conditions=self.match_conditions,
+			match_filters=self.match_filters,
+		)
+
 	def get_share_condition(self):
 		return """`tab{0}`.name in ({1})""".format(
 			self.doctype, ", ".join(["%s"] * len(self.shared))
@@ -904,10 +941,16 @@ class DatabaseQuery(object):
 						docs.append(permission.get("doc"))
 
 				if docs:
+					if len(docs) > MAX_INLINE_USER_PERMISSIONS and not frappe.get_meta(
+						df.get("options")
+					).is_nested_set():
+						# select large sets from `tabUser Permission` instead of inlining them
+						values = self.get_user_permission_subquery(df)
+					else:
+						values = ", ".join([(frappe.db.escape(doc, percent=False)) for doc in docs])
+
 					condition += "`tab{doctype}`.`{fieldname}` in ({values})".format(
-						doctype=self.doctype,
-						fieldname=df.get("fieldname"),
-						values=", ".join([(frappe.db.escape(doc, percent=False)) for doc in docs]),
+						doctype=self.doctype, fieldname=df.get("fieldname"), values=values
 					)
 
 					match_conditions.append("({condition})".format(condition=condition))
@@ -919,6 +962,22 @@ class DatabaseQuery(object):
 		if match_filters:
 			self.match_filters.append(match_filters)
 
+	def get_user_permission_subquery(self, df):
+		"""Query selecting the values of `self.user`'s user permissions on `df.options` that
+		apply to this query, same as the values collected by `add_user_permissions`."""
+		if df.get("fieldname") == "name" and self.reference_doctype:
+			applicable_for = self.reference_doctype
+		else:
+			applicable_for = self.doctype
+
+		return """select `for_value` from `tabUser Permission`
+			where `user`={user} and `allow`={allow}
+			and (ifnull(`applicable_for`, '')='' or `applicable_for`={applicable_for})""".format(
+			user=frappe.db.escape(self.user, percent=False),
+			allow=frappe.db.escape(df.get("options"), percent=False),
+			applicable_for=frappe.db.escape(applicable_for, percent=False),
+		)
+
 	def get_permission_query_conditions(self):
 		conditions = []
 		condition_methods = frappe.get_hooks("permission_query_conditions", {}).get(self.doctype, [])
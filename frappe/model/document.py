@@ -16,7 +16,7 @@ from frappe.core.doctype.server_script.server_script_utils import run_server_scr
 from frappe.desk.form.document_follow import follow_document
 from frappe.integrations.doctype.webhook import run_webhooks
 from frappe.model import optional_fields, table_fields
-from frappe.model.base_document import BaseDocument, get_controller
+from frappe.model.base_document import BaseDocument, get_controller, get_link_values
 from frappe.model.naming import set_new_name, validate_name
 from frappe.model.workflow import set_workflow_state_on_action, validate_workflow
 from frappe.utils import cstr, date_diff, file_lock, flt, get_datetime_str, now
@@ -226,15 +226,56 @@ class Document(BaseDocument):
 		ignore_mandatory=None,
 		set_name=None,
 		set_child_names=True,
+		bulk=False,
 	):
 		"""Insert the document in the database (as a new document).
 		This will check for user permissions and execute `before_insert`,
 		`validate`, `on_update`, `after_insert` methods if they are written.
+		Use `frappe.db.bulk_insert_docs` to insert many documents at once.
 
-		:param ignore_permissions: Do not check permissions if True."""
+		:param ignore_permissions: Do not check permissions if True.
+		:param bulk: Write the child rows with multi-row `INSERT` statements."""
 		if self.flags.in_print:
 			return
 
+		self._before_db_insert(
+			ignore_permissions=ignore_permissions,
+			ignore_links=ignore_links,
+			ignore_mandatory=ignore_mandatory,
+			set_name=set_name,
+			set_child_names=set_child_names,
+		)
+
+		# parent
+		if getattr(self.meta, "issingle", 0):
+			self.update_single(self.get_valid_dict())
+		else:
+			try:
+				self.db_insert()
+			except frappe.DuplicateEntryError as e:
+				if not ignore_if_duplicate:
+					raise e
+
+		# children
+		if bulk:
+			insert_rows(self.get_all_children())
+		else:
+			for d in self.get_all_children():
+				d.db_insert()
+
+		self._after_db_insert()
+		return self
+
+	def _before_db_insert(
+		self,
+		ignore_permissions=None,
+		ignore_links=None,
+		ignore_mandatory=None,
+		set_name=None,
+		set_child_names=True,
+	):
+		"""Run permission checks, naming, validations and `before_insert` / `before_save`
+		hooks of `insert`, i.e. everything that happens before rows are written."""
 		self.flags.notifications_executed = []
 
 		if ignore_permissions != None:
@@ -265,22 +306,8 @@ class Document(BaseDocument):
 		self.set_docstatus()
 		self.flags.in_insert = False
 
-		# run validate, on update etc.
-
-		# parent
-		if getattr(self.meta, "issingle", 0):
-			self.update_single(self.get_valid_dict())
-		else:
-			try:
-				self.db_insert()
-			except frappe.DuplicateEntryError as e:
-				if not ignore_if_duplicate:
-					raise e
-
-		# children
-		for d in self.get_all_children():
-			d.db_insert()
-
+	def _after_db_insert(self):
+		"""Run `after_insert`, `on_update` etc. once the rows of this document are written."""
 		self.run_method("after_insert")
 		self.flags.in_insert = True
 
@@ -305,7 +332,6 @@ class Document(BaseDocument):
 			frappe.flags.in_migrate or frappe.local.flags.in_install or frappe.flags.in_setup_wizard
 		):
 			follow_document(self.doctype, self.name, frappe.session.user)
-		return self
 
 	def save(self, *args, **kwargs):
 		"""Wrapper for _save"""
@@ -898,10 +924,20 @@ class Document(BaseDocument):
 		if self.flags.ignore_links or self._action == "cancel":
 			return
 
-		invalid_links, cancelled_links = self.get_invalid_links()
+		children = self.get_all_children()
 
-		for d in self.get_all_children():
-			result = d.get_invalid_links(is_submittable=self.meta.is_submittable)
+		# fetch all linked values of the parent and children with one query per doctype
+		links = self.get_links_to_validate()
+		for d in children:
+			links.extend(d.get_links_to_validate())
+		link_values = get_link_values(links, is_submittable=self.meta.is_submittable)
+
+		invalid_links, cancelled_links = self.get_invalid_links(link_values=link_values)
+
+		for d in children:
+			result = d.get_invalid_links(
+				is_submittable=self.meta.is_submittable, link_values=link_values
+			)
 			invalid_links.extend(result[0])
 			cancelled_links.extend(result[1])
 
@@ -1544,6 +1580,129 @@ class Document(BaseDocument):
 		return f"{doctype}({name})"
 
 
+def bulk_insert(
+	docs,
+	chunk_size=1000,
+	ignore_permissions=None,
+	ignore_links=None,
+	ignore_if_duplicate=False,
+	ignore_mandatory=None,
+):
+	"""Insert new documents, writing their rows with multi-row `INSERT` statements.
+
+	Each document goes through the same naming, validations and hooks as `Document.insert`.
+	All `before_*` hooks run first, then the parent rows and after them the child rows of
+	every document are grouped by table and flushed in chunks, and finally the
+	`after_insert` / `on_update` hooks run for each document.
+
+	As no row is written before all documents are validated, documents of a batch can not
+	link to each other. Insert the linked documents in an earlier batch.
+
+	Single doctypes are inserted one by one.
+
+	:param docs: list of `Document` objects or dicts
+	:param chunk_size: maximum rows per `INSERT` statement
+	:param ignore_if_duplicate: Skip documents whose name already exists, their child rows
+	        and `after_insert` / `on_update` hooks are skipped too"""
+	insert_kwargs = dict(
+		ignore_permissions=ignore_permissions,
+		ignore_links=ignore_links,
+		ignore_mandatory=ignore_mandatory,
+	)
+	docs = [get_doc(d) for d in docs]
+	buffered_docs = []
+
+	for doc in docs:
+		if doc.flags.in_print:
+			continue
+
+		if getattr(doc.meta, "issingle", 0):
+			doc.insert(ignore_if_duplicate=ignore_if_duplicate, **insert_kwargs)
+			continue
+
+		try:
+			doc._before_db_insert(**insert_kwargs)
+		except frappe.LinkValidationError:
+			check_links_within_batch(doc, docs)
+			raise
+
+		buffered_docs.append(doc)
+
+	skipped = insert_rows(buffered_docs, chunk_size, ignore_if_duplicate=ignore_if_duplicate)
+	buffered_docs = [doc for doc in buffered_docs if doc not in skipped]
+	insert_rows([d for doc in buffered_docs for d in doc.get_all_children()], chunk_size)
+
+	for doc in buffered_docs:
+		doc._after_db_insert()
+
+	return docs
+
+
+def check_links_within_batch(doc, docs):
+	"""Raise a clear error if `doc` failed link validation because it links to another
+	document of the same `bulk_insert` batch."""
+	batch_names = {(d.doctype, d.name) for d in docs if d is not doc and d.name}
+
+	for d in [doc] + doc.get_all_children():
+		for df, doctype, docname, fields_to_fetch in d.get_links_to_validate():
+			if (doctype, docname) in batch_names:
+				frappe.throw(
+					_("{0} {1} links to {2} {3} of the same batch, insert it in an earlier batch").format(
+						doc.doctype, doc.name or "", doctype, docname
+					),
+					frappe.LinkValidationError,
+				)
+
+
+def insert_rows(docs, chunk_size=1000, ignore_if_duplicate=False):
+	"""Write the rows of `docs` grouped by table and column layout with multi-row `INSERT`
+	statements. Returns the documents skipped as duplicates."""
+	rows_by_table = {}
+	for d in docs:
+		values = d.get_values_for_db_insert()
+		key = (d.doctype, tuple(values))
+		rows_by_table.setdefault(key, []).append((d, list(values.values())))
+
+	skipped = []
+	for (doctype, columns), rows in rows_by_table.items():
+		frappe.db.savepoint("bulk_insert")
+		try:
+			frappe.db.bulk_insert(doctype, columns, [values for d, values in rows], chunk_size=chunk_size)
+		except Exception as e:
+			if not (frappe.db.is_primary_key_violation(e) or frappe.db.is_unique_key_violation(e)):
+				raise
+
+			# a failed multi-row INSERT writes nothing, insert row by row so that duplicates
+			# can be skipped and other documents raise the usual validation message
+			frappe.db.rollback(save_point="bulk_insert")
+			for d, values in rows:
+				if not insert_row(d, ignore_if_duplicate=ignore_if_duplicate):
+					skipped.append(d)
+
+		for d, values in rows:
+			if d not in skipped:
+				d.set("__islocal", False)
+
+	return skipped
+
+
+def insert_row(doc, ignore_if_duplicate=False):
+	"""Insert a single row, returns `False` if it was skipped as a duplicate."""
+	if not ignore_if_duplicate:
+		doc.db_insert()
+		return True
+
+	# a failed statement aborts the whole transaction on Postgres
+	frappe.db.savepoint("bulk_insert_row")
+	try:
+		doc.db_insert()
+	except frappe.DuplicateEntryError:
+		frappe.db.rollback(save_point="bulk_insert_row")
+		return False
+
+	return True
+
+
 def execute_action(doctype, name, action, **kwargs):
 	"""Execute an action on a document (called by background worker)"""
 	doc = frappe.get_doc(doctype, name)
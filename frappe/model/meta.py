@@ -17,6 +17,7 @@ Example:
 
 from __future__ import print_function, unicode_literals
 
+import hashlib
 import json
 import os
 from datetime import datetime
@@ -32,22 +33,24 @@ from frappe.model import (
 	optional_fields,
 	table_fields,
 )
-from frappe.model.base_document import BaseDocument
+from frappe.model.base_document import BaseDocument, get_controller
 from frappe.model.document import Document
 from frappe.model.workflow import get_workflow_name
 from frappe.modules import load_doctype_module
 from frappe.utils import cast, cint, cstr
 
 
+# bump when the layout of snapshots made by `make_meta_snapshot` changes
+META_SNAPSHOT_FORMAT = 1
+
+
 def get_meta(doctype, cached=True):
 	if cached:
 		if not frappe.local.meta_cache.get(doctype):
-			meta = frappe.cache().hget("meta", doctype)
-			if meta:
-				meta = Meta(meta)
-			else:
+			meta = load_meta_snapshot(frappe.cache().hget("meta", doctype))
+			if not meta:
 				meta = Meta(doctype)
-				frappe.cache().hset("meta", doctype, meta.as_dict())
+				frappe.cache().hset("meta", doctype, make_meta_snapshot(meta))
 			frappe.local.meta_cache[doctype] = meta
 
 		return frappe.local.meta_cache[doctype]
@@ -59,6 +62,64 @@ def load_meta(doctype):
 	return Meta(doctype)
 
 
+def get_meta_snapshot_version(doctype):
+	"""Hash of the snapshot format, framework version and the last changes to the DocType,
+	its Custom Fields and Property Setters. Snapshots cached by another version (e.g. before
+	an upgrade or a customization that did not clear the cache) are ignored and rebuilt."""
+	changes = None
+	if frappe.flags.in_install != "frappe":
+		# count as well, deleting an older Custom Field does not change the last modified
+		changes = frappe.db.sql(
+			"""select 'DocType', max(modified), count(*) from `tabDocType` where name=%(doctype)s
+			union all
+			select 'Custom Field', max(modified), count(*) from `tabCustom Field` where dt=%(doctype)s
+			union all
+			select 'Property Setter', max(modified), count(*) from `tabProperty Setter`
+				where doc_type=%(doctype)s""",
+			{"doctype": doctype},
+		)
+
+	return hashlib.md5(
+		"{0}:{1}:{2}".format(META_SNAPSHOT_FORMAT, frappe.__version__, changes).encode()
+	).hexdigest()[:12]
+
+
+def make_meta_snapshot(meta):
+	"""Serialize `Meta` into a compact snapshot to be cached.
+
+	Child tables (fields, permissions, ...) are stored as a list of column names and a
+	list of value tuples, along with precomputed indexes (positions in `fields`) used
+	by the frequently called `Meta` getters."""
+	data = meta.as_dict()
+	tables = {}
+
+	for df in DOCTYPE_TABLE_FIELDS:
+		rows = data.pop(df.fieldname, None) or []
+		columns = sorted(set().union(*rows)) if rows else []
+		tables[df.fieldname] = (columns, [tuple(row.get(c) for c in columns) for row in rows])
+
+	return {
+		"version": get_meta_snapshot_version(meta.name),
+		"doc": data,
+		"tables": tables,
+		"indexes": meta.get_indexes(),
+	}
+
+
+def load_meta_snapshot(snapshot):
+	"""Returns `Meta` from a snapshot made by `make_meta_snapshot`, `None` if the
+	snapshot is missing or was made by another version."""
+	if (
+		not snapshot
+		or not isinstance(snapshot, dict)
+		or "version" not in snapshot
+		or snapshot["version"] != get_meta_snapshot_version(snapshot["doc"].get("name"))
+	):
+		return None
+
+	return Meta.from_snapshot(snapshot)
+
+
 def get_table_columns(doctype):
 	return frappe.db.get_table_columns(doctype)
 
@@ -115,6 +176,95 @@ class Meta(Document):
 			else:
 				raise
 
+	@classmethod
+	def from_snapshot(cls, snapshot):
+		"""Build `Meta` from a snapshot without running the constructors of the
+		child documents and without recomputing the indexes."""
+		meta = cls.__new__(cls)
+		meta.__dict__.update(snapshot["doc"])
+		meta._fields = {}
+		meta._default_new_docs = {}
+		meta.flags = frappe._dict()
+		meta.dont_update_if_missing = []
+
+		for fieldname, (columns, rows) in snapshot["tables"].items():
+			meta.__dict__[fieldname] = make_child_rows(meta, columns, rows)
+
+		meta.set_indexes(snapshot["indexes"])
+		return meta
+
+	def get_indexes(self):
+		"""Positions (in `fields`) of fields looked up often, see `set_indexes`."""
+		fields_by_type = {}
+		fetch_from = {}
+		high_permlevel_fields = []
+		link_fields = []
+		table_field_positions = []
+
+		for i, df in enumerate(self.get("fields")):
+			fields_by_type.setdefault(df.fieldtype, []).append(i)
+
+			if df.fieldtype == "Link" and df.options != "[Select]":
+				link_fields.append(i)
+
+			if df.fieldtype in table_fields:
+				table_field_positions.append(i)
+
+			if df.fieldtype not in no_value_fields and "." in (df.get("fetch_from") or ""):
+				fetch_from.setdefault(df.fetch_from.split(".", 1)[0], []).append(i)
+
+			if cint(df.permlevel) > 0:
+				high_permlevel_fields.append(i)
+
+		return {
+			"fields_by_type": fields_by_type,
+			"fetch_from": fetch_from,
+			"high_permlevel_fields": high_permlevel_fields,
+			"link_fields": link_fields,
+			"table_fields": table_field_positions,
+			"valid_columns": self.get_valid_columns(),
+		}
+
+	def set_indexes(self, indexes):
+		fields = self.get("fields") or []
+
+		def get_fields(positions):
+			return [fields[i] for i in positions]
+
+		self._fields_by_type = {
+			fieldtype: get_fields(positions)
+			for fieldtype, positions in indexes["fields_by_type"].items()
+		}
+		self._fetch_from_map = {
+			fieldname: get_fields(positions) for fieldname, positions in indexes["fetch_from"].items()
+		}
+		self.high_permlevel_fields = get_fields(indexes["high_permlevel_fields"])
+		self._link_fields = get_fields(indexes["link_fields"])
+		if self.name != "DocType":
+			self._table_fields = get_fields(indexes["table_fields"])
+		self._valid_columns = indexes["valid_columns"]
+
+	def append(self, key, value=None):
+		if key == "fields":
+			self.clear_field_caches()
+
+		return super(Meta, self).append(key, value)
+
+	def clear_field_caches(self):
+		"""Drop the lists derived from `fields`, to be rebuilt by their getters"""
+		self._fields = {}
+		for attr in (
+			"_fields_by_type",
+			"_fetch_from_map",
+			"_link_fields",
+			"_dynamic_link_fields",
+			"_set_only_once_fields",
+			"_table_fields",
+			"_valid_columns",
+			"high_permlevel_fields",
+		):
+			self.__dict__.pop(attr, None)
+
 	def process(self):
 		# don't process for special doctypes
 		# prevent's circular dependency
@@ -151,14 +301,25 @@ class Meta(Document):
 		return serialize(self)
 
 	def get_link_fields(self):
-		return self.get("fields", {"fieldtype": "Link", "options": ["!=", "[Select]"]})
+		if not hasattr(self, "_link_fields"):
+			self._link_fields = self.get("fields", {"fieldtype": "Link", "options": ["!=", "[Select]"]})
+		return list(self._link_fields)
+
+	def get_fields_by_type(self, fieldtype):
+		"""Returns list of docfields of the given fieldtype"""
+		if not hasattr(self, "_fields_by_type"):
+			self._fields_by_type = {}
+			for df in self.get("fields"):
+				self._fields_by_type.setdefault(df.fieldtype, []).append(df)
+
+		return list(self._fields_by_type.get(fieldtype, []))
 
 	def get_data_fields(self):
-		return self.get("fields", {"fieldtype": "Data"})
+		return self.get_fields_by_type("Data")
 
 	def get_dynamic_link_fields(self):
 		if not hasattr(self, "_dynamic_link_fields"):
-			self._dynamic_link_fields = self.get("fields", {"fieldtype": "Dynamic Link"})
+			self._dynamic_link_fields = self.get_fields_by_type("Dynamic Link")
 		return self._dynamic_link_fields
 
 	def get_select_fields(self):
@@ -167,10 +328,10 @@ class Meta(Document):
 		)
 
 	def get_image_fields(self):
-		return self.get("fields", {"fieldtype": "Attach Image"})
+		return self.get_fields_by_type("Attach Image")
 
 	def get_code_fields(self):
-		return self.get("fields", {"fieldtype": "Code"})
+		return self.get_fields_by_type("Code")
 
 	def get_set_only_once_fields(self):
 		"""Return fields with `set_only_once` set"""
@@ -273,6 +434,9 @@ class Meta(Document):
 		These fields are of type Data, Link, Text, Readonly and their
 		fetch_from property is set as `link_fieldname`.`source_fieldname`"""
 
+		if link_fieldname and hasattr(self, "_fetch_from_map"):
+			return list(self._fetch_from_map.get(link_fieldname, []))
+
 		out = []
 
 		if not link_fieldname:
@@ -632,6 +796,27 @@ class Meta(Document):
 		return self.has_field("lft") and self.has_field("rgt")
 
 
+def make_child_rows(parent, columns, rows):
+	"""Build child documents from snapshot rows by setting their `__dict__` directly."""
+	out = []
+	controllers = {}
+	doctype_index = columns.index("doctype") if "doctype" in columns else None
+
+	for values in rows:
+		doctype = values[doctype_index] if doctype_index is not None else None
+		if doctype not in controllers:
+			controllers[doctype] = get_controller(doctype) if doctype else BaseDocument
+
+		d = controllers[doctype].__new__(controllers[doctype])
+		d.__dict__.update(zip(columns, values))
+		d.__dict__["flags"] = frappe._dict()
+		d.__dict__["dont_update_if_missing"] = []
+		d.__dict__["parent_doc"] = parent
+		out.append(d)
+
+	return out
+
+
 DOCTYPE_TABLE_FIELDS = [
 	frappe._dict({"fieldname": "fields", "options": "DocField"}),
 	frappe._dict({"fieldname": "permissions", "options": "DocPerm"}),
@@ -225,6 +225,12 @@ def determine_consecutive_week_number(datetime):
 
 
 def getseries(key, digits):
+	from frappe.model.series_allocator import get_next_number, get_series_allocator
+
+	allocator = get_series_allocator(key)
+	if allocator != "table":
+		return ("%0" + str(digits) + "d") % get_next_number(key, allocator)
+
 	# series created ?
 	current = frappe.db.sql("SELECT `current` FROM `tabSeries` WHERE `name`=%s FOR UPDATE", (key,))
 	if current and current[0][0] is not None:
@@ -250,6 +256,12 @@ def revert_series_if_last(key, name, doc=None):
 	if "." in prefix:
 		prefix = parse_naming_series(prefix.split("."), doc=doc)
 
+	from frappe.model.series_allocator import get_series_allocator
+
+	if get_series_allocator(prefix) != "table":
+		# numbers from sequences and reserved blocks can't be handed back
+		return
+
 	count = cint(name.replace(prefix, ""))
 	current = frappe.db.sql("SELECT `current` FROM `tabSeries` WHERE `name`=%s FOR UPDATE", (prefix,))
 
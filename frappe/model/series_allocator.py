@@ -0,0 +1,150 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# MIT License. See license.txt
+
+"""
+Allocators for naming series numbers.
+
+By default `frappe.model.naming.getseries` increments the row of a series in `tabSeries`
+with `SELECT ... FOR UPDATE`, which keeps the row locked until the transaction ends and
+serializes all concurrent inserts into the same series.
+
+Set `naming_series_allocator` in `site_config.json` to hand out numbers without that lock:
+
+- `"table"` (default): `tabSeries` row lock, gapless.
+- `"sequence"`: one native database sequence per series prefix.
+- `"block"`: every worker reserves `naming_series_block_size` numbers at a time from
+  `tabSeries` in a separate, immediately committed transaction.
+
+Both `sequence` and `block` leave gaps when a transaction is rolled back or a worker
+exits with an unused block. Series that must stay gapless can be listed (as prefixes)
+in `gapless_naming_series`, they always use the `table` allocator.
+
+Switching from `table` to `sequence` needs no migration, the sequence for a series is
+created on first use starting after the current `tabSeries` value. Run
+`sync_series_table` before switching back to `table`.
+"""
+
+import hashlib
+import threading
+
+import frappe
+from frappe.database.sequence import (
+	autocommit_connection,
+	create_sequence,
+	get_current_val,
+	get_next_val,
+	sequence_exists,
+)
+from frappe.utils import cint
+
+DEFAULT_BLOCK_SIZE = 20
+
+# per process, keyed by (site, series)
+_reserved_blocks = {}
+_reserved_blocks_lock = threading.Lock()
+_known_sequences = set()
+
+
+def get_series_allocator(key):
+	"""Returns the allocator ("table", "sequence" or "block") configured for the series `key`."""
+	allocator = frappe.conf.get("naming_series_allocator") or "table"
+	if allocator == "table":
+		return allocator
+
+	for prefix in frappe.conf.get("gapless_naming_series") or []:
+		if key.startswith(prefix):
+			return "table"
+
+	return allocator
+
+
+def get_next_number(key, allocator):
+	if allocator == "sequence":
+		return get_next_number_from_sequence(key)
+	elif allocator == "block":
+		return get_next_number_from_block(key)
+
+	frappe.throw(frappe._("Invalid naming series allocator: {0}").format(allocator))
+
+
+def get_sequence_name(key):
+	"""Sequence names have to be identifiers, series prefixes can contain anything."""
+	return "series_" + hashlib.md5(key.encode("utf-8")).hexdigest()[:20]
+
+
+def get_next_number_from_sequence(key):
+	sequence_name = get_sequence_name(key)
+
+	if (frappe.local.site, sequence_name) not in _known_sequences:
+		if not sequence_exists(sequence_name):
+			create_sequence_for_series(key)
+		_known_sequences.add((frappe.local.site, sequence_name))
+
+	return cint(get_next_val(sequence_name))
+
+
+def create_sequence_for_series(key):
+	"""Create the sequence of a series, continuing from its `tabSeries` value."""
+	with autocommit_connection() as db:
+		current = db.sql("SELECT `current` FROM `tabSeries` WHERE `name`=%s FOR UPDATE", (key,))
+		start_value = cint(current[0][0]) + 1 if current else 1
+		create_sequence(get_sequence_name(key), start_value=start_value, db=db)
+
+
+def get_next_number_from_block(key):
+	block_key = (frappe.local.site, key)
+
+	# threads of a process share the blocks
+	with _reserved_blocks_lock:
+		block = _reserved_blocks.get(block_key)
+		if not block or block[0] > block[1]:
+			block = _reserved_blocks[block_key] = reserve_block(key)
+
+		current = block[0]
+		block[0] += 1
+		return current
+
+
+def reserve_block(key):
+	"""Reserve the next `naming_series_block_size` numbers of a series in `tabSeries`.
+	Returns `[first, last]` of the reserved range."""
+	block_size = cint(frappe.conf.get("naming_series_block_size")) or DEFAULT_BLOCK_SIZE
+
+	with autocommit_connection() as db:
+		# the update locks the row, so the value read after it is this block's end
+		db.sql(
+			"UPDATE `tabSeries` SET `current` = COALESCE(`current`, 0) + %s WHERE `name`=%s",
+			(block_size, key),
+		)
+		last = db.sql("SELECT `current` FROM `tabSeries` WHERE `name`=%s", (key,))
+		if last:
+			last = cint(last[0][0])
+		else:
+			db.sql("INSERT INTO `tabSeries` (`name`, `current`) VALUES (%s, %s)", (key, block_size))
+			last = block_size
+
+	return [last - block_size + 1, last]
+
+
+def sync_series_table():
+	"""Write the current value of every series sequence back to `tabSeries`.
+
+	Run this before switching `naming_series_allocator` back to "table" so that
+	numbers handed out by sequences are not reused."""
+	for key in frappe.db.sql_list("SELECT `name` FROM `tabSeries`"):
+		sequence_name = get_sequence_name(key)
+		if not sequence_exists(sequence_name):
+			continue
+
+		current = cint(get_current_val(sequence_name))
+		frappe.db.sql(
+			"UPDATE `tabSeries` SET `current` = %s WHERE `name`=%s AND `current` < %s",
+			(current, key, current),
+		)
+
+
+def migrate_series_to_sequences():
+	"""Create sequences for all existing series in `tabSeries` upfront."""
+	for key in frappe.db.sql_list("SELECT `name` FROM `tabSeries`"):
+		if not sequence_exists(get_sequence_name(key)):
+			create_sequence_for_series(key)
@@ -4,6 +4,15 @@
 
 // __('Modules') __('Domains') __('Places') __('Administration') # for translation, don't remove
 
+// without `load_boot_sections` of app.html (e.g. the mobile app) boot has every section
+if (!frappe.boot_sections) {
+	frappe.boot_sections = {
+		ready: Promise.resolve(),
+		load: () => Promise.resolve(),
+		is_loaded: () => true
+	};
+}
+
 frappe.start_app = function() {
 	if (!frappe.Application)
 		return;
@@ -21,7 +30,8 @@ $(document).ready(function() {
 			message: __('Some of the features might not work in your browser. Please update your browser to the latest version.')
 		});
 	}
-	frappe.start_app();
+	// boot sections that changed are fetched while the desk scripts load
+	frappe.boot_sections.ready.then(frappe.start_app);
 });
 
 frappe.Application = Class.extend({
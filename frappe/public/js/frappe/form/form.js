@@ -1271,8 +1271,10 @@ frappe.ui.form.Form = class FrappeForm {
 		if (route[0] !== 'Form') return;
 		if (this.meta.is_submittable && this.doc.docstatus !== 1) return;
 
-		const success_action = new frappe.ui.form.SuccessAction(this);
-		success_action.show();
+		frappe.boot_sections.load(["success_action"]).then(() => {
+			const success_action = new frappe.ui.form.SuccessAction(this);
+			success_action.show();
+		});
 	}
 
 	get_doc() {
@@ -22,7 +22,7 @@ frappe.ui.get_print_settings = function(
 			fieldname: "letter_head",
 			label: __("Letter Head"),
 			depends_on: "with_letter_head",
-			options: Object.keys(frappe.boot.letter_heads),
+			options: Object.keys(frappe.boot.letter_heads || {}),
 			default: letter_head || default_letter_head
 		},
 		{
@@ -59,7 +59,7 @@ frappe.ui.get_print_settings = function(
 		);
 	}
 
-	return frappe.prompt(
+	var dialog = frappe.prompt(
 		columns,
 		function(data) {
 			data = $.extend(print_settings, data);
@@ -74,6 +74,15 @@ frappe.ui.get_print_settings = function(
 		},
 		__("Print Settings")
 	);
+
+	if (!frappe.boot_sections.is_loaded(["letter_heads"])) {
+		frappe.boot_sections.load(["letter_heads"]).then(() => {
+			dialog.set_df_property("letter_head", "options", Object.keys(frappe.boot.letter_heads || {}));
+			dialog.set_value("letter_head", letter_head || default_letter_head);
+		});
+	}
+
+	return dialog;
 };
 
 // qz tray connection wrapper
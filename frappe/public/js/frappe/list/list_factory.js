@@ -6,6 +6,16 @@ frappe.provide('frappe.views.list_view');
 window.cur_list = null;
 frappe.views.ListFactory = class ListFactory extends frappe.views.Factory {
 	make(route) {
+		// inbox links and views of Communication need the email accounts
+		if (route[1] === "Communication" && !frappe.boot_sections.is_loaded(["email_accounts"])) {
+			frappe.boot_sections.load(["email_accounts"]).then(() => this.make_view(route));
+			return;
+		}
+
+		this.make_view(route);
+	}
+
+	make_view(route) {
 		var me = this;
 		var doctype = route[1];
 
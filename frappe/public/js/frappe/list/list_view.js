@@ -1300,7 +1300,10 @@ frappe.views.ListView = class ListView extends frappe.views.BaseList {
 				return;
 			}
 
-			this.pending_document_refreshes.push(data);
+			// updates of a transaction are merged, with the `names` of all documents
+			for (let name of data.names || [data.name]) {
+				this.pending_document_refreshes.push(Object.assign({}, data, { name }));
+			}
 			frappe.utils.debounce(this.process_document_refreshes.bind(this), 1000)();
 		});
 	}
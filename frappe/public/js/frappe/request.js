@@ -530,16 +530,18 @@ frappe.request.report_error = function(xhr, request_opts) {
 			'<pre>' + JSON.stringify(data, null, '\t')+ '</pre>'
 		].join("\n");
 
-		var communication_composer = new frappe.views.CommunicationComposer({
-			subject: 'Error Report [' + frappe.datetime.nowdate() + ']',
-			recipients: error_report_email,
-			message: error_report_message,
-			doc: {
-				doctype: "User",
-				name: frappe.session.user
-			}
+		frappe.boot_sections.load(["email_accounts"]).then(() => {
+			var communication_composer = new frappe.views.CommunicationComposer({
+				subject: 'Error Report [' + frappe.datetime.nowdate() + ']',
+				recipients: error_report_email,
+				message: error_report_message,
+				doc: {
+					doctype: "User",
+					name: frappe.session.user
+				}
+			});
+			communication_composer.dialog.$wrapper.css("z-index", cint(frappe.msg_dialog.$wrapper.css("z-index")) + 1);
 		});
-		communication_composer.dialog.$wrapper.css("z-index", cint(frappe.msg_dialog.$wrapper.css("z-index")) + 1);
 	}
 
 	if (exc) {
@@ -11,7 +11,12 @@ frappe.views.CommunicationComposer = class {
 			this.doc = this.frm && this.frm.doc || {};
 		}
 
-		this.make();
+		// `dialog` is set right away if the email accounts are loaded already
+		if (frappe.boot_sections.is_loaded(["email_accounts"])) {
+			this.make();
+		} else {
+			frappe.boot_sections.load(["email_accounts"]).then(() => this.make());
+		}
 	}
 
 	make() {
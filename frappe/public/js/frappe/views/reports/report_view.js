@@ -237,10 +237,14 @@ frappe.views.ReportView = class ReportView extends frappe.views.ListView {
 		if (this.doctype === data.doctype && data.name) {
 			// flash row when doc is updated by some other user
 			const flash_row = data.user !== frappe.session.user;
-			if (this.data.find(d => d.name === data.name)) {
+			// updates of a transaction are merged, with the `names` of all documents
+			const names = data.names || [data.name];
+			if (names.every(name => this.data.find(d => d.name === name))) {
 				// update existing
-				frappe.db.get_doc(data.doctype, data.name)
-					.then(doc => this.update_row(doc, flash_row));
+				for (let name of names) {
+					frappe.db.get_doc(data.doctype, name)
+						.then(doc => this.update_row(doc, flash_row));
+				}
 			} else {
 				// refresh
 				this.refresh();
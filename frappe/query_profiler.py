@@ -0,0 +1,160 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# MIT License. See license.txt
+
+"""
+Low overhead query profiler for production sites.
+
+Unlike `frappe.recorder` it does not keep queries, stack traces or `EXPLAIN` output, it
+only counts queries and their time by normalized shape (literals replaced by `?`) and
+call site (first frame outside of the database / ORM layer). Enable it in site config:
+
+	"query_profiler": 1,
+	"query_profiler_sample_rate": 0.05,
+	"query_profiler_n_plus_one_threshold": 10
+
+A sampled request or job where one call site runs the same query shape more than
+`query_profiler_n_plus_one_threshold` times is reported as an N+1 pattern in the
+`query_profiler` log and, if `frappe.monitor` is enabled, in the monitor log entry.
+"""
+
+import json
+import os
+import random
+import re
+import sys
+from functools import lru_cache
+
+import frappe
+from frappe.monitor import add_data_to_monitor
+
+DEFAULT_SAMPLE_RATE = 0.01
+DEFAULT_N_PLUS_ONE_THRESHOLD = 10
+MAX_REPORTED_PATTERNS = 20
+
+FRAPPE_PATH = os.path.dirname(os.path.abspath(__file__))
+
+# frames in these files are not call sites, the code calling into them is
+PLUMBING_PATHS = tuple(
+	os.path.join(FRAPPE_PATH, path)
+	for path in (
+		"__init__.py",
+		"query_profiler.py",
+		"database" + os.sep,
+		"query_builder" + os.sep,
+		os.path.join("model", "db_query.py"),
+		os.path.join("model", "document.py"),
+		os.path.join("model", "base_document.py"),
+	)
+)
+
+# only the beginning of long (bulk) queries is used for their shape
+MAX_QUERY_LENGTH = 1000
+
+STRING_LITERAL_REGEX = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+NUMBER_LITERAL_REGEX = re.compile(r"(?<![\w`\"])-?\d+(?:\.\d+)?\b")
+PLACEHOLDER_REGEX = re.compile(r"%\(\w+\)s|%s")
+VALUE_LIST_REGEX = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+WHITESPACE_REGEX = re.compile(r"\s+")
+
+
+def start(transaction_type="request", method=None, kwargs=None):
+	if not frappe.conf.query_profiler:
+		return
+
+	sample_rate = frappe.conf.query_profiler_sample_rate
+	if sample_rate is None:
+		sample_rate = DEFAULT_SAMPLE_RATE
+
+	if random.random() < sample_rate:
+		frappe.local.query_profiler = QueryProfiler(transaction_type, method)
+
+
+def stop(response=None, request=None, method=None, kwargs=None, result=None):
+	profiler = getattr(frappe.local, "query_profiler", None)
+	if profiler:
+		frappe.local.query_profiler = None
+		profiler.dump()
+
+
+class QueryProfiler(object):
+	def __init__(self, transaction_type="request", method=None):
+		self.transaction_type = transaction_type
+		self.method = method
+		if transaction_type == "request" and getattr(frappe.local, "request", None):
+			self.method = frappe.request.path
+
+		# (shape, call site) => [count, seconds]
+		self.queries = {}
+		self.threshold = frappe.conf.query_profiler_n_plus_one_threshold or DEFAULT_N_PLUS_ONE_THRESHOLD
+
+	def register(self, query, duration):
+		"""Called by `frappe.db.sql` after every query of the profiled request or job."""
+		key = (normalize_query(query[:MAX_QUERY_LENGTH]), get_call_site())
+		stats = self.queries.get(key)
+		if stats:
+			stats[0] += 1
+			stats[1] += duration
+		else:
+			self.queries[key] = [1, duration]
+
+	def get_n_plus_one_patterns(self):
+		patterns = [
+			{
+				"query": shape,
+				"call_site": call_site,
+				"count": count,
+				"duration": round(duration * 1000, 3),
+			}
+			for (shape, call_site), (count, duration) in self.queries.items()
+			if count > self.threshold
+		]
+		patterns.sort(key=lambda pattern: pattern["count"], reverse=True)
+		return patterns[:MAX_REPORTED_PATTERNS]
+
+	def get_summary(self):
+		return {
+			"queries": sum(count for count, duration in self.queries.values()),
+			"query_time": round(sum(duration for count, duration in self.queries.values()) * 1000, 3),
+			"n_plus_one": self.get_n_plus_one_patterns(),
+		}
+
+	def dump(self):
+		summary = self.get_summary()
+		add_data_to_monitor(query_profile=summary)
+
+		if not summary["n_plus_one"]:
+			return
+
+		logger = frappe.logger("query_profiler", allow_site=True)
+		for pattern in summary["n_plus_one"]:
+			logger.warning(
+				json.dumps(
+					dict(pattern, transaction_type=self.transaction_type, method=self.method),
+					default=str,
+				)
+			)
+
+
+@lru_cache(maxsize=2048)
+def normalize_query(query):
+	"""Query with placeholders and literal values replaced by `?` and value lists
+	collapsed, so that `name in ('a', 'b')` and `name in ('c')` have the same shape."""
+	query = STRING_LITERAL_REGEX.sub("?", query)
+	query = NUMBER_LITERAL_REGEX.sub("?", query)
+	query = PLACEHOLDER_REGEX.sub("?", query)
+	query = VALUE_LIST_REGEX.sub("(?)", query)
+	return WHITESPACE_REGEX.sub(" ", query).strip()
+
+
+def get_call_site():
+	"""`path:line function` of the innermost frame outside of the database and ORM layer."""
+	frame = sys._getframe(2)
+	while frame:
+		filename = frame.f_code.co_filename
+		if not filename.startswith(PLUMBING_PATHS):
+			return "{0}:{1} {2}".format(
+				re.sub(".*/apps/", "", filename), frame.f_lineno, frame.f_code.co_name
+			)
+		frame = frame.f_back
+
+	return None
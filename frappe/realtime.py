@@ -2,14 +2,24 @@
 # For license information, please see license.txt
 
 import os
+import time
 from contextlib import suppress
 
 import redis
 
 import frappe
+from frappe.utils import cint, create_batch, flt
 
 redis_server = None
 
+# intermediate updates of these events are dropped if sent more often than
+# `realtime_progress_interval` (seconds) to the same room
+THROTTLED_EVENTS = ("progress", "data_import_progress")
+DEFAULT_PROGRESS_INTERVAL = 0.5
+
+# events buffered till commit are published in frames of this size
+REALTIME_BATCH_SIZE = 100
+
 
 @frappe.whitelist()
 def get_pending_tasks_for_doc(doctype, docname):
@@ -79,14 +89,98 @@ def publish_realtime(
 			# This will be broadcasted to all Desk users
 			room = get_site_room()
 
+	if event in THROTTLED_EVENTS and is_throttled(event, message, room):
+		return
+
 	if after_commit:
-		params = [event, message, room]
-		if not params in frappe.local.realtime_log:
-			frappe.local.realtime_log.append(params)
+		# coalesced by `flush_realtime_log`
+		frappe.local.realtime_log.append([event, message, room])
 	else:
 		emit_via_redis(event, message, room)
 
 
+def is_throttled(event, message, room):
+	if is_progress_complete(message):
+		return False
+
+	interval = frappe.conf.realtime_progress_interval
+	if interval is None:
+		interval = DEFAULT_PROGRESS_INTERVAL
+
+	if not hasattr(frappe.local, "realtime_throttle"):
+		frappe.local.realtime_throttle = {}
+
+	now = time.monotonic()
+	last_sent = frappe.local.realtime_throttle.get((event, room))
+	if last_sent is not None and now - last_sent < flt(interval):
+		return True
+
+	frappe.local.realtime_throttle[(event, room)] = now
+	return False
+
+
+def is_progress_complete(message):
+	if "percent" in message:
+		return flt(message["percent"]) >= 100
+
+	if "total" in message:
+		return cint(message.get("current")) >= cint(message["total"])
+
+	return True
+
+
+def flush_realtime_log():
+	"""Publish events buffered till commit"""
+	events = coalesce_events(frappe.local.realtime_log)
+	frappe.local.realtime_log = []
+	emit_batch_via_redis(events)
+
+
+def coalesce_events(events):
+	"""Drop duplicate events, merge `list_update` events of a room into one with the
+	`names` of all updated documents and `docinfo_update` events of the same document"""
+	out = []
+	merged = {}
+
+	for event, message, room in events:
+		if event == "list_update":
+			key = (event, room)
+			if key in merged:
+				merged_message = merged[key]
+				if message.get("name") not in merged_message["names"]:
+					merged_message["names"].append(message.get("name"))
+				merged_message["name"] = message.get("name")
+				continue
+
+			message = dict(message, names=[message.get("name")])
+
+		elif event == "docinfo_update" and message.get("doc"):
+			key = (event, room, message.get("key"), message["doc"].get("name"))
+			if key in merged:
+				merged_message = merged[key]
+				if message.get("action") == "delete" and merged_message.get("action") == "add":
+					# added and deleted in the same transaction
+					out.remove([event, merged_message, room])
+					del merged[key]
+				else:
+					if message.get("action") == "delete":
+						merged_message["action"] = "delete"
+					merged_message["doc"] = message["doc"]
+				continue
+
+			message = dict(message)
+
+		else:
+			key = (event, room, frappe.as_json(message))
+			if key in merged:
+				continue
+
+		merged[key] = message
+		out.append([event, message, room])
+
+	return out
+
+
 def emit_via_redis(event, message, room):
 	"""Publish real-time updates via redis
 
@@ -99,6 +193,29 @@ def emit_via_redis(event, message, room):
 		r.publish("events", frappe.as_json({"event": event, "message": message, "room": room}))
 
 
+def emit_batch_via_redis(events):
+	"""Publish real-time updates via redis in one round trip, `REALTIME_BATCH_SIZE` events
+	per message
+
+	:param events: list of `[event, message, room]`"""
+	if not events:
+		return
+
+	if len(events) == 1:
+		return emit_via_redis(*events[0])
+
+	with suppress(redis.exceptions.ConnectionError):
+		pipeline = get_redis_server().pipeline(transaction=False)
+		for batch in create_batch(events, REALTIME_BATCH_SIZE):
+			frame = {
+				"batch": [
+					{"event": event, "message": message, "room": room} for event, message, room in batch
+				]
+			}
+			pipeline.publish("events", frappe.as_json(frame, indent=None, separators=(",", ":")))
+		pipeline.execute()
+
+
 def get_redis_server():
 	"""returns redis_socketio connection."""
 	global redis_server
@@ -0,0 +1,241 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# MIT License. See license.txt
+
+"""
+Inverted index for global search, used by `frappe.utils.global_search.search` instead of
+`MATCH ... AGAINST` queries on `__global_search`. `__global_search` stays the source of
+truth, the index is fed from it incrementally by `sync_values`. Enable it in site config
+and build it from the existing table once:
+
+	"global_search_index": 1
+
+	bench --site [site] execute frappe.search.global_search_index.build_index
+
+A dotted path to a subclass of `GlobalSearchIndex` can be set instead of `1`.
+"""
+
+from whoosh.fields import BOOLEAN, ID, STORED, TEXT, Schema
+from whoosh.query import And, ConstantScoreQuery, Or, Prefix, Term
+from whoosh.writing import AsyncWriter
+
+import frappe
+from frappe.search.full_text_search import FullTextSearch
+from frappe.utils import cint
+
+INDEX_NAME = "global_search"
+
+# rows of `__global_search` read per query while building the index
+BUILD_BATCH_SIZE = 10000
+
+# added to the score of every result of a doctype per position in the priority list,
+# so that results are ordered by doctype priority first and by relevance second
+PRIORITY_BOOST = 1000000
+
+
+class GlobalSearchIndex(FullTextSearch):
+	"""Whoosh index of `__global_search` with prefix matching and doctype priorities"""
+
+	def get_schema(self):
+		return Schema(
+			id=ID(unique=True),
+			doctype=ID(stored=True),
+			name=ID(stored=True),
+			title=TEXT(stored=True),
+			content=TEXT(stored=True),
+			published=BOOLEAN(stored=True),
+			route=STORED,
+			image=STORED,
+		)
+
+	def get_fields_to_search(self):
+		return ["title", "content"]
+
+	def get_id(self):
+		return "id"
+
+	def get_items_to_index(self):
+		"""All rows of `__global_search`, read in batches in the order of its unique key"""
+		last_key = {"doctype": "", "name": ""}
+		while True:
+			values = frappe.db.sql(
+				"""select `doctype`, `name`, `content`, `published`, `title`, `route`
+				from `__global_search`
+				where `doctype` > %(doctype)s or (`doctype` = %(doctype)s and `name` > %(name)s)
+				order by `doctype`, `name`
+				limit {0}""".format(
+					BUILD_BATCH_SIZE
+				),
+				last_key,
+				as_dict=True,
+			)
+			if not values:
+				break
+
+			add_images(values)
+			for value in values:
+				yield get_document(value)
+
+			last_key = {"doctype": values[-1].doctype, "name": values[-1].name}
+
+	def build(self):
+		"""Build the index from `__global_search` without loading the whole table in memory"""
+		ix = self.create_index()
+		writer = ix.writer()
+		for document in self.get_items_to_index():
+			writer.add_document(**document)
+
+		writer.commit(optimize=True)
+
+	def clear(self):
+		self.create_index()
+
+	def update_documents(self, values):
+		"""Add or replace the documents of `__global_search` values in one write"""
+		if not values:
+			return
+
+		writer = AsyncWriter(self.get_index())
+		for value in values:
+			writer.update_document(**get_document(value))
+
+		writer.commit()
+
+	def remove_document(self, doctype, name):
+		writer = AsyncWriter(self.get_index())
+		writer.delete_by_term(self.id, get_document_id(doctype, name))
+		writer.commit()
+
+	def remove_doctype(self, doctype):
+		writer = AsyncWriter(self.get_index())
+		writer.delete_by_term("doctype", doctype)
+		writer.commit()
+
+	def search(self, text, start=0, limit=20, doctype=None, doctypes=None):
+		"""Search the index like `frappe.utils.global_search.search`
+
+		:param text: `&` separated phrases, results of each phrase are combined. All
+		        words of a phrase have to match a word of the document, or its beginning.
+		:param doctype: search only in this doctype
+		:param doctypes: search only in these doctypes, in order of priority
+		"""
+		if doctypes is not None and (not doctypes or (doctype and doctype not in doctypes)):
+			# same as `MATCH` search, which only keeps results of the allowed doctypes
+			return []
+
+		ix = self.get_index()
+		query = self.get_query(ix.schema, text)
+		if not query:
+			return []
+
+		filter_query = None
+		if doctype:
+			filter_query = Term("doctype", doctype)
+		elif doctypes:
+			priorities = Or(
+				[
+					ConstantScoreQuery(Term("doctype", d), score=(len(doctypes) - i) * PRIORITY_BOOST)
+					for i, d in enumerate(doctypes)
+				]
+			)
+			query = And([query, priorities])
+
+		start, limit = cint(start), cint(limit)
+		with ix.searcher() as searcher:
+			results = searcher.search(query, limit=start + limit, filter=filter_query)
+			return [self.parse_result(r) for r in results[start : start + limit]]
+
+	def get_query(self, schema, text):
+		phrases = []
+		for phrase in text.split("&"):
+			words = [token.text for token in schema["content"].analyzer(phrase.strip())]
+			if not words:
+				continue
+
+			# whole words are scored by relevance, a matching beginning adds a constant score
+			phrases.append(
+				And(
+					[
+						Or(
+							[
+								Term("title", word, boost=2.0),
+								Term("content", word),
+								Prefix("title", word),
+								Prefix("content", word),
+							]
+						)
+						for word in words
+					]
+				)
+			)
+
+		return Or(phrases) if phrases else None
+
+	def parse_result(self, result):
+		return frappe._dict(
+			doctype=result["doctype"],
+			name=result["name"],
+			content=result["content"],
+			image=result.get("image"),
+			rank=result.score,
+		)
+
+
+def get_document(value):
+	"""Index document of a `__global_search` value"""
+	return {
+		"id": get_document_id(value["doctype"], value["name"]),
+		"doctype": value["doctype"],
+		"name": value["name"],
+		"title": value.get("title") or "",
+		"content": value.get("content") or "",
+		"published": bool(cint(value.get("published"))),
+		"route": value.get("route") or "",
+		"image": value.get("image"),
+	}
+
+
+def get_document_id(doctype, name):
+	return "{0}\x00{1}".format(doctype, name)
+
+
+def add_images(values):
+	"""Set `image` of values from their doctype's `image_field`, with one query per doctype"""
+	names_by_doctype = {}
+	for value in values:
+		names_by_doctype.setdefault(value.doctype, []).append(value.name)
+
+	images = {}
+	for doctype, names in names_by_doctype.items():
+		try:
+			image_field = frappe.get_meta(doctype).image_field
+		except frappe.DoesNotExistError:
+			# "Static Web Page" and deleted doctypes
+			continue
+
+		if not image_field:
+			continue
+
+		for name, image in frappe.get_all(
+			doctype, filters={"name": ("in", names)}, fields=["name", image_field], as_list=True
+		):
+			images[(doctype, name)] = image
+
+	for value in values:
+		value.image = images.get((value.doctype, value.name))
+
+
+def get_search_index():
+	"""The index set in site config as `global_search_index`, `None` if it is not enabled"""
+	engine = frappe.conf.global_search_index
+	if not engine:
+		return None
+
+	if isinstance(engine, str) and "." in engine:
+		return frappe.get_attr(engine)(INDEX_NAME)
+
+	return GlobalSearchIndex(INDEX_NAME)
+
+
+def build_index():
+	index = get_search_index() or GlobalSearchIndex(INDEX_NAME)
+	index.build()
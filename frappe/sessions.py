@@ -8,11 +8,18 @@ Boot session from cache or build
 
 Session bootstraps info needed by common client side activities including
 permission, homepage, default variables, system defaults etc
+
+Sessions are read from and written to the cache. Their expiry (`lastupdate`) and the
+user's `last_active` are queued and written to the database in batches by
+`flush_session_updates`, the `tabSessions` record is only read to restore sessions
+missing in the cache (e.g. after a restart of redis).
 """
+import ast
 import json
 
 import redis
 from six import text_type
+from six.moves import cPickle as pickle
 from six.moves.urllib.parse import unquote
 
 import frappe
@@ -24,6 +31,10 @@ from frappe import _
 from frappe.cache_manager import clear_user_cache
 from frappe.utils import cint, cstr
 
+# sessions are queued for a database update at most this often
+SESSION_UPDATE_INTERVAL = 600
+SESSION_FLUSH_BATCH_SIZE = 500
+
 
 @frappe.whitelist()
 def clear():
@@ -134,9 +145,87 @@ def clear_expired_sessions():
 		delete_session(sid, reason="Session Expired")
 
 
-def get():
-	"""get session boot info"""
-	from frappe.boot import get_bootinfo, get_unseen_notes
+def queue_session_update(sid, user, last_updated):
+	frappe.cache().hset("session_updates", sid, {"user": user, "last_updated": last_updated})
+
+
+def pop_session_updates():
+	"""Queued session updates as a dict of sid: {user, last_updated}, removing them"""
+	key = frappe.cache().make_key("session_updates")
+	pipeline = frappe.cache().pipeline()
+	pipeline.hgetall(key)
+	pipeline.delete(key)
+	updates = pipeline.execute()[0]
+
+	return {frappe.safe_decode(sid): pickle.loads(value) for sid, value in updates.items()}
+
+
+def flush_session_updates():
+	"""Write queued session expiry and last active time of users to the database in
+	batches. Called from the scheduler."""
+	updates = pop_session_updates()
+	if not updates:
+		return
+
+	sessions = []
+	for sid in updates:
+		data = frappe.cache().hget("session", sid)
+		if data:
+			sessions.append((sid, dump_session_data(data["data"])))
+
+	last_active = {}
+	for update in updates.values():
+		last_active[update["user"]] = max(update["last_updated"], last_active.get(update["user"], ""))
+
+	datetime_type = "timestamp" if frappe.db.db_type == "postgres" else "datetime"
+
+	for i in range(0, len(sessions), SESSION_FLUSH_BATCH_SIZE):
+		batch = sessions[i : i + SESSION_FLUSH_BATCH_SIZE]
+		frappe.db.sql(
+			"""update `tabSessions`
+			set `sessiondata` = case `sid` {cases} end, `lastupdate` = NOW()
+			where `sid` in ({sids})""".format(
+				cases=" ".join(["when %s then %s"] * len(batch)), sids=", ".join(["%s"] * len(batch))
+			),
+			[value for session in batch for value in session] + [sid for sid, data in batch],
+		)
+
+	users = list(last_active.items())
+	for i in range(0, len(users), SESSION_FLUSH_BATCH_SIZE):
+		batch = users[i : i + SESSION_FLUSH_BATCH_SIZE]
+		frappe.db.sql(
+			"""update `tabUser`
+			set `last_active` = case `name` {cases} end
+			where `name` in ({names})""".format(
+				cases=" ".join(["when %s then cast(%s as {0})".format(datetime_type)] * len(batch)),
+				names=", ".join(["%s"] * len(batch)),
+			),
+			[value for user in batch for value in user] + [user for user, timestamp in batch],
+		)
+
+	frappe.db.commit()
+
+
+def dump_session_data(data):
+	return json.dumps(data, separators=(",", ":"), default=str)
+
+
+def load_session_data(sessiondata):
+	if not sessiondata:
+		return {}
+
+	try:
+		return json.loads(sessiondata)
+	except ValueError:
+		# stored as `str(dict)` before
+		return ast.literal_eval(sessiondata)
+
+
+def get(include_sections=False):
+	"""get session boot info
+
+	:param include_sections: include data of boot sections (the desk loads them separately)"""
+	from frappe.boot import add_boot_sections, get_bootinfo, get_unseen_notes
 	from frappe.utils.change_log import get_change_log
 
 	bootinfo = None
@@ -169,6 +258,7 @@ def get():
 		bootinfo["metadata_version"] = frappe.reset_metadata_version()
 
 	bootinfo.notes = get_unseen_notes()
+	add_boot_sections(bootinfo, include_data=include_sections)
 
 	for hook in frappe.get_hooks("extend_bootinfo"):
 		frappe.get_attr(hook)(bootinfo=bootinfo)
@@ -268,7 +358,7 @@ class Session:
 			"""insert into `tabSessions`
 			(`sessiondata`, `user`, `lastupdate`, `sid`, `status`, `device`)
 			values (%s , %s, NOW(), %s, 'Active', %s)""",
-			(str(self.data["data"]), self.data["user"], self.data["sid"], self.device),
+			(dump_session_data(self.data["data"]), self.data["user"], self.data["sid"], self.device),
 		)
 
 		# also add to memcache
@@ -335,20 +425,24 @@ class Session:
 		return data and data.data
 
 	def get_session_data_from_db(self):
-		self.device = frappe.db.sql("SELECT `device` FROM `tabSessions` WHERE `sid`=%s", self.sid)
-		self.device = self.device and self.device[0][0] or "desktop"
-
 		rec = frappe.db.sql(
 			"""
-			SELECT `user`, `sessiondata`
-			FROM `tabSessions` WHERE `sid`=%s AND
-			(NOW() - lastupdate) < %s
+			SELECT `user`, `sessiondata`, `device`
+			FROM `tabSessions` WHERE `sid`=%s AND (
+				(`device`='mobile' AND (NOW() - lastupdate) < %s)
+				OR (coalesce(`device`, '')!='mobile' AND (NOW() - lastupdate) < %s)
+			)
 			""",
-			(self.sid, get_expiry_period_for_query(self.device)),
+			(
+				self.sid,
+				get_expiry_period_for_query("mobile"),
+				get_expiry_period_for_query("desktop"),
+			),
 		)
 
 		if rec:
-			data = frappe._dict(eval(rec and rec[0][1] or "{}"))
+			self.device = rec[0][2] or "desktop"
+			data = frappe._dict(load_session_data(rec[0][1]))
 			data.user = rec[0][0]
 		else:
 			self._delete_session()
@@ -374,18 +468,17 @@ class Session:
 		self.data["data"]["last_updated"] = now
 		self.data["data"]["lang"] = str(frappe.lang)
 
-		# update session in db
 		last_updated = frappe.cache().hget("last_db_session_update", self.sid)
 		time_diff = frappe.utils.time_diff_in_seconds(now, last_updated) if last_updated else None
 
-		# database persistence is secondary, don't update it too often
+		# database persistence is secondary, only to restore sessions missing in cache
 		updated_in_db = False
-		if force or (time_diff == None) or (time_diff > 600):
+		if force:
 			# update sessions table
 			frappe.db.sql(
 				"""update `tabSessions` set sessiondata=%s,
 				lastupdate=NOW() where sid=%s""",
-				(str(self.data["data"]), self.data["sid"]),
+				(dump_session_data(self.data["data"]), self.data["sid"]),
 			)
 
 			# update last active in user table
@@ -399,6 +492,11 @@ class Session:
 
 			updated_in_db = True
 
+		elif time_diff is None or time_diff > SESSION_UPDATE_INTERVAL:
+			# written to the database by `flush_session_updates`
+			queue_session_update(self.sid, frappe.session.user, now)
+			frappe.cache().hset("last_db_session_update", self.sid, now)
+
 		# set in memcache
 		frappe.cache().hset("session", self.sid, self.data)
 
@@ -0,0 +1,76 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# MIT License. See license.txt
+
+"""
+Measure the per-call overhead `frappe.db.sql` adds on top of executing a query.
+
+	bench --site [site] execute frappe.tests.benchmark_db.run --kwargs "{'count': 100000}"
+
+`uncached` repeats the steps `sql` used to run on every call (two regex passes and three
+classifications of the query text), `cached` is the lookup in the normalized query
+cache. `sql` is the complete round trip of a trivial query for comparison.
+"""
+
+import re
+import time
+
+import frappe
+from frappe.database.database import clear_query_cache, get_query_info, parse_query
+from frappe.model.base_document import get_insert_query
+
+QUERIES = (
+	"select `name`, `owner` from `tabToDo` where `name`=%s",
+	"SELECT `current` FROM `tabSeries` WHERE `name`=%s FOR UPDATE",
+	"UPDATE `tabSeries` SET `current` = `current` + 1 WHERE `name`=%s",
+	"""select ifnull(sum(`allocated`), 0)
+		from `tabToDo` where `reference_type`=%s and `reference_name`=%s""",
+)
+
+
+def prepare_uncached(query):
+	query = re.sub(r"^\s*|\s*$", "", query)
+	if re.search(r"ifnull\(", query, flags=re.IGNORECASE):
+		query = re.sub(r"ifnull\(", "coalesce(", query, flags=re.IGNORECASE)
+
+	query.strip().split()[0].lower() in ["start", "alter", "drop", "create", "begin", "truncate"]
+	query.strip().lower() in ("commit", "rollback")
+	query[:6].lower() in ("update", "insert", "delete")
+	query.strip().split()[0].lower() in {"drop", "create"}
+	return query
+
+
+def run(count=100000, rounds=3):
+	insert_query = get_insert_query("ToDo", tuple(frappe.get_meta("ToDo").get_valid_columns()))
+	queries = QUERIES + (insert_query,)
+
+	clear_query_cache()
+	preparers = {
+		"uncached": prepare_uncached,
+		"parse": lambda query: parse_query(query).query,
+		"cached": lambda query: get_query_info(query).query,
+	}
+
+	results = {}
+	for name, prepare in preparers.items():
+		results[name] = best_of(rounds, lambda: [prepare(q) for _ in range(count) for q in queries])
+
+	sql_count = max(count // 100, 1)
+	results["sql"] = best_of(
+		rounds, lambda: [frappe.db.sql("select %s", (i,)) for i in range(sql_count)]
+	)
+
+	for name, seconds in results.items():
+		calls = sql_count if name == "sql" else count * len(queries)
+		print("{0:<10} {1:.3f} µs per call".format(name, seconds / calls * 1e6))
+
+	return results
+
+
+def best_of(rounds, func):
+	timings = []
+	for _ in range(rounds):
+		start = time.perf_counter()
+		func()
+		timings.append(time.perf_counter() - start)
+
+	return min(timings)
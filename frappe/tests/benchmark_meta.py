@@ -0,0 +1,65 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# MIT License. See license.txt
+
+"""
+Compare loading cached meta from `as_dict` payloads (previous format) and from
+snapshots made by `make_meta_snapshot`.
+
+	bench --site [site] execute frappe.tests.benchmark_meta.run --kwargs "{'count': 500}"
+
+For `count` doctypes (repeated if the site has fewer) this measures the time to
+unpickle and build `Meta` on a cold request and the memory held by the built objects.
+"""
+
+import gc
+import pickle
+import time
+import tracemalloc
+
+import frappe
+from frappe.model.meta import Meta, load_meta_snapshot, make_meta_snapshot
+
+
+def run(count=500, rounds=3):
+	doctypes = frappe.get_all("DocType", pluck="name", order_by="name")
+	doctypes = (doctypes * (count // len(doctypes) + 1))[:count]
+
+	metas = {doctype: Meta(doctype) for doctype in set(doctypes)}
+	payloads = {
+		"as_dict": {d: pickle.dumps(meta.as_dict()) for d, meta in metas.items()},
+		"snapshot": {d: pickle.dumps(make_meta_snapshot(meta)) for d, meta in metas.items()},
+	}
+	loaders = {
+		"as_dict": Meta,
+		"snapshot": load_meta_snapshot,
+	}
+
+	results = {}
+	for name, loader in loaders.items():
+		timings = []
+		for _ in range(rounds):
+			gc.collect()
+			start = time.perf_counter()
+			[loader(pickle.loads(payloads[name][d])) for d in doctypes]
+			timings.append(time.perf_counter() - start)
+
+		gc.collect()
+		tracemalloc.start()
+		loaded = [loader(pickle.loads(payloads[name][d])) for d in doctypes]
+		memory, _ = tracemalloc.get_traced_memory()
+		tracemalloc.stop()
+		del loaded
+
+		results[name] = {
+			"seconds": round(min(timings), 4),
+			"memory_mb": round(memory / 1024 / 1024, 2),
+			"payload_kb": round(sum(len(p) for p in payloads[name].values()) / 1024, 1),
+		}
+
+	for name, result in results.items():
+		print(
+			"{0:<10} cold get_meta for {1} doctypes: {seconds}s, {memory_mb} MB held, "
+			"{payload_kb} KB in cache".format(name, count, **result)
+		)
+
+	return results
@@ -0,0 +1,74 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# MIT License. See license.txt
+
+"""
+Measure the user permission filtering of script report rows by `get_filtered_data`.
+
+	bench --site [site] execute frappe.tests.benchmark_query_report.run --kwargs "{'rows': 200000}"
+
+Rows have a link column for each of `DOCTYPES`, with values picked from all documents
+of the doctype. The user is allowed a few of them per doctype. `per row` checks a sample
+of the rows like `has_match` used to, with `frappe.db.exists` for every value that is not
+allowed, `sets` filters all rows with the denied values from `get_denied_values`.
+"""
+
+import random
+import time
+from unittest.mock import patch
+
+import frappe
+from frappe.desk.query_report import (
+	get_columns_dict,
+	get_filtered_data,
+	get_linked_doctypes,
+	has_match,
+)
+
+DOCTYPES = ("DocType", "Role", "Module Def", "Language", "User")
+
+# allowed values per doctype
+ALLOWED_COUNT = 3
+
+
+def run(rows=200000, sample_rows=2000, seed=0):
+	random.seed(seed)
+	names = {dt: frappe.get_all(dt, pluck="name") or ["_Test " + dt] for dt in DOCTYPES}
+	columns = [
+		{"label": dt, "fieldname": frappe.scrub(dt), "fieldtype": "Link", "options": dt}
+		for dt in DOCTYPES
+	]
+	data = [[random.choice(names[dt]) for dt in DOCTYPES] for _ in range(rows)]
+	match_filters = {dt: [{dt: names[dt][:ALLOWED_COUNT]}] for dt in DOCTYPES}
+
+	sample = data[:sample_rows]
+	linked_doctypes = get_linked_doctypes(columns, sample)
+	columns_dict = get_columns_dict(columns)
+
+	start = time.perf_counter()
+	per_row = [
+		row
+		for row in sample
+		if has_match(row, linked_doctypes, match_filters, "ToDo", None, columns_dict, "Administrator")
+	]
+	per_row_time = time.perf_counter() - start
+
+	with patch("frappe.desk.query_report.get_user_match_filters", return_value=match_filters):
+		# both filter the same rows
+		assert get_filtered_data("ToDo", columns, sample, "Administrator") == per_row
+
+		start = time.perf_counter()
+		result = get_filtered_data("ToDo", columns, data, "Administrator")
+		sets_time = time.perf_counter() - start
+
+	print(
+		"per row  {0:.2f} s for {1} rows, {2:.1f} µs per row".format(
+			per_row_time, len(sample), per_row_time / len(sample) * 1e6
+		)
+	)
+	print(
+		"sets     {0:.2f} s for {1} rows, {2:.1f} µs per row, {3} rows allowed".format(
+			sets_time, rows, sets_time / rows * 1e6, len(result)
+		)
+	)
+
+	return {"per row": per_row_time / len(sample), "sets": sets_time / rows}
@@ -0,0 +1,74 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# MIT License. See license.txt
+
+"""
+Compare the throughput of the forking and the persistent (`bench worker --persistent`)
+worker for jobs that do almost nothing, i.e. the per job overhead of the worker.
+
+	bench --site [site] execute frappe.tests.benchmark_worker.run --kwargs "{'count': 10000}"
+
+Jobs are enqueued in a separate queue, so running workers do not pick them up. Both
+workers run in burst mode in a child process to keep this process' site context intact.
+"""
+
+import multiprocessing
+import time
+
+from rq import Queue, SimpleWorker, Worker
+from werkzeug.local import release_local
+
+import frappe
+import frappe.utils.background_jobs
+from frappe.utils.background_jobs import execute_job, get_redis_conn
+
+QUEUE_NAME = "benchmark_worker"
+
+
+def run(count=10000):
+	results = {}
+	for name, persistent in (("fork", False), ("persistent", True)):
+		enqueue_noop_jobs(count)
+
+		start = time.perf_counter()
+		worker = multiprocessing.Process(target=work, args=(persistent,))
+		worker.start()
+		worker.join()
+		results[name] = time.perf_counter() - start
+
+	for name, seconds in results.items():
+		print(
+			"{0:<12} {1:.2f} s, {2:.0f} jobs/s, {3:.3f} ms per job".format(
+				name, seconds, count / seconds, seconds / count * 1000
+			)
+		)
+
+	return results
+
+
+def enqueue_noop_jobs(count):
+	queue = Queue(QUEUE_NAME, connection=get_redis_conn())
+	queue.empty()
+
+	kwargs = {
+		"site": frappe.local.site,
+		"user": "Administrator",
+		"method": "frappe.handler.ping",
+		"event": None,
+		"job_name": "frappe.handler.ping",
+		"is_async": True,
+		"kwargs": {},
+	}
+	for _ in range(count):
+		queue.enqueue_call(execute_job, kwargs=kwargs)
+
+
+def work(persistent):
+	# needs the site config, connect before the site context is released
+	queue = Queue(QUEUE_NAME, connection=get_redis_conn())
+
+	# start without the parent's site context, jobs set up their own
+	release_local(frappe.local)
+	frappe.utils.background_jobs.persistent_worker = persistent
+	worker_class = SimpleWorker if persistent else Worker
+
+	worker_class([queue], connection=queue.connection).work(burst=True, logging_level="WARNING")
@@ -7,7 +7,13 @@ from rq import Queue
 
 import frappe
 from frappe.core.page.background_jobs.background_jobs import remove_failed_jobs
-from frappe.utils.background_jobs import execute_job, get_redis_conn
+from frappe.utils.background_jobs import (
+	execute_job,
+	get_jobs,
+	get_redis_conn,
+	is_job_queued,
+	remove_from_job_index,
+)
 
 
 class TestBackgroundJobs(unittest.TestCase):
@@ -50,6 +56,43 @@ class TestBackgroundJobs(unittest.TestCase):
 			self.assertLess(_test_JOB_HOOK.get("before_job"), _test_JOB_HOOK.get("after_job"))
 
 
+	def test_job_index(self):
+		job_name = "test_job_index_" + frappe.generate_hash(length=8)
+		job = frappe.enqueue(
+			"frappe.utils.background_jobs.test_job", queue="long", job_name=job_name, s=30
+		)
+		self.addCleanup(job.delete)
+
+		self.assertTrue(is_job_queued(job_name))
+		self.assertTrue(is_job_queued(job_name, queue="long"))
+		self.assertFalse(is_job_queued(job_name, queue="short"))
+		self.assertIn(job_name, get_jobs(site=frappe.local.site, key="job_name")[frappe.local.site])
+
+		# deduplicate skips jobs that are already queued or running
+		self.assertIsNone(
+			frappe.enqueue(
+				"frappe.utils.background_jobs.test_job",
+				queue="long",
+				job_name=job_name,
+				deduplicate=True,
+				s=30,
+			)
+		)
+
+		# a job with the same name that ends first doesn't hide the queued one
+		second_job = frappe.enqueue(
+			"frappe.utils.background_jobs.test_job", queue="long", job_name=job_name, s=30
+		)
+		second_job.delete()
+		remove_from_job_index(second_job, {"job_name": job_name})
+		self.assertTrue(is_job_queued(job_name))
+
+		# entries of jobs that no longer exist are ignored and dropped
+		job.delete()
+		self.assertFalse(is_job_queued(job_name))
+		self.assertNotIn(job_name, get_jobs(site=frappe.local.site, key="job_name")[frappe.local.site])
+
+
 def fail_function():
 	return 1 / 0
 
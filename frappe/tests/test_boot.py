@@ -1,5 +1,5 @@
 import frappe
-from frappe.boot import get_user_pages_or_reports
+from frappe.boot import add_boot_sections, get_sections, get_user_pages_or_reports
 from frappe.tests.utils import FrappeTestCase
 
 
@@ -47,3 +47,22 @@ class TestBootData(FrappeTestCase):
 		# Test user must not see admin user's report
 		self.assertNotIn("Test Admin Report", allowed_reports)
 		self.assertIn("Test User Report", allowed_reports)
+
+	def test_boot_sections(self):
+		frappe.set_user("Administrator")
+		bootinfo = frappe._dict()
+		add_boot_sections(bootinfo)
+
+		self.assertNotIn("user_info", bootinfo)
+		self.assertIn("user_info", bootinfo.boot_sections["user_info"]["keys"])
+		self.assertTrue(bootinfo.boot_sections["email_accounts"]["lazy"])
+
+		sections = get_sections(["user_info", "unknown"])
+		self.assertEqual(list(sections), ["user_info"])
+		self.assertIn("Administrator", sections["user_info"]["data"]["user_info"])
+		self.assertEqual(sections["user_info"]["hash"], bootinfo.boot_sections["user_info"]["hash"])
+
+		# clearing a user's cache keeps site wide sections
+		frappe.clear_cache(user="Administrator")
+		self.assertTrue(frappe.cache().hget("boot_section:user_info", "*"))
+		self.assertFalse(frappe.cache().hget("boot_section:desktop", "Administrator"))
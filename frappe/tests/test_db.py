@@ -327,6 +327,103 @@ class TestDB(unittest.TestCase):
 		for d in created_docs:
 			self.assertTrue(frappe.db.exists("ToDo", d))
 
+	def test_bulk_insert_chunks(self):
+		names = [random_string(10) for _ in range(7)]
+		with patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql:
+			frappe.db.bulk_insert(
+				"ToDo", ["name", "description"], [(name, "bulk") for name in names], chunk_size=3
+			)
+			# 7 rows in chunks of 3 => 3 statements
+			self.assertEqual(sql.call_count, 3)
+
+		for name in names:
+			self.assertTrue(frappe.db.exists("ToDo", name))
+
+	def test_read_replica_routing(self):
+		from frappe.database import replica
+
+		fake_replica = frappe._dict(
+			is_replica=True,
+			replica_config={"host": "replica"},
+			get_replication_lag=lambda: 0,
+			close=lambda: None,
+		)
+		replica._replica_health.clear()
+
+		with patch.dict(
+			frappe.local.conf,
+			{"replica_routing": {"get_value": 1}, "read_replicas": [{"host": "replica"}]},
+		), patch.dict(frappe.flags, {"in_test": False, "wrote_to_primary": False}), patch.object(
+			replica, "connect", return_value=fake_replica
+		), patch.object(
+			replica, "is_get_request", return_value=True
+		), patch.object(
+			frappe.db, "transaction_writes", 0
+		):
+			self.assertIs(replica.get_replica("get_value"), fake_replica)
+			# not enabled in policy
+			self.assertIsNone(replica.get_replica("count"))
+
+			# read your writes
+			frappe.flags.wrote_to_primary = True
+			self.assertIsNone(replica.get_replica("get_value"))
+			frappe.flags.wrote_to_primary = False
+
+			# lagging replica
+			frappe.local.replica_db = None
+			replica._replica_health.clear()
+			fake_replica.get_replication_lag = lambda: 3600
+			self.assertIsNone(replica.get_replica("get_value"))
+
+		frappe.local.replica_db = None
+		replica._replica_health.clear()
+
+	def test_query_info(self):
+		from frappe.database.database import get_query_info
+
+		info = get_query_info("\n\tselect IFNULL(`a`, 0) from `tabToDo` ")
+		self.assertEqual(info.query, "select coalesce(`a`, 0) from `tabToDo`")
+		self.assertEqual(info.command, "select")
+		self.assertFalse(info.is_write)
+		self.assertIs(info, get_query_info("\n\tselect IFNULL(`a`, 0) from `tabToDo` "))
+
+		info = get_query_info('update `tabToDo` join "tabToDo Item" set `x`=%s')
+		self.assertTrue(info.is_write)
+		self.assertEqual(set(info.tables), {"tabToDo", "tabToDo Item"})
+
+		self.assertTrue(get_query_info("ALTER TABLE `tabToDo` ADD COLUMN x int").is_ddl)
+
+	def test_stream(self):
+		import types
+
+		query = "select name from tabDocType order by name"
+		expected = frappe.db.sql_list(query)
+
+		rows = frappe.db.sql(query, as_iterator=True)
+		self.assertIsInstance(rows, types.GeneratorType)
+		self.assertEqual([row[0] for row in rows], expected)
+
+		batches = list(frappe.db.stream(query, batch_size=10))
+		self.assertTrue(all(len(batch) <= 10 for batch in batches))
+		self.assertEqual([row[0] for batch in batches for row in batch], expected)
+
+		rows = frappe.get_all("DocType", fields=["name"], order_by="name asc", as_iterator=True)
+		self.assertIsInstance(rows, types.GeneratorType)
+		self.assertEqual([row.name for row in rows], expected)
+
+		names = frappe.get_all("DocType", order_by="name asc", pluck="name", as_iterator=True)
+		self.assertEqual(list(names), expected)
+
+		rows = frappe.db.sql(query, as_list=True, as_iterator=True)
+		self.assertEqual(list(rows), [[name] for name in expected])
+
+		rows = frappe.db.sql("select name from `tabNo Such Table`", ignore_ddl=True, as_iterator=True)
+		self.assertEqual(list(rows), [])
+
+		self.assertRaises(
+			NotImplementedError, frappe.db.sql, query, formatted=True, as_iterator=True
+		)
+
 	@run_only_if(db_type_is.MARIADB)
 	def test_transaction_writes_error(self):
 		from frappe.database.database import Database
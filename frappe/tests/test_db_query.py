@@ -5,6 +5,7 @@ from __future__ import unicode_literals
 import datetime
 import unittest
 from contextlib import contextmanager
+from unittest.mock import patch
 
 import frappe
 from frappe.core.page.permission_manager.permission_manager import add, reset, update
@@ -58,6 +59,40 @@ class TestReportview(unittest.TestCase):
 
 		frappe.set_user("Administrator")
 
+	def test_permission_predicate_cache(self):
+		clear_user_permissions_for_doctype("Blog Post", "test2@example.com")
+		frappe.get_doc("User", "test2@example.com").add_roles("Blogger")
+		frappe.cache().hdel("permission_predicates", "test2@example.com")
+		frappe.set_user("test2@example.com")
+
+		with patch.object(
+			DatabaseQuery,
+			"compile_permission_predicate",
+			autospec=True,
+			side_effect=DatabaseQuery.compile_permission_predicate,
+		) as compile_predicate:
+			DatabaseQuery("Blog Post").build_match_conditions()
+			DatabaseQuery("Blog Post").build_match_conditions()
+			self.assertEqual(compile_predicate.call_count, 1)
+
+			# user permissions invalidate the cached predicate
+			add_user_permission("Blog Post", "-test-blog-post", "test2@example.com", True)
+			self.assertIn("-test-blog-post", DatabaseQuery("Blog Post").build_match_conditions())
+			self.assertEqual(compile_predicate.call_count, 2)
+
+		with patch("frappe.model.db_query.MAX_INLINE_USER_PERMISSIONS", 0):
+			frappe.cache().hdel("permission_predicates", "test2@example.com")
+			conditions = DatabaseQuery("Blog Post").build_match_conditions()
+			self.assertIn("select `for_value` from `tabUser Permission`", conditions)
+			self.assertNotIn("-test-blog-post", conditions)
+			self.assertIn(
+				"-test-blog-post",
+				[d.name for d in frappe.get_list("Blog Post", filters={"name": "-test-blog-post"})],
+			)
+
+		frappe.set_user("Administrator")
+		clear_user_permissions_for_doctype("Blog Post", "test2@example.com")
+
 	def test_fields(self):
 		self.assertTrue(
 			{"name": "DocType", "issingle": 0}
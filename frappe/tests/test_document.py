@@ -2,7 +2,7 @@
 # MIT License. See license.txt
 
 import unittest
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import frappe
 from frappe.model.naming import make_autoname, parse_naming_series, revert_series_if_last
@@ -138,6 +138,22 @@ class TestDocument(unittest.TestCase):
 
 		self.assertEqual(frappe.db.get_value("User", d.name), d.name)
 
+	def test_link_validation_is_batched(self):
+		d = frappe.get_doc(
+			{
+				"doctype": "User",
+				"email": "test_batched_link_validation@example.com",
+				"first_name": "Batched Link Validation",
+				"roles": [{"role": "System Manager"} for _ in range(20)],
+			}
+		)
+
+		with patch.object(frappe.db, "get_values", wraps=frappe.db.get_values) as get_values:
+			d._validate_links()
+			queried_doctypes = [call.args[0] for call in get_values.call_args_list]
+			# one query for all 20 roles
+			self.assertEqual(queried_doctypes.count("Role"), 1)
+
 	def test_validate(self):
 		d = self.test_insert()
 		d.starts_on = "2014-01-01"
@@ -295,6 +311,93 @@ class TestDocument(unittest.TestCase):
 		todo.save()
 		self.assertEqual(todo.notify_update.call_count, 1)
 
+	def test_bulk_insert_docs(self):
+		docs = [
+			frappe.get_doc(
+				{
+					"doctype": "Event",
+					"subject": "test-doc-bulk-insert {0}".format(i),
+					"starts_on": "2014-01-01",
+					"event_type": "Public",
+					"event_participants": [
+						{"reference_doctype": "User", "reference_docname": "Administrator"}
+					],
+				}
+			)
+			for i in range(5)
+		]
+		frappe.db.bulk_insert_docs(docs, chunk_size=2)
+
+		for doc in docs:
+			self.assertFalse(doc.is_new())
+			self.assertEqual(frappe.db.get_value("Event", doc.name, "subject"), doc.subject)
+			self.assertEqual(
+				frappe.db.count("Event Participants", {"parent": doc.name, "parenttype": "Event"}), 1
+			)
+
+		doc = frappe.get_doc(
+			{
+				"doctype": "Event",
+				"subject": "test-doc-bulk-insert-children",
+				"starts_on": "2014-01-01",
+				"event_type": "Public",
+				"event_participants": [
+					{"reference_doctype": "User", "reference_docname": "Administrator"},
+					{"reference_doctype": "User", "reference_docname": "Guest"},
+				],
+			}
+		).insert(bulk=True)
+		self.assertEqual(
+			frappe.db.count("Event Participants", {"parent": doc.name, "parenttype": "Event"}), 2
+		)
+
+	def test_bulk_insert_docs_ignore_if_duplicate(self):
+		frappe.delete_doc_if_exists("Role", "_Test Bulk Insert Role 1")
+		frappe.delete_doc_if_exists("Role", "_Test Bulk Insert Role 2")
+		frappe.get_doc(doctype="Role", role_name="_Test Bulk Insert Role 1").insert()
+
+		docs = [
+			frappe.get_doc(doctype="Role", role_name="_Test Bulk Insert Role 1"),
+			frappe.get_doc(doctype="Role", role_name="_Test Bulk Insert Role 2"),
+		]
+		frappe.db.bulk_insert_docs(docs, ignore_if_duplicate=True)
+		self.assertTrue(frappe.db.exists("Role", "_Test Bulk Insert Role 2"))
+
+		def get_event(name=None):
+			return frappe.get_doc(
+				{
+					"doctype": "Event",
+					"name": name,
+					"subject": "test-doc-bulk-insert-duplicate",
+					"starts_on": "2014-01-01",
+					"event_type": "Public",
+					"event_participants": [
+						{"reference_doctype": "User", "reference_docname": "Administrator"}
+					],
+				}
+			)
+
+		existing = get_event().insert()
+		duplicate, new = get_event(existing.name), get_event()
+		duplicate.run_post_save_methods = Mock()
+
+		# keep the given name of the duplicate
+		with patch.dict(frappe.flags, {"in_import": True}):
+			frappe.db.bulk_insert_docs([duplicate, new], ignore_if_duplicate=True)
+
+		self.assertTrue(duplicate.is_new())
+		self.assertFalse(new.is_new())
+		duplicate.run_post_save_methods.assert_not_called()
+		self.assertEqual(
+			frappe.db.count("Event Participants", {"parent": existing.name, "parenttype": "Event"}), 1
+		)
+		self.assertEqual(
+			frappe.db.count("Event Participants", {"parent": new.name, "parenttype": "Event"}), 1
+		)
+
+		docs = [frappe.get_doc(doctype="Role", role_name="_Test Bulk Insert Role 2")]
+		self.assertRaises(frappe.DuplicateEntryError, frappe.db.bulk_insert_docs, docs)
+
 
 class TestDocumentWebView(unittest.TestCase):
 	def get(self, path):
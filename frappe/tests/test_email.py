@@ -6,6 +6,7 @@ from __future__ import unicode_literals
 import email
 import re
 import unittest
+from unittest.mock import patch
 
 from six import PY3
 
@@ -82,6 +83,63 @@ class TestEmail(unittest.TestCase):
 		self.assertEqual(len(queue_recipients), 2)
 		self.assertTrue("Unsubscribe" in frappe.safe_decode(frappe.flags.sent_mail))
 
+	def test_send_batch(self):
+		from frappe.email.queue import send_batch
+
+		self.test_email_queue()
+		self.test_email_queue()
+
+		send_batch(auto_commit=False)
+		self.assertEqual(
+			frappe.db.sql("""select status from `tabEmail Queue`"""), (("Sent",), ("Sent",))
+		)
+		self.assertFalse(
+			frappe.db.sql("""select name from `tabEmail Queue Recipient` where status!='Sent'""")
+		)
+
+	def test_send_batch_until_queue_is_empty(self):
+		from frappe.email.queue import reclaim_stale_emails, send_batch
+		from frappe.utils import add_to_date, now_datetime
+
+		self.test_email_queue()
+		self.test_email_queue()
+
+		# left in Sending by a batch job that was killed
+		name = frappe.db.sql("""select name from `tabEmail Queue` limit 1""")[0][0]
+		frappe.db.sql(
+			"""update `tabEmail Queue` set status='Sending', modified=%s where name=%s""",
+			(add_to_date(now_datetime(), hours=-1), name),
+		)
+		reclaim_stale_emails(auto_commit=False)
+		self.assertEqual(frappe.db.get_value("Email Queue", name, "status"), "Not Sent")
+
+		send_batch(batch_size=1, auto_commit=False)
+		self.assertEqual(
+			frappe.db.sql("""select status from `tabEmail Queue`"""), (("Sent",), ("Sent",))
+		)
+
+	def test_email_rate_limit(self):
+		from frappe.email.queue import check_email_rate_limit
+
+		email_account = frappe._dict(name="_Test Rate Limit", rate_limit=3)
+		key = frappe.cache().make_key("email_rate_limit:_Test Rate Limit:1000")
+
+		with patch("frappe.email.queue.time") as time:
+			time.time.return_value = 1000 * 60 + 1
+			self.assertTrue(check_email_rate_limit(email_account, 2))
+			self.assertFalse(check_email_rate_limit(email_account, 2))
+			self.assertTrue(check_email_rate_limit(email_account, 1))
+			self.assertFalse(check_email_rate_limit(email_account, 1))
+
+		frappe.cache().delete(key)
+
+		# an email with more recipients than the limit is not held back forever
+		with patch("frappe.email.queue.time") as time:
+			time.time.return_value = 1000 * 60 + 1
+			self.assertTrue(check_email_rate_limit(email_account, 5))
+
+		frappe.cache().delete(key)
+
 	def test_cc_header(self):
 		# test if sending with cc's makes it into header
 		frappe.sendmail(
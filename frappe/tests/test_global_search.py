@@ -4,6 +4,7 @@
 from __future__ import unicode_literals
 
 import unittest
+from unittest.mock import patch
 
 import frappe
 import frappe.utils
@@ -81,6 +82,50 @@ class TestGlobalSearch(unittest.TestCase):
 
 		self.assertTrue("testing global search" in results[0].content)
 
+	def test_sync_queue_in_batches(self):
+		value = dict(doctype="Event", name="_Test Batch", published=0, title="", route="")
+		for i in range(5):
+			global_search.sync_value_in_queue(dict(value, content="batch version {0}".format(i)))
+		global_search.sync_value_in_queue(dict(value, name="_Test Batch 2", content="other"))
+
+		global_search.sync_global_search()
+		self.assertEqual(frappe.cache().llen("global_search_queue"), 0)
+
+		content = dict(frappe.db.sql("select `name`, `content` from `__global_search`"))
+		# last queued value of a document wins
+		self.assertEqual(content["_Test Batch"], "batch version 4")
+		self.assertEqual(content["_Test Batch 2"], "other")
+
+	def test_search_index(self):
+		with patch.dict(frappe.conf, {"global_search_index": 1}):
+			global_search.reset()
+			self.insert_test_events()
+
+			# words match by their beginning
+			results = global_search.search("awak")
+			self.assertEqual(len(results), 1)
+			self.assertIn("After Mulder awakens", results[0].content)
+
+			results = global_search.search("extinct & coma")
+			self.assertEqual(len(results), 3)
+
+			# only doctypes allowed in Global Search Settings are searched
+			with patch(
+				"frappe.desk.doctype.global_search_settings.global_search_settings."
+				"get_doctypes_for_global_search",
+				return_value=["User"],
+			):
+				self.assertEqual(global_search.search("extinct & coma"), [])
+				self.assertEqual(global_search.search("extinct & coma", doctype="Event"), [])
+
+			event_name = results[0].name
+			frappe.delete_doc("Event", event_name)
+			results = global_search.search("extinct & coma")
+			self.assertTrue(all(r.name != event_name for r in results))
+
+			global_search.reset()
+			self.assertEqual(global_search.search("awak"), [])
+
 	def test_update_fields(self):
 		self.insert_test_events()
 		results = global_search.search("Monthly")
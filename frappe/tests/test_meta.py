@@ -0,0 +1,91 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# MIT License. See license.txt
+
+import unittest
+
+import frappe
+from frappe.model.meta import Meta, load_meta_snapshot, make_meta_snapshot
+
+
+class TestMetaSnapshot(unittest.TestCase):
+	def test_snapshot_roundtrip(self):
+		for doctype in ("User", "ToDo", "DocType", "Has Role"):
+			meta = Meta(doctype)
+			loaded = load_meta_snapshot(make_meta_snapshot(meta))
+
+			self.assertEqual(loaded.name, meta.name)
+			self.assertEqual(
+				[df.fieldname for df in loaded.fields], [df.fieldname for df in meta.fields]
+			)
+			self.assertEqual(loaded.get_valid_columns(), meta.get_valid_columns())
+			self.assertEqual(
+				[df.fieldname for df in loaded.get_link_fields()],
+				[df.fieldname for df in meta.get_link_fields()],
+			)
+			self.assertEqual(
+				[df.fieldname for df in loaded.get_table_fields()],
+				[df.fieldname for df in meta.get_table_fields()],
+			)
+			self.assertEqual(
+				[df.fieldname for df in loaded.get_high_permlevel_fields()],
+				[df.fieldname for df in meta.get_high_permlevel_fields()],
+			)
+			self.assertEqual(len(loaded.permissions), len(meta.permissions))
+
+	def test_snapshot_fields_behave_like_docfields(self):
+		meta = load_meta_snapshot(make_meta_snapshot(Meta("User")))
+		df = meta.get_field("email")
+
+		self.assertEqual(df.doctype, "DocField")
+		self.assertEqual(df.get("fieldtype"), "Data")
+		self.assertEqual(df.as_dict().fieldname, "email")
+		self.assertIs(df.parent_doc, meta)
+
+	def test_fetch_from_index(self):
+		meta = load_meta_snapshot(make_meta_snapshot(Meta("ToDo")))
+		for link_field in meta.get_link_fields():
+			self.assertEqual(
+				meta.get_fields_to_fetch(link_field.fieldname),
+				[
+					df
+					for df in meta.fields
+					if (df.get("fetch_from") or "").startswith(link_field.fieldname + ".")
+				],
+			)
+
+	def test_outdated_snapshot_is_ignored(self):
+		snapshot = make_meta_snapshot(Meta("ToDo"))
+		snapshot["version"] = "outdated"
+		self.assertIsNone(load_meta_snapshot(snapshot))
+
+		# snapshots cached before the snapshot format was introduced
+		self.assertIsNone(load_meta_snapshot(Meta("ToDo").as_dict()))
+
+	def test_customized_snapshot_is_ignored(self):
+		snapshot = make_meta_snapshot(Meta("ToDo"))
+		self.assertIsNotNone(load_meta_snapshot(snapshot))
+
+		property_setter = frappe.get_doc(
+			{
+				"doctype": "Property Setter",
+				"doctype_or_field": "DocType",
+				"doc_type": "ToDo",
+				"property": "max_attachments",
+				"property_type": "Int",
+				"value": "7",
+			}
+		).insert()
+		self.addCleanup(property_setter.delete)
+
+		self.assertIsNone(load_meta_snapshot(snapshot))
+
+	def test_append_field_clears_field_caches(self):
+		meta = load_meta_snapshot(make_meta_snapshot(Meta("ToDo")))
+		link_fields = meta.get_link_fields()
+		meta.get_field("description")
+
+		meta.append("fields", {"fieldname": "_test_link", "fieldtype": "Link", "options": "User"})
+
+		self.assertEqual(len(meta.get_link_fields()), len(link_fields) + 1)
+		self.assertEqual(meta.get_fields_by_type("Link")[-1].fieldname, "_test_link")
+		self.assertTrue(meta.get_field("_test_link"))
@@ -4,6 +4,7 @@
 from __future__ import unicode_literals
 
 import unittest
+from unittest.mock import patch
 
 import frappe
 from frappe.core.doctype.doctype.test_doctype import new_doctype
@@ -23,6 +24,8 @@ class TestNaming(unittest.TestCase):
 
 	def tearDown(self):
 		frappe.db.rollback()
+		frappe.db.sql("""delete from `tabSeries` where name = 'TEST-GAPLESS-'""")
+		frappe.db.commit()
 
 	def test_append_number_if_name_exists(self):
 		"""
@@ -201,6 +204,60 @@ class TestNaming(unittest.TestCase):
 		self.assertEqual(count.get("current"), 2)
 		frappe.db.sql("""delete from `tabSeries` where name = %s""", series)
 
+	def test_block_series_allocator(self):
+		from frappe.model.series_allocator import _reserved_blocks
+
+		series = "TEST-BLOCK-" + frappe.generate_hash(length=5) + "-"
+		frappe.db.sql("""INSERT INTO `tabSeries` (name, current) values (%s, 5)""", (series,))
+		frappe.db.commit()
+
+		with patch.dict(
+			frappe.conf, {"naming_series_allocator": "block", "naming_series_block_size": 10}
+		):
+			self.assertEqual(getseries(series, 3), "006")
+			self.assertEqual(getseries(series, 3), "007")
+
+		# whole block is reserved in tabSeries
+		self.assertEqual(get_series_current(series), 15)
+
+		_reserved_blocks.clear()
+		frappe.db.sql("""delete from `tabSeries` where name = %s""", series)
+		frappe.db.commit()
+
+	def test_sequence_series_allocator(self):
+		from frappe.database.sequence import drop_sequence
+		from frappe.model.series_allocator import _known_sequences, get_sequence_name
+
+		series = "TEST-SEQUENCE-" + frappe.generate_hash(length=5) + "-"
+		frappe.db.sql("""INSERT INTO `tabSeries` (name, current) values (%s, 5)""", (series,))
+		frappe.db.commit()
+
+		with patch.dict(frappe.conf, {"naming_series_allocator": "sequence"}):
+			self.assertEqual(getseries(series, 3), "006")
+			self.assertEqual(getseries(series, 3), "007")
+
+		# tabSeries is not touched
+		self.assertEqual(get_series_current(series), 5)
+
+		sequence_name = get_sequence_name(series)
+		_known_sequences.discard((frappe.local.site, sequence_name))
+		drop_sequence(sequence_name)
+		frappe.db.sql("""delete from `tabSeries` where name = %s""", series)
+		frappe.db.commit()
+
+	def test_gapless_naming_series(self):
+		series = "TEST-GAPLESS-"
+		frappe.db.sql("""delete from `tabSeries` where name = %s""", series)
+
+		with patch.dict(
+			frappe.conf,
+			{"naming_series_allocator": "block", "gapless_naming_series": ["TEST-GAPLESS"]},
+		):
+			self.assertEqual(getseries(series, 3), "001")
+			self.assertEqual(getseries(series, 3), "002")
+
+		self.assertEqual(get_series_current(series), 2)
+
 	def test_naming_for_cancelled_and_amended_doc(self):
 		submittable_doctype = frappe.get_doc(
 			{
@@ -311,3 +368,7 @@ class TestNaming(unittest.TestCase):
 
 def make_invalid_todo():
 	frappe.get_doc({"doctype": "ToDo", "description": "Test"}).insert(set_name="ToDo")
+
+
+def get_series_current(series):
+	return frappe.db.sql("""SELECT current from `tabSeries` where name = %s""", series)[0][0]
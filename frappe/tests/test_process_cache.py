@@ -0,0 +1,56 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# MIT License. See license.txt
+
+import time
+import unittest
+from unittest.mock import patch
+
+import frappe
+from frappe.utils.process_cache import ProcessCache
+
+
+class TestProcessCache(unittest.TestCase):
+	def test_lru_eviction(self):
+		cache = ProcessCache(max_size=2)
+		cache.set(b"a", 1)
+		cache.set(b"b", 2)
+		cache.get(b"a")
+		cache.set(b"c", 3)
+
+		self.assertEqual(cache.get(b"a"), (True, 1))
+		self.assertEqual(cache.get(b"b"), (False, None))
+		self.assertEqual(cache.get_stats()["evictions"], 1)
+
+	def test_ttl(self):
+		cache = ProcessCache(ttl=0.01)
+		cache.set(b"a", 1)
+		time.sleep(0.02)
+		self.assertEqual(cache.get(b"a"), (False, None))
+
+	def test_invalidation(self):
+		cache = ProcessCache()
+		cache.set(b"meta", "ToDo meta", "ToDo")
+		cache.set(b"meta", "Note meta", "Note")
+
+		cache.on_invalidation_message({"data": b"meta\0ToDo"})
+		self.assertEqual(cache.get(b"meta", "ToDo"), (False, None))
+		self.assertEqual(cache.get(b"meta", "Note"), (True, "Note meta"))
+
+		# whole hash
+		cache.on_invalidation_message({"data": b"meta"})
+		self.assertEqual(cache.get(b"meta", "Note"), (False, None))
+
+	def test_redis_wrapper_uses_process_cache(self):
+		with patch.dict(frappe.conf, {"process_cache_keys": ["test_process_cache"]}):
+			frappe.cache().hset("test_process_cache", "key", "value")
+			frappe.local.cache = {}
+			self.assertEqual(frappe.cache().hget("test_process_cache", "key"), "value")
+
+			frappe.local.cache = {}
+			hits = frappe.cache().get_process_cache_stats()["hits"]
+			self.assertEqual(frappe.cache().hget("test_process_cache", "key"), "value")
+			self.assertEqual(frappe.cache().get_process_cache_stats()["hits"], hits + 1)
+
+			frappe.cache().hdel("test_process_cache", "key")
+			frappe.local.cache = {}
+			self.assertIsNone(frappe.cache().hget("test_process_cache", "key"))
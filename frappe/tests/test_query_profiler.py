@@ -0,0 +1,56 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# MIT License. See license.txt
+
+import unittest
+from unittest.mock import patch
+
+import frappe
+import frappe.query_profiler
+from frappe.query_profiler import QueryProfiler, normalize_query
+
+
+class TestQueryProfiler(unittest.TestCase):
+	def tearDown(self):
+		frappe.local.query_profiler = None
+
+	def test_normalize_query(self):
+		self.assertEqual(
+			normalize_query("select `name` from `tabToDo` where `name`='a''b' and `idx` in (1, 2,3)"),
+			"select `name` from `tabToDo` where `name`=? and `idx` in (?)",
+		)
+		self.assertEqual(
+			normalize_query("select name\n\tfrom tabToDo where name=%s"),
+			"select name from tabToDo where name=?",
+		)
+
+	def test_detect_n_plus_one(self):
+		users = frappe.get_all("User", pluck="name", limit=3)
+
+		with patch.dict(frappe.conf, {"query_profiler_n_plus_one_threshold": 2}):
+			profiler = frappe.local.query_profiler = QueryProfiler("job", "test")
+
+		for _ in range(2):
+			for user in users:
+				frappe.db.get_value("User", user, "full_name")
+		frappe.db.get_value("User", "Administrator", "email")
+		frappe.local.query_profiler = None
+
+		summary = profiler.get_summary()
+		self.assertEqual(summary["queries"], len(users) * 2 + 1)
+
+		patterns = summary["n_plus_one"]
+		self.assertEqual(len(patterns), 1)
+		self.assertEqual(patterns[0]["count"], len(users) * 2)
+		self.assertIn("test_query_profiler.py", patterns[0]["call_site"])
+		self.assertIn("full_name", patterns[0]["query"])
+
+	def test_sampling(self):
+		with patch.dict(frappe.conf, {"query_profiler": 1, "query_profiler_sample_rate": 0}):
+			frappe.query_profiler.start()
+			self.assertFalse(getattr(frappe.local, "query_profiler", None))
+
+		with patch.dict(frappe.conf, {"query_profiler": 1, "query_profiler_sample_rate": 1}):
+			frappe.query_profiler.start()
+			self.assertTrue(frappe.local.query_profiler)
+			frappe.query_profiler.stop()
+			self.assertFalse(frappe.local.query_profiler)
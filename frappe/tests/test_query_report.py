@@ -4,10 +4,11 @@
 from __future__ import unicode_literals
 
 import unittest
+from unittest.mock import patch
 
 import frappe
 import frappe.utils
-from frappe.desk.query_report import build_xlsx_data
+from frappe.desk.query_report import build_xlsx_data, get_filtered_data
 
 
 class TestQueryReport(unittest.TestCase):
@@ -48,3 +49,27 @@ class TestQueryReport(unittest.TestCase):
 
 		for row in xlsx_data:
 			self.assertEqual(type(row), list)
+
+	def test_filtered_data(self):
+		"""Rows are filtered by the match filters of the user for each linked doctype"""
+		columns = [
+			{"label": "Role", "fieldname": "role", "fieldtype": "Link", "options": "Role"},
+			{"label": "DocType", "fieldname": "ref_doctype", "fieldtype": "Link", "options": "DocType"},
+		]
+		data = [
+			["System Manager", "ToDo"],
+			["Guest", "Note"],
+			["System Manager", "Note"],
+			["_Test Missing Role", "ToDo"],
+			["Guest", None],
+		]
+		match_filters = {
+			"Role": [{"Role": ["System Manager"]}],
+			"DocType": [{"DocType": ["ToDo"]}, {"Role": ["Guest"]}],
+		}
+
+		with patch("frappe.desk.query_report.get_user_match_filters", return_value=match_filters):
+			result = get_filtered_data("ToDo", columns, data, "Administrator")
+
+		# values that are not allowed but do not exist are not filtered
+		self.assertEqual(result, [data[0], data[3]])
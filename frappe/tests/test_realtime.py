@@ -0,0 +1,41 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# MIT License. See license.txt
+
+import unittest
+from unittest.mock import patch
+
+import frappe
+from frappe.realtime import coalesce_events, publish_realtime
+
+
+class TestRealtime(unittest.TestCase):
+	def test_coalesce_events(self):
+		events = [
+			["list_update", {"doctype": "ToDo", "name": "a"}, "doctype:ToDo"],
+			["list_update", {"doctype": "ToDo", "name": "b"}, "doctype:ToDo"],
+			["list_update", {"doctype": "ToDo", "name": "a"}, "doctype:ToDo"],
+			["doc_update", {"name": "a"}, "doc:ToDo/a"],
+			["doc_update", {"name": "a"}, "doc:ToDo/a"],
+			["docinfo_update", {"doc": {"name": "c1"}, "key": "k", "action": "add"}, "doc"],
+			["docinfo_update", {"doc": {"name": "c1", "v": 1}, "key": "k", "action": "update"}, "doc"],
+			["docinfo_update", {"doc": {"name": "c2"}, "key": "k", "action": "add"}, "doc"],
+			["docinfo_update", {"doc": {"name": "c2"}, "key": "k", "action": "delete"}, "doc"],
+		]
+
+		self.assertEqual(
+			coalesce_events(events),
+			[
+				["list_update", {"doctype": "ToDo", "name": "a", "names": ["a", "b"]}, "doctype:ToDo"],
+				["doc_update", {"name": "a"}, "doc:ToDo/a"],
+				["docinfo_update", {"doc": {"name": "c1", "v": 1}, "key": "k", "action": "add"}, "doc"],
+			],
+		)
+
+	def test_progress_throttling(self):
+		frappe.local.realtime_throttle = {}
+		with patch("frappe.realtime.emit_via_redis") as emit:
+			for percent in (10, 20, 30, 100):
+				publish_realtime("progress", {"percent": percent}, room="test")
+
+		# intermediate updates are dropped, the last one is always sent
+		self.assertEqual([call.args[1]["percent"] for call in emit.call_args_list], [10, 100])
@@ -12,9 +12,14 @@ from frappe.utils.background_jobs import enqueue, get_jobs
 from frappe.utils.doctor import purge_pending_jobs
 from frappe.utils.scheduler import (
 	_get_last_modified_timestamp,
+	clear_scheduler_index,
 	enqueue_events,
+	get_due_job_types,
+	get_due_sites,
 	is_dormant,
+	reset_site_due_time,
 	schedule_jobs_based_on_activity,
+	set_site_due_time,
 )
 
 
@@ -38,6 +43,7 @@ class TestScheduler(TestCase):
 
 	def test_enqueue_jobs(self):
 		frappe.db.sql("update `tabScheduled Job Type` set last_execution = '2010-01-01 00:00:00'")
+		clear_scheduler_index(frappe.local.site)
 
 		frappe.flags.execute_job = True
 		enqueue_events(site=frappe.local.site)
@@ -63,6 +69,39 @@ class TestScheduler(TestCase):
 		self.assertFalse(job.enqueue())
 		frappe.db.sql("DELETE FROM `tabScheduled Job Log` WHERE `scheduled_job_type`=%s", job.name)
 
+	def test_scheduler_index(self):
+		job = get_test_job(method="frappe.tests.test_scheduler.test_method", frequency="Daily")
+		clear_scheduler_index(frappe.local.site)
+		self.assertIn(job.name, get_due_job_types(frappe.local.site))
+
+		# running the job moves it to the next day
+		job.reload()
+		job.execute()
+		self.assertNotIn(job.name, get_due_job_types(frappe.local.site))
+
+		job.db_set("last_execution", "2010-01-01 00:00:00")
+		job.save()
+		self.assertIn(job.name, get_due_job_types(frappe.local.site))
+
+		job.stopped = 1
+		job.save()
+		self.assertNotIn(job.name, get_due_job_types(frappe.local.site))
+
+		job.stopped = 0
+		job.save()
+		frappe.db.commit()
+
+	def test_due_sites(self):
+		site = frappe.local.site
+		set_site_due_time(site, time.time() + 600)
+		self.assertNotIn(site, get_due_sites([site]))
+
+		set_site_due_time(site, time.time() - 1)
+		self.assertIn(site, get_due_sites([site]))
+
+		reset_site_due_time(site)
+		self.assertIn(site, get_due_sites([site]))
+
 	def test_is_dormant(self):
 		self.assertTrue(is_dormant(check_time=get_datetime("2100-01-01 00:00:00")))
 		self.assertTrue(is_dormant(check_time=add_days(frappe.db.get_last_created("Activity Log"), 5)))
@@ -0,0 +1,58 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# MIT License. See license.txt
+
+import unittest
+
+import frappe
+from frappe.sessions import (
+	dump_session_data,
+	flush_session_updates,
+	load_session_data,
+	pop_session_updates,
+	queue_session_update,
+)
+
+
+class TestSessions(unittest.TestCase):
+	def setUp(self):
+		self.last_active = frappe.db.get_value("User", "Administrator", "last_active")
+
+	def tearDown(self):
+		frappe.db.sql("delete from `tabSessions` where `sid`='_test_session'")
+		frappe.cache().hdel("session", "_test_session")
+		frappe.db.set_value(
+			"User", "Administrator", "last_active", self.last_active, update_modified=False
+		)
+		frappe.db.commit()
+
+	def test_session_data_serialization(self):
+		data = {"user": "Administrator", "session_expiry": "06:00:00", "full_name": None}
+		self.assertEqual(load_session_data(dump_session_data(data)), data)
+
+		# sessions stored before were `str(dict)`
+		self.assertEqual(load_session_data(str(data)), data)
+		self.assertEqual(load_session_data(None), {})
+
+	def test_flush_session_updates(self):
+		frappe.db.sql(
+			"""insert into `tabSessions` (`sessiondata`, `user`, `lastupdate`, `sid`, `device`)
+			values ('{}', 'Administrator', '2010-01-01', '_test_session', 'desktop')"""
+		)
+		frappe.cache().hset(
+			"session", "_test_session", frappe._dict(data=frappe._dict(user="Administrator", lang="en"))
+		)
+
+		queue_session_update("_test_session", "Administrator", "2020-01-01 10:00:00.000000")
+		queue_session_update("_test_session", "Administrator", "2020-01-01 11:00:00.000000")
+		flush_session_updates()
+
+		self.assertEqual(pop_session_updates(), {})
+
+		sessiondata, lastupdate = frappe.db.sql(
+			"select `sessiondata`, `lastupdate` from `tabSessions` where `sid`='_test_session'"
+		)[0]
+		self.assertEqual(load_session_data(sessiondata), {"user": "Administrator", "lang": "en"})
+		self.assertGreater(lastupdate.year, 2010)
+		self.assertEqual(
+			str(frappe.db.get_value("User", "Administrator", "last_active")), "2020-01-01 11:00:00"
+		)
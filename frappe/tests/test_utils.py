@@ -492,6 +492,25 @@ class TestXlsxUtils(unittest.TestCase):
 		self.assertIn("html data >", val)
 		self.assertEqual("abc", handle_html("abc"))
 
+	def test_read_xlsx_rows(self):
+		from frappe.utils.xlsxutils import make_xlsx, read_xlsx_rows
+
+		data = [["Title", "Number"], ["a", 1], ["b", 2]]
+		self.assertEqual(list(read_xlsx_rows(make_xlsx(data, "Test"))), data)
+
+
+class TestCSVUtils(unittest.TestCase):
+	def test_read_csv_file(self):
+		from frappe.utils.csvutils import read_csv_content, read_csv_file
+
+		file_path = frappe.get_app_path(
+			"frappe", "core", "doctype", "data_import", "fixtures", "sample_import_file.csv"
+		)
+		with open(file_path, "rb") as f:
+			content = f.read()
+
+		self.assertEqual(list(read_csv_file(file_path)), read_csv_content(content))
+
 
 class TestLocks(unittest.TestCase):
 	def test_locktimeout(self):
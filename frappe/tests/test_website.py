@@ -1,6 +1,10 @@
 from __future__ import unicode_literals
 
 import unittest
+from unittest.mock import patch
+
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request
 
 import frappe
 from frappe.utils import set_request
@@ -52,6 +56,45 @@ class TestWebsite(unittest.TestCase):
 		self.assertTrue("<!-- login.html -->" in html)
 		frappe.set_user("Administrator")
 
+	def test_page_cache(self):
+		from frappe.translate import get_all_languages
+		from frappe.website import page_cache
+
+		get_all_languages()
+		request_args = {
+			"base_url": "http://localhost",
+			"path": "/about",
+			"headers": {"Accept-Language": "en"},
+		}
+
+		with patch.dict(frappe.conf, {"developer_mode": 0, "disable_website_cache": 0}):
+			render.clear_cache()
+			response = page_cache.render_page(request_args)
+			self.assertEqual(response.status_code, 200)
+
+			# the first request of a visitor is rendered, to set the Guest cookies
+			request = Request(EnvironBuilder(**request_args).get_environ())
+			self.assertIsNone(page_cache.get_cached_response(request))
+
+			request_args["headers"]["Cookie"] = "sid=Guest; user_id=Guest"
+			request = Request(EnvironBuilder(**request_args).get_environ())
+			cached = page_cache.get_cached_response(request)
+			self.assertEqual(cached.status_code, 200)
+			self.assertEqual(cached.get_data(), response.get_data())
+
+			# conditional requests are answered without the page
+			request_args["headers"]["If-None-Match"] = response.headers["ETag"]
+			request = Request(EnvironBuilder(**request_args).get_environ())
+			self.assertEqual(page_cache.get_cached_response(request).status_code, 304)
+
+			# stale pages are served while they are rendered again
+			render.clear_cache("about")
+			with patch("frappe.website.page_cache.enqueue_render") as enqueue_render:
+				self.assertEqual(page_cache.get_cached_response(request).status_code, 304)
+				enqueue_render.assert_called_once()
+
+		frappe.set_user("Administrator")
+
 	def test_redirect(self):
 		import frappe.hooks
 
@@ -9,10 +9,12 @@ from uuid import uuid4
 
 import redis
 from redis.exceptions import BusyLoadingError, ConnectionError
-from rq import Connection, Queue, Worker
+from rq import Connection, Queue, SimpleWorker, Worker, get_current_job
+from rq.job import Job
 from rq.logutils import setup_loghandlers
 from six import string_types
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_fixed
+from werkzeug.local import release_local
 
 import frappe
 import frappe.monitor
@@ -23,6 +25,10 @@ from frappe.utils import cstr
 RQ_JOB_FAILURE_TTL = 7 * 24 * 60 * 60  # 7 days instead of 1 year (default)
 RQ_RESULTS_TTL = 10 * 60
 
+# values of these job arguments are indexed per site and queue, see `add_to_job_index`
+JOB_INDEX_KEYS = ("method", "job_name", "job_type")
+ACTIVE_JOB_STATUSES = (b"queued", b"started", b"deferred", b"scheduled")
+
 
 @lru_cache()
 def get_queues_timeout():
@@ -43,6 +49,16 @@ def get_queues_timeout():
 
 redis_connection = None
 
+# set by `start_worker(persistent=True)`, jobs then run in the worker process itself and
+# keep imported modules, process caches and database connections (per site) warm
+persistent_worker = False
+site_connections = {}
+
+# `frappe.local` attributes kept between the jobs of a site by persistent workers, they
+# only change when apps are installed or removed
+PERSISTENT_LOCALS = ("all_apps", "module_app", "app_modules")
+site_locals = {}
+
 
 def enqueue(
 	method,
@@ -53,6 +69,7 @@ def enqueue(
 	job_name=None,
 	now=False,
 	enqueue_after_commit=False,
+	deduplicate=False,
 	**kwargs
 ):
 	"""
@@ -65,6 +82,7 @@ def enqueue(
 	:param is_async: if is_async=False, the method is executed immediately, else via a worker
 	:param job_name: can be used to name an enqueue call, which can be used to prevent duplicate calls
 	:param now: if now=True, the method is executed via frappe.call
+	:param deduplicate: do not enqueue if a job with the same `job_name` is queued or running
 	:param kwargs: keyword arguments to be passed to the method
 	"""
 	# To handle older implementations
@@ -73,6 +91,13 @@ def enqueue(
 	if now or frappe.flags.in_migrate:
 		return frappe.call(method, **kwargs)
 
+	if deduplicate:
+		if not job_name:
+			frappe.throw(_("`job_name` is required to deduplicate jobs"))
+
+		if is_job_queued(job_name, queue=queue):
+			return
+
 	q = get_queue(queue, is_async=is_async)
 	if not timeout:
 		timeout = get_queues_timeout().get(queue) or 300
@@ -94,7 +119,7 @@ def enqueue(
 		)
 		return frappe.flags.enqueue_after_commit
 
-	return q.enqueue_call(
+	job = q.enqueue_call(
 		execute_job,
 		timeout=timeout,
 		kwargs=queue_args,
@@ -102,6 +127,11 @@ def enqueue(
 		result_ttl=RQ_RESULTS_TTL,
 	)
 
+	if is_async:
+		add_to_job_index(job, queue_args)
+
+	return job
+
 
 def enqueue_doc(
 	doctype, name=None, method=None, queue="default", timeout=300, now=False, **kwargs
@@ -127,7 +157,11 @@ def execute_job(site, method, event, job_name, kwargs, user=None, is_async=True,
 	"""Executes job in a worker, performs commit/rollback and logs if there is any error"""
 	retval = None
 	if is_async:
-		frappe.connect(site)
+		if persistent_worker:
+			connect_for_job(site)
+		else:
+			frappe.connect(site)
+
 		if os.environ.get("CI"):
 			frappe.flags.in_test = True
 
@@ -157,7 +191,10 @@ def execute_job(site, method, event, job_name, kwargs, user=None, is_async=True,
 			# 1213 = deadlock
 			# 1205 = lock wait timeout
 			# or RetryBackgroundJobError is explicitly raised
-			frappe.destroy()
+			if persistent_worker:
+				release_after_job()
+			else:
+				frappe.destroy()
 			time.sleep(retry + 1)
 
 			return execute_job(site, method, event, job_name, kwargs, is_async=is_async, retry=retry + 1)
@@ -181,12 +218,97 @@ def execute_job(site, method, event, job_name, kwargs, user=None, is_async=True,
 		for after_job_task in frappe.get_hooks("after_job"):
 			frappe.call(after_job_task, method=method_name, kwargs=kwargs, result=retval)
 
+		if is_async and getattr(frappe.local, "site", None):
+			# already done and destroyed by the last retry otherwise
+			remove_from_job_index(
+				get_current_job(), dict(method=method_name, job_name=job_name, kwargs=kwargs)
+			)
+
 		if is_async:
-			frappe.destroy()
+			if persistent_worker:
+				release_after_job()
+			else:
+				frappe.destroy()
+
+
+def connect_for_job(site):
+	"""`frappe.connect` for persistent workers. Every job gets a fresh `frappe.local`, but the
+	database connection of the site is reused (after a rollback) if it is still usable and
+	the app hooks and module maps of the previous job of the site are kept.
+
+	Meta and documents are not kept, as they can change between jobs. They stay warm in
+	the process cache when it is enabled with `process_cache_keys`."""
+	from frappe.database import get_db
+	from frappe.database.database import get_query_execution_timeout
+
+	frappe.init(site)
+	restore_site_locals(site)
+
+	conf = frappe.local.conf
+	db = site_connections.get(site)
+	if db and (db.user, db.password) != (conf.db_name, conf.db_password):
+		db.close()
+		db = None
+
+	if db and db._conn:
+		frappe.local.db = db
+		db.transaction_writes = 0
+		db.value_cache = {}
+		try:
+			# start from a clean transaction, also checks that the connection is alive
+			db.rollback()
+			if conf.enable_db_statement_timeout:
+				db.set_execution_timeout(get_query_execution_timeout())
+		except Exception:
+			db.close()
+			db = None
 
+	if not db or not db._conn:
+		db = site_connections[site] = get_db(user=conf.db_name)
+		frappe.local.db = db
+
+	frappe.set_user("Administrator")
+
+
+def release_after_job():
+	"""`frappe.destroy` for persistent workers, keeps the database connection open."""
+	if getattr(frappe.local, "site", None):
+		save_site_locals()
+
+	if getattr(frappe.local, "replica_db", None):
+		frappe.local.replica_db.close()
+
+	release_local(frappe.local)
+
+
+def save_site_locals():
+	state = {attr: getattr(frappe.local, attr, None) for attr in PERSISTENT_LOCALS}
+	state["app_hooks"] = frappe.local.cache.get(frappe.cache().make_key("app_hooks"))
+	site_locals[frappe.local.site] = state
+
+
+def restore_site_locals(site):
+	state = site_locals.get(site)
+	if not state:
+		return
+
+	for attr in PERSISTENT_LOCALS:
+		if state[attr] is not None:
+			setattr(frappe.local, attr, state[attr])
+
+	# hooks are dropped from the cache by `frappe.clear_cache`, e.g. after a migrate
+	hooks_key = frappe.cache().make_key("app_hooks")
+	if state["app_hooks"] is not None and frappe.cache().exists(hooks_key):
+		frappe.local.cache[hooks_key] = state["app_hooks"]
+
+
+def start_worker(queue=None, quiet=False, persistent=False):
+	"""Wrapper to start rq worker. Connects to redis and monitors these queues.
+
+	:param persistent: Run jobs in the worker process instead of a forked process per job,
+	        keeping modules, caches and database connections warm between jobs."""
+	global persistent_worker
 
-def start_worker(queue=None, quiet=False):
-	"""Wrapper to start rq worker. Connects to redis and monitors these queues."""
 	with frappe.init_site():
 		# empty init is required to get redis_queue from common_site_config.json
 		redis_connection = get_redis_conn()
@@ -194,12 +316,15 @@ def start_worker(queue=None, quiet=False):
 	if os.environ.get("CI"):
 		setup_loghandlers("ERROR")
 
+	persistent_worker = persistent
+	worker_class = SimpleWorker if persistent else Worker
+
 	with Connection(redis_connection):
 		queues = get_queue_list(queue)
 		logging_level = "INFO"
 		if quiet:
 			logging_level = "WARNING"
-		Worker(queues, name=get_worker_name(queue)).work(
+		worker_class(queues, name=get_worker_name(queue)).work(
 			logging_level=logging_level,
 			date_format="%Y-%m-%d %H:%M:%S",
 			log_format="%(asctime)s,%(msecs)03d %(message)s",
@@ -221,6 +346,9 @@ def get_worker_name(queue):
 
 def get_jobs(site=None, queue=None, key="method"):
 	"""Gets jobs per queue or per site or both"""
+	if site and key in JOB_INDEX_KEYS:
+		return get_jobs_from_index(site, queue, key)
+
 	jobs_per_site = defaultdict(list)
 
 	def add_to_dict(job):
@@ -245,6 +373,129 @@ def get_jobs(site=None, queue=None, key="method"):
 	return jobs_per_site
 
 
+def get_job_index_key(site, queue):
+	return "frappe:job_index:{0}:{1}".format(site, queue)
+
+
+def get_job_index_fields(queue_args):
+	"""`key:value` of the indexed arguments of a job, as `get_jobs` looks them up."""
+	fields = []
+	for key in JOB_INDEX_KEYS:
+		value = queue_args.get(key)
+		if value is None:
+			# optional keyword arguments are stored in 'kwargs' of 'kwargs'
+			value = (queue_args.get("kwargs") or {}).get(key)
+
+		if isinstance(value, string_types):
+			fields.append("{0}:{1}".format(key, value))
+
+	return fields
+
+
+def get_job_index_entry(field, job_id):
+	return "{0}|{1}".format(field, job_id)
+
+
+def get_job_index_entries(conn, index_key):
+	"""Returns `[(field, job id), ...]` of the job index"""
+	entries = []
+	for entry in conn.hkeys(index_key):
+		field, _, job_id = frappe.safe_decode(entry).rpartition("|")
+		entries.append((field, job_id))
+
+	return entries
+
+
+def add_to_job_index(job, queue_args):
+	"""Index `method`, `job_name` and `job_type` of an enqueued job in a hash per site and
+	queue, so that `get_jobs` and `is_job_queued` don't have to load every job in the queue.
+
+	Every job has its own entries (`key:value|job id`), which are removed when the job ends.
+	Entries of jobs that are no longer queued or running (e.g. killed workers) are dropped
+	when they are read."""
+	fields = get_job_index_fields(queue_args)
+	if not fields:
+		return
+
+	index_key = get_job_index_key(queue_args["site"], job.origin)
+	pipeline = get_redis_conn().pipeline()
+	pipeline.hset(index_key, mapping={get_job_index_entry(field, job.id): 1 for field in fields})
+	pipeline.expire(index_key, RQ_JOB_FAILURE_TTL)
+	pipeline.execute()
+
+
+def remove_from_job_index(job, queue_args):
+	if not job:
+		return
+
+	entries = [get_job_index_entry(field, job.id) for field in get_job_index_fields(queue_args)]
+	if entries:
+		get_redis_conn().hdel(get_job_index_key(frappe.local.site, job.origin), *entries)
+
+
+def get_active_job_ids(conn, job_ids):
+	"""Returns the ids of `job_ids` that are queued or running."""
+	job_ids = list(job_ids)
+	pipeline = conn.pipeline(transaction=False)
+	for job_id in job_ids:
+		pipeline.hget(Job.key_for(job_id), "status")
+
+	return {
+		job_id
+		for job_id, status in zip(job_ids, pipeline.execute())
+		if status in ACTIVE_JOB_STATUSES
+	}
+
+
+def get_jobs_from_index(site, queue=None, key="method"):
+	"""Same as `get_jobs` for one site, but reads the job index instead of every job."""
+	conn = get_redis_conn()
+	prefix = key + ":"
+	jobs_per_site = defaultdict(list)
+
+	for queue in get_queue_list(queue):
+		index_key = get_job_index_key(site, queue)
+		entries = [
+			(field, job_id)
+			for field, job_id in get_job_index_entries(conn, index_key)
+			if field.startswith(prefix)
+		]
+
+		active_job_ids = get_active_job_ids(conn, {job_id for field, job_id in entries})
+
+		stale = []
+		for field, job_id in entries:
+			if job_id in active_job_ids:
+				jobs_per_site[site].append(field[len(prefix) :])
+			else:
+				stale.append(get_job_index_entry(field, job_id))
+
+		if stale:
+			conn.hdel(index_key, *stale)
+
+	return jobs_per_site
+
+
+def is_job_queued(job_name, queue=None, site=None, key="job_name"):
+	"""Check if a job with the given `job_name` (or other indexed `key`) is queued or running.
+
+	:param job_name: value of `key` to look for
+	:param queue: queue name or list of queue names, defaults to all queues
+	:param site: defaults to the current site
+	:param key: indexed job argument, one of `JOB_INDEX_KEYS`"""
+	conn = get_redis_conn()
+	site = site or frappe.local.site
+	field = "{0}:{1}".format(key, job_name)
+
+	for queue in get_queue_list(queue):
+		entries = get_job_index_entries(conn, get_job_index_key(site, queue))
+		job_ids = [job_id for entry_field, job_id in entries if entry_field == field]
+		if job_ids and get_active_job_ids(conn, job_ids):
+			return True
+
+	return False
+
+
 def get_queue_list(queue_list=None):
 	"""Defines possible queues. Also wraps a given queue in a list after validating."""
 	default_queue_list = list(get_queues_timeout())
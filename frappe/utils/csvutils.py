@@ -3,7 +3,9 @@
 
 from __future__ import unicode_literals
 
+import codecs
 import csv
+import io
 import json
 
 import requests
@@ -14,6 +16,8 @@ import frappe
 from frappe import _, msgprint
 from frappe.utils import cint, comma_or, cstr, encode, flt
 
+CSV_ENCODINGS = ("utf-8", "windows-1250", "windows-1252")
+
 
 def read_csv_content_from_attached_file(doc):
 	fileid = frappe.get_all(
@@ -45,7 +49,7 @@ def read_csv_content(fcontent, ignore_encoding=False):
 
 	if not isinstance(fcontent, text_type):
 		decoded = False
-		for encoding in ["utf-8", "windows-1250", "windows-1252"]:
+		for encoding in CSV_ENCODINGS:
 			try:
 				fcontent = text_type(fcontent, encoding)
 				decoded = True
@@ -67,28 +71,70 @@ def read_csv_content(fcontent, ignore_encoding=False):
 			content.append(frappe.safe_decode(line))
 
 	try:
-		rows = []
-		for row in csv.reader(content):
-			r = []
-			for val in row:
-				# decode everything
-				val = val.strip()
-
-				if val == "":
-					# reason: in maraidb strict config, one cannot have blank strings for non string datatypes
-					r.append(None)
-				else:
-					r.append(val)
-
-			rows.append(r)
-
-		return rows
+		return [parse_csv_row(row) for row in csv.reader(content)]
 
 	except Exception:
 		frappe.msgprint(_("Not a valid Comma Separated Value (CSV File)"))
 		raise
 
 
+def read_csv_file(file_path):
+	"""Rows of a CSV file like `read_csv_content`, read one at a time"""
+	encoding = get_file_encoding(file_path)
+	with io.open(file_path, encoding=encoding, newline="") as f:
+		try:
+			for row in csv.reader(f):
+				yield parse_csv_row(row)
+
+		except csv.Error:
+			frappe.msgprint(_("Not a valid Comma Separated Value (CSV File)"))
+			raise
+
+
+def get_file_encoding(file_path, chunk_size=1024 * 1024):
+	"""First encoding that decodes the whole file, without reading it in memory at once"""
+	for encoding in CSV_ENCODINGS:
+		decoder = codecs.getincrementaldecoder(encoding)()
+		try:
+			with open(file_path, "rb") as f:
+				for chunk in iter(lambda: f.read(chunk_size), b""):
+					decoder.decode(chunk)
+				decoder.decode(b"", final=True)
+
+			return encoding
+
+		except UnicodeDecodeError:
+			continue
+
+	frappe.msgprint(
+		_("Unknown file encoding. Tried utf-8, windows-1250, windows-1252."), raise_exception=True
+	)
+
+
+def write_csv(rows, f, **kwargs):
+	"""Write rows to a binary file as UTF-8 CSV, one row at a time"""
+	text_file = io.TextIOWrapper(f, encoding="utf-8", newline="")
+	csv.writer(text_file, **kwargs).writerows(rows)
+	text_file.flush()
+	# leave `f` open
+	text_file.detach()
+
+
+def parse_csv_row(row):
+	r = []
+	for val in row:
+		# decode everything
+		val = val.strip()
+
+		if val == "":
+			# reason: in maraidb strict config, one cannot have blank strings for non string datatypes
+			r.append(None)
+		else:
+			r.append(val)
+
+	return r
+
+
 @frappe.whitelist()
 def send_csv_to_client(args):
 	if isinstance(args, string_types):
@@ -116,9 +162,10 @@ def build_csv_response(data, filename):
 
 
 class UnicodeWriter:
-	def __init__(self, encoding="utf-8", quoting=csv.QUOTE_NONNUMERIC):
+	def __init__(self, encoding="utf-8", quoting=csv.QUOTE_NONNUMERIC, file=None):
 		self.encoding = encoding
-		self.queue = StringIO()
+		# a text file to write rows to instead of memory
+		self.queue = StringIO() if file is None else file
 		self.writer = csv.writer(self.queue, quoting=quoting)
 
 	def writerow(self, row):
@@ -0,0 +1,113 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# MIT License. See license.txt
+
+"""
+Exports written to a file instead of memory. Rows are written as they are read from the
+database, the file is sent in chunks as the response:
+
+	f = get_temp_file()
+	write_csv(rows, f)
+	send_file(f, "ToDo.csv")
+
+Exports of more rows than `export_background_threshold` in site config (default 100000)
+are written by a background job with `enqueue_export`. The job saves the export as a
+private File and notifies the user with a link to it.
+"""
+
+import hashlib
+import os
+import tempfile
+
+import frappe
+from frappe import _
+from frappe.utils import cint
+
+DEFAULT_BACKGROUND_THRESHOLD = 100000
+
+# bytes read at a time while hashing a saved export
+CHUNK_SIZE = 1024 * 1024
+
+
+def get_temp_file():
+	"""Binary file for an export, removed from disk once it is closed"""
+	return tempfile.TemporaryFile()
+
+
+def send_file(f, filename):
+	"""Respond with the export written to `f`, see `frappe.utils.response.as_file`"""
+	f.seek(0)
+	frappe.response["filename"] = filename
+	frappe.response["file"] = f
+	frappe.response["type"] = "file"
+
+
+def should_export_in_background(row_count):
+	threshold = cint(frappe.conf.export_background_threshold) or DEFAULT_BACKGROUND_THRESHOLD
+	return row_count > threshold
+
+
+def enqueue_export(method, filename, **kwargs):
+	"""Write an export in a background job with `method(f, **kwargs)`"""
+	frappe.enqueue(
+		"frappe.utils.export_file.run_export",
+		queue="long",
+		timeout=3600,
+		method=method,
+		filename=filename,
+		export_kwargs=kwargs,
+		now=frappe.flags.in_test,
+	)
+
+	frappe.respond_as_web_page(
+		_("Export in Progress"),
+		_("{0} is being prepared in the background. You will be notified when it is ready.").format(
+			frappe.bold(filename)
+		),
+		indicator_color="blue",
+	)
+
+
+def run_export(method, filename, export_kwargs):
+	"""Write an export straight into the private files of the site and notify the user"""
+	from frappe.desk.doctype.notification_log.notification_log import enqueue_create_notification
+
+	name, extension = os.path.splitext(filename)
+	file_name = "{0}-{1}{2}".format(name, frappe.generate_hash(length=8), extension)
+	file_path = frappe.get_site_path("private", "files", file_name)
+
+	with open(file_path, "w+b") as f:
+		frappe.get_attr(method)(f, **export_kwargs)
+		content_hash = get_file_hash(f)
+
+	file_doc = frappe.get_doc(
+		{
+			"doctype": "File",
+			"file_name": file_name,
+			"file_url": "/private/files/" + file_name,
+			"is_private": 1,
+			"file_size": os.path.getsize(file_path),
+			"content_hash": content_hash,
+		}
+	)
+	file_doc.insert(ignore_permissions=True)
+
+	enqueue_create_notification(
+		frappe.session.user,
+		{
+			"type": "Alert",
+			"document_type": "File",
+			"document_name": file_doc.name,
+			"subject": _("Export {0} is ready to download").format(frappe.bold(filename)),
+		},
+	)
+
+	return file_doc
+
+
+def get_file_hash(f):
+	content_hash = hashlib.md5()
+	f.seek(0)
+	for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+		content_hash.update(chunk)
+
+	return content_hash.hexdigest()
@@ -15,6 +15,19 @@ from frappe.model.base_document import get_controller
 from frappe.utils import cint, strip_html_tags
 from frappe.utils.html_utils import unescape_html
 
+# values popped from `global_search_queue` and written per statement
+SYNC_BATCH_SIZE = 500
+
+
+def get_search_index():
+	"""Inverted index engine used instead of `MATCH ... AGAINST`, if enabled in site config"""
+	if not frappe.conf.global_search_index:
+		return None
+
+	from frappe.search.global_search_index import get_search_index
+
+	return get_search_index()
+
 
 def setup_global_search_table():
 	"""
@@ -31,6 +44,10 @@ def reset():
 	"""
 	frappe.db.sql("DELETE FROM `__global_search`")
 
+	index = get_search_index()
+	if index:
+		index.clear()
+
 
 def get_doctypes_with_global_search(with_child_tables=True):
 	"""
@@ -103,6 +120,8 @@ def rebuild_for_doctype(doctype):
 
 	parent_search_fields = meta.get_global_search_fields()
 	fieldnames = get_selected_fields(meta, parent_search_fields)
+	if meta.image_field:
+		fieldnames.append(meta.image_field)
 
 	# Get all records from parent doctype table
 	all_records = frappe.get_all(doctype, fields=fieldnames, filters=_get_filters())
@@ -110,6 +129,7 @@ def rebuild_for_doctype(doctype):
 	# Children data
 	all_children, child_search_fields = get_children_data(doctype, meta)
 	all_contents = []
+	all_values = []
 
 	for doc in all_records:
 		content = []
@@ -139,19 +159,33 @@ def rebuild_for_doctype(doctype):
 				# some doctypes has been deleted via future patch, hence controller does not exists
 				pass
 
+			value = dict(
+				doctype=doctype,
+				name=doc.name,
+				content=" ||| ".join(content or ""),
+				published=published,
+				title=(title or "")[: int(frappe.db.VARCHAR_LEN)],
+				route=(route or "")[: int(frappe.db.VARCHAR_LEN)],
+				image=doc.get(meta.image_field) if meta.image_field else None,
+			)
+			all_values.append(value)
 			all_contents.append(
 				{
-					"doctype": frappe.db.escape(doctype),
-					"name": frappe.db.escape(doc.name),
-					"content": frappe.db.escape(" ||| ".join(content or "")),
+					"doctype": frappe.db.escape(value["doctype"]),
+					"name": frappe.db.escape(value["name"]),
+					"content": frappe.db.escape(value["content"]),
 					"published": published,
-					"title": frappe.db.escape((title or "")[: int(frappe.db.VARCHAR_LEN)]),
-					"route": frappe.db.escape((route or "")[: int(frappe.db.VARCHAR_LEN)]),
+					"title": frappe.db.escape(value["title"]),
+					"route": frappe.db.escape(value["route"]),
 				}
 			)
 	if all_contents:
 		insert_values_for_multiple_docs(all_contents)
 
+	index = get_search_index()
+	if index:
+		index.update_documents(all_values)
+
 
 def delete_global_search_records_for_doctype(doctype):
 	frappe.db.sql(
@@ -162,6 +196,10 @@ def delete_global_search_records_for_doctype(doctype):
 		as_dict=True,
 	)
 
+	index = get_search_index()
+	if index:
+		index.remove_doctype(doctype)
+
 
 def get_selected_fields(meta, global_search_fields):
 	fieldnames = [df.fieldname for df in global_search_fields]
@@ -286,6 +324,8 @@ def update_global_search(doc):
 			published=published,
 			title=title,
 			route=route,
+			# only kept in the search index
+			image=doc.get(doc.meta.image_field) if doc.meta.image_field else None,
 		)
 
 		sync_value_in_queue(value)
@@ -380,11 +420,14 @@ def sync_global_search():
 	:param flags:
 	:return:
 	"""
-	while frappe.cache().llen("global_search_queue") > 0:
+	while True:
 		# rpop to follow FIFO
 		# Last one should override all previous contents of same document
-		value = json.loads(frappe.cache().rpop("global_search_queue").decode("utf-8"))
-		sync_value(value)
+		values = frappe.cache().rpop_many("global_search_queue", SYNC_BATCH_SIZE)
+		if not values:
+			break
+
+		sync_values([json.loads(value.decode("utf-8")) for value in values])
 
 
 def sync_value_in_queue(value):
@@ -401,31 +444,58 @@ def sync_value(value):
 	Sync a given document to global search
 	:param value: dict of { doctype, name, content, published, title, route }
 	"""
+	sync_values([value])
+
+
+def sync_values(values):
+	"""
+	Sync documents to global search with one multi-row upsert
+	:param values: list of dicts of { doctype, name, content, published, title, route },
+	        the last value of a document wins
+	"""
+	latest = {}
+	for value in values:
+		latest[(value["doctype"], value["name"])] = value
+
+	if not latest:
+		return
+
+	columns = ("doctype", "name", "content", "published", "title", "route")
+	rows = ", ".join(["({0})".format(", ".join(["%s"] * len(columns)))] * len(latest))
+	params = [value.get(column) for value in latest.values() for column in columns]
 
 	frappe.db.multisql(
 		{
 			"mariadb": """INSERT INTO `__global_search`
 			(`doctype`, `name`, `content`, `published`, `title`, `route`)
-			VALUES (%(doctype)s, %(name)s, %(content)s, %(published)s, %(title)s, %(route)s)
+			VALUES {0}
 			ON DUPLICATE key UPDATE
-				`content`=%(content)s,
-				`published`=%(published)s,
-				`title`=%(title)s,
-				`route`=%(route)s
-		""",
+				`content`=VALUES(`content`),
+				`published`=VALUES(`published`),
+				`title`=VALUES(`title`),
+				`route`=VALUES(`route`)
+		""".format(
+				rows
+			),
 			"postgres": """INSERT INTO `__global_search`
 			(`doctype`, `name`, `content`, `published`, `title`, `route`)
-			VALUES (%(doctype)s, %(name)s, %(content)s, %(published)s, %(title)s, %(route)s)
+			VALUES {0}
 			ON CONFLICT("doctype", "name") DO UPDATE SET
-				`content`=%(content)s,
-				`published`=%(published)s,
-				`title`=%(title)s,
-				`route`=%(route)s
-		""",
+				`content`=EXCLUDED.`content`,
+				`published`=EXCLUDED.`published`,
+				`title`=EXCLUDED.`title`,
+				`route`=EXCLUDED.`route`
+		""".format(
+				rows
+			),
 		},
-		value,
+		params,
 	)
 
+	index = get_search_index()
+	if index:
+		index.update_documents(list(latest.values()))
+
 
 def delete_for_document(doc):
 	"""
@@ -443,6 +513,10 @@ def delete_for_document(doc):
 		as_dict=True,
 	)
 
+	index = get_search_index()
+	if index:
+		index.remove_document(doc.doctype, doc.name)
+
 
 @frappe.whitelist()
 def search(text, start=0, limit=20, doctype=""):
@@ -463,6 +537,10 @@ def search(text, start=0, limit=20, doctype=""):
 
 	allowed_doctypes = get_doctypes_for_global_search()
 
+	index = get_search_index()
+	if index:
+		return index.search(text, start, limit, doctype=doctype, doctypes=allowed_doctypes)
+
 	for text in set(text.split("&")):
 		text = text.strip()
 		if not text:
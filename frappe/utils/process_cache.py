@@ -0,0 +1,197 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# MIT License. See license.txt
+
+"""
+Size bounded, per process LRU cache in front of `RedisWrapper`.
+
+`frappe.local.cache` is thrown away after every request, so hot keys are fetched and
+unpickled from Redis on every request in every worker. Keys and hashes listed in
+`process_cache_keys` (site or common site config) are also kept in the memory of the
+process for up to `process_cache_ttl` seconds, at most `process_cache_size` entries.
+
+Example:
+
+        "process_cache_keys": ["meta", "doctype_map", "defaults", "user_permissions"]
+
+Every write or delete of a cached key through `RedisWrapper` is published on a Redis
+pub/sub channel and every process evicts the key as soon as it receives the message.
+Values are shared between requests, only list keys whose values are not mutated
+after they are read.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+
+import frappe
+
+INVALIDATION_CHANNEL = "frappe:process_cache:invalidate"
+DEFAULT_MAX_SIZE = 4096
+DEFAULT_TTL = 300
+
+# hash_key used for plain (non hash) values
+NO_HASH_KEY = "__value"
+
+
+class ProcessCache(object):
+	def __init__(self, max_size=DEFAULT_MAX_SIZE, ttl=DEFAULT_TTL):
+		self.max_size = max_size
+		self.ttl = ttl
+		self.data = OrderedDict()
+		self.lock = threading.RLock()
+		self.pid = os.getpid()
+		self.subscriber = None
+		self.hits = self.misses = self.evictions = self.invalidations = 0
+
+	def get(self, key, hash_key=NO_HASH_KEY):
+		"""Returns `(found, value)`."""
+		with self.lock:
+			entry = self.data.get((key, hash_key))
+			if entry is None or entry[0] < time.monotonic():
+				if entry is not None:
+					del self.data[(key, hash_key)]
+				self.misses += 1
+				return False, None
+
+			self.data.move_to_end((key, hash_key))
+			self.hits += 1
+			return True, entry[1]
+
+	def set(self, key, value, hash_key=NO_HASH_KEY):
+		with self.lock:
+			self.data[(key, hash_key)] = (time.monotonic() + self.ttl, value)
+			self.data.move_to_end((key, hash_key))
+
+			while len(self.data) > self.max_size:
+				self.data.popitem(last=False)
+				self.evictions += 1
+
+	def invalidate(self, key, hash_key=None):
+		"""Evict a value, a key of a hash or (if `hash_key` is not passed) the whole hash."""
+		with self.lock:
+			self.invalidations += 1
+			if hash_key is not None:
+				self.data.pop((key, hash_key), None)
+				return
+
+			for cache_key in [k for k in self.data if k[0] == key]:
+				del self.data[cache_key]
+
+	def clear(self):
+		with self.lock:
+			self.data.clear()
+
+	def get_stats(self):
+		with self.lock:
+			return {
+				"size": len(self.data),
+				"max_size": self.max_size,
+				"hits": self.hits,
+				"misses": self.misses,
+				"evictions": self.evictions,
+				"invalidations": self.invalidations,
+			}
+
+	def ensure_subscribed(self, redis_server):
+		"""(Re)start the thread listening for invalidations.
+
+		Entries are dropped if the listener was not running (e.g. after a fork or a lost
+		Redis connection), as invalidations could have been missed."""
+		if self.pid != os.getpid():
+			# forked, threads and connections are not inherited
+			self.pid = os.getpid()
+			self.subscriber = None
+
+		if self.subscriber and self.subscriber.is_alive():
+			return True
+
+		self.clear()
+		try:
+			pubsub = redis_server.pubsub(ignore_subscribe_messages=True)
+			pubsub.subscribe(**{INVALIDATION_CHANNEL: self.on_invalidation_message})
+			self.subscriber = pubsub.run_in_thread(sleep_time=1, daemon=True)
+		except redis.exceptions.ConnectionError:
+			self.subscriber = None
+			return False
+
+		return True
+
+	def on_invalidation_message(self, message):
+		key, _, hash_key = message["data"].partition(b"\0")
+		if key == b"*":
+			self.clear()
+		else:
+			self.invalidate(key, frappe.safe_decode(hash_key) if hash_key else None)
+
+
+_process_cache = None
+
+
+def get_process_cache(redis_server):
+	"""Returns the `ProcessCache` of this process if `process_cache_keys` are configured
+	and invalidations can be received, else `None`."""
+	global _process_cache
+
+	if not frappe.conf.get("process_cache_keys"):
+		return None
+
+	if _process_cache is None:
+		_process_cache = ProcessCache(
+			max_size=frappe.conf.get("process_cache_size") or DEFAULT_MAX_SIZE,
+			ttl=frappe.conf.get("process_cache_ttl") or DEFAULT_TTL,
+		)
+
+	if not _process_cache.ensure_subscribed(redis_server):
+		return None
+
+	return _process_cache
+
+
+def is_cached_in_process(key):
+	"""Check if a full Redis key (`db_name|[user:<user>:]name`) is in `process_cache_keys`."""
+	allowed = frappe.conf.get("process_cache_keys")
+	if not allowed:
+		return False
+
+	name = frappe.safe_decode(key).split("|", 1)[-1]
+	if name.startswith("user:"):
+		name = name.split(":", 2)[-1]
+
+	return name in allowed
+
+
+def publish_invalidation(redis_server, key, hash_key=None):
+	"""Evict `key` (or `hash_key` of hash `key`) from the process cache of all workers."""
+	if _process_cache is not None:
+		_process_cache.invalidate(frappe.safe_encode(key), hash_key)
+
+	message = frappe.safe_encode(key)
+	if hash_key is not None:
+		message += b"\0" + frappe.safe_encode(hash_key)
+
+	try:
+		redis_server.publish(INVALIDATION_CHANNEL, message)
+	except redis.exceptions.ConnectionError:
+		pass
+
+
+def clear_process_cache(redis_server):
+	"""Drop the process cache of all workers."""
+	if _process_cache is not None:
+		_process_cache.clear()
+
+	try:
+		redis_server.publish(INVALIDATION_CHANNEL, b"*")
+	except redis.exceptions.ConnectionError:
+		pass
+
+
+def get_process_cache_stats():
+	"""Hit / miss counters of the process cache of this worker."""
+	if _process_cache is None:
+		return {}
+
+	return _process_cache.get_stats()
@@ -10,6 +10,13 @@ from six.moves import cPickle as pickle
 
 import frappe
 from frappe.utils import cstr
+from frappe.utils.process_cache import (
+	clear_process_cache,
+	get_process_cache,
+	get_process_cache_stats,
+	is_cached_in_process,
+	publish_invalidation,
+)
 
 
 class RedisWrapper(redis.Redis):
@@ -55,6 +62,9 @@ class RedisWrapper(redis.Redis):
 		except redis.exceptions.ConnectionError:
 			return None
 
+		if is_cached_in_process(key):
+			publish_invalidation(self, key)
+
 	def get_value(self, key, generator=None, user=None, expires=False):
 		"""Returns cache value. If not found and generator function is
 		        given, it will call the generator.
@@ -71,13 +81,21 @@ class RedisWrapper(redis.Redis):
 
 		else:
 			val = None
-			try:
-				val = self.get(key)
-			except redis.exceptions.ConnectionError:
-				pass
-
-			if val is not None:
-				val = pickle.loads(val)
+			process_cache = not expires and is_cached_in_process(key) and get_process_cache(self)
+			found = False
+			if process_cache:
+				found, val = process_cache.get(key)
+
+			if not found:
+				try:
+					val = self.get(key)
+				except redis.exceptions.ConnectionError:
+					pass
+
+				if val is not None:
+					val = pickle.loads(val)
+					if process_cache:
+						process_cache.set(key, val)
 
 			if not expires:
 				if val is None and generator:
@@ -133,6 +151,9 @@ class RedisWrapper(redis.Redis):
 			except redis.exceptions.ConnectionError:
 				pass
 
+			if is_cached_in_process(key):
+				publish_invalidation(self, key)
+
 	def lpush(self, key, value):
 		super(RedisWrapper, self).lpush(self.make_key(key), value)
 
@@ -145,6 +166,32 @@ class RedisWrapper(redis.Redis):
 	def rpop(self, key):
 		return super(RedisWrapper, self).rpop(self.make_key(key))
 
+	def lpop_many(self, key, count):
+		"""Pop up to `count` items from the head of a list in one round trip."""
+		return self._pop_many(key, count, from_head=True)
+
+	def rpop_many(self, key, count):
+		"""Pop up to `count` items from the tail of a list in one round trip, in the
+		order `rpop` would have returned them."""
+		return self._pop_many(key, count, from_head=False)
+
+	def _pop_many(self, key, count, from_head):
+		# LPOP with count needs Redis 6.2, LRANGE + LTRIM in MULTI / EXEC is just as atomic
+		key = self.make_key(key)
+		pipeline = self.pipeline()
+		if from_head:
+			pipeline.lrange(key, 0, count - 1)
+			pipeline.ltrim(key, count, -1)
+		else:
+			pipeline.lrange(key, -count, -1)
+			pipeline.ltrim(key, 0, -count - 1)
+
+		items = pipeline.execute()[0]
+		if not from_head:
+			items.reverse()
+
+		return items
+
 	def llen(self, key):
 		return super(RedisWrapper, self).llen(self.make_key(key))
 
@@ -171,6 +218,9 @@ class RedisWrapper(redis.Redis):
 		except redis.exceptions.ConnectionError:
 			pass
 
+		if is_cached_in_process(_name):
+			publish_invalidation(self, _name, key)
+
 	def hexists(self, name: str, key: str, shared: bool = False) -> bool:
 		if key is None:
 			return False
@@ -197,6 +247,13 @@ class RedisWrapper(redis.Redis):
 		if key in frappe.local.cache[_name]:
 			return frappe.local.cache[_name][key]
 
+		process_cache = is_cached_in_process(_name) and get_process_cache(self)
+		if process_cache:
+			found, value = process_cache.get(frappe.safe_encode(_name), key)
+			if found:
+				frappe.local.cache[_name][key] = value
+				return value
+
 		value = None
 		try:
 			value = super(RedisWrapper, self).hget(_name, key)
@@ -206,6 +263,8 @@ class RedisWrapper(redis.Redis):
 		if value:
 			value = pickle.loads(value)
 			frappe.local.cache[_name][key] = value
+			if process_cache:
+				process_cache.set(frappe.safe_encode(_name), value, key)
 		elif generator:
 			value = generator()
 			try:
@@ -226,6 +285,17 @@ class RedisWrapper(redis.Redis):
 		except redis.exceptions.ConnectionError:
 			pass
 
+		if is_cached_in_process(_name):
+			publish_invalidation(self, _name, key)
+
+	def clear_process_cache(self):
+		"""Drop values cached in the memory of all worker processes."""
+		clear_process_cache(self)
+
+	def get_process_cache_stats(self):
+		"""Hit / miss counters of the in-process cache of this worker."""
+		return get_process_cache_stats()
+
 	def hdel_keys(self, name_starts_with, key):
 		"""Delete hash names with wildcard `*` and key"""
 		for name in frappe.cache().get_keys(name_starts_with):
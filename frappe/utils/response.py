@@ -58,6 +58,7 @@ def build_response(response_type=None):
 		"page": as_page,
 		"redirect": redirect,
 		"binary": as_binary,
+		"file": as_file,
 	}
 
 	return response_type_map[frappe.response.get("type") or response_type]()
@@ -134,6 +135,24 @@ def as_binary():
 	return response
 
 
+def as_file():
+	"""Send the file of an export in chunks, it is closed once it is sent"""
+	f = frappe.response["file"]
+	filename = frappe.response["filename"]
+
+	f.seek(0, os.SEEK_END)
+	content_length = f.tell()
+	f.seek(0)
+
+	response = Response(wrap_file(frappe.local.request.environ, f), direct_passthrough=True)
+	response.mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+	response.content_length = content_length
+	response.headers["Content-Disposition"] = (
+		'attachment; filename="%s"' % filename.replace(" ", "_")
+	).encode("utf-8")
+	return response
+
+
 def make_logs(response=None):
 	"""make strings for msgprint and errprint"""
 	if not response:
@@ -19,7 +19,8 @@ from frappe import _
 from frappe.frappeclient import FrappeClient
 from frappe.handler import execute_cmd
 from frappe.modules import scrub
-from frappe.utils.background_jobs import enqueue, get_jobs
+from frappe.utils.background_jobs import enqueue
+from frappe.utils.background_jobs import is_job_queued as _is_job_queued
 from frappe.website.utils import get_next_link, get_shade, get_toc
 from frappe.www.printview import get_visible_columns
 
@@ -214,9 +215,7 @@ def is_job_queued(job_name, queue="default"):
 	:param queue: should be either long, default or short
 	"""
 
-	site = frappe.local.site
-	queued_jobs = get_jobs(site=site, queue=queue, key="job_name").get(site)
-	return queued_jobs and job_name in queued_jobs
+	return _is_job_queued(job_name, queue=queue)
 
 
 def safe_enqueue(function, **kwargs):
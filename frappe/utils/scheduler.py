@@ -6,6 +6,12 @@ Events:
 	daily
 	monthly
 	weekly
+
+The next execution time of every active `Scheduled Job Type` is kept in a sorted set per
+site and the earliest of those in a sorted set of sites, so a scheduler tick only connects
+to sites that have due jobs. Sites are processed concurrently by a pool of
+`scheduler_tick_workers` threads (default 4). Sites with a paused, disabled or dormant
+scheduler are checked again after `scheduler_recheck_interval` seconds (default 600).
 """
 # imports - compatibility imports
 from __future__ import print_function, unicode_literals
@@ -13,19 +19,33 @@ from __future__ import print_function, unicode_literals
 # imports - standard imports
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 # imports - third party imports
 import schedule
 
 # imports - module imports
 import frappe
+from frappe.core.doctype.scheduled_job_type.scheduled_job_type import (
+	get_cron_format,
+	get_next_execution,
+)
 from frappe.core.doctype.user.user import STANDARD_USERS
 from frappe.installer import update_site_config
-from frappe.utils import get_datetime, get_sites, now_datetime
+from frappe.utils import cint, get_datetime, get_sites, now_datetime
 from frappe.utils.background_jobs import get_jobs
 
 DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+DEFAULT_TICK_WORKERS = 4
+DEFAULT_RECHECK_INTERVAL = 600
+
+# sorted set of sites by the time their next job is due
+SCHEDULER_SITES_KEY = "frappe:scheduler:sites"
+
+# site indexes are rebuilt from `Scheduled Job Type` daily, and whenever they are missing
+SCHEDULER_INDEX_TTL = 86400
+
 
 def start_scheduler():
 	"""Run enqueue_events_for_all_sites every 2 minutes (default).
@@ -48,13 +68,21 @@ def enqueue_events_for_all_sites():
 		return
 
 	with frappe.init_site():
-		sites = get_sites()
+		sites = get_due_sites(get_sites())
+		workers = cint(frappe.get_conf().scheduler_tick_workers) or DEFAULT_TICK_WORKERS
+
+	if not sites:
+		return
 
-	for site in sites:
-		try:
-			enqueue_events_for_site(site=site)
-		except Exception as e:
-			print(e.__class__, "Failed to enqueue events for site: {}".format(site))
+	with ThreadPoolExecutor(max_workers=min(workers, len(sites))) as executor:
+		executor.map(_enqueue_events_for_site, sites)
+
+
+def _enqueue_events_for_site(site):
+	try:
+		enqueue_events_for_site(site=site)
+	except Exception as e:
+		print(e.__class__, "Failed to enqueue events for site: {}".format(site))
 
 
 def enqueue_events_for_site(site):
@@ -68,6 +96,7 @@ def enqueue_events_for_site(site):
 		frappe.init(site=site)
 		frappe.connect()
 		if is_scheduler_inactive():
+			set_site_due_time(site, time.time() + get_recheck_interval())
 			return
 
 		enqueue_events(site=site)
@@ -86,13 +115,116 @@ def enqueue_events_for_site(site):
 
 
 def enqueue_events(site):
+	recheck_at = time.time() + get_recheck_interval()
+
 	if schedule_jobs_based_on_activity():
 		frappe.flags.enqueued_jobs = []
 		queued_jobs = get_jobs(site=site, key="job_type").get(site) or []
-		for job_type in frappe.get_all("Scheduled Job Type", ("name", "method"), dict(stopped=0)):
+		for name in get_due_job_types(site):
+			job_type = frappe.get_doc("Scheduled Job Type", name)
 			if not job_type.method in queued_jobs:
 				# don't add it to queue if still pending
-				frappe.get_doc("Scheduled Job Type", job_type.name).enqueue()
+				job_type.enqueue()
+
+		next_due = get_next_due_time(site)
+		if next_due is not None:
+			recheck_at = min(recheck_at, next_due)
+
+	set_site_due_time(site, recheck_at)
+
+
+def get_due_sites(sites):
+	"""Sites with due jobs and sites that are not indexed yet"""
+	not_due = frappe.cache().zrangebyscore(SCHEDULER_SITES_KEY, "({0}".format(time.time()), "+inf")
+	not_due = {frappe.safe_decode(site) for site in not_due}
+	return [site for site in sites if site not in not_due]
+
+
+def set_site_due_time(site, timestamp):
+	frappe.cache().zadd(SCHEDULER_SITES_KEY, {site: timestamp})
+
+
+def reset_site_due_time(site):
+	"""Check the site on the next tick, for when jobs may have become due earlier"""
+	frappe.cache().zrem(SCHEDULER_SITES_KEY, site)
+
+
+def get_scheduler_index_key(site):
+	return "frappe:scheduler:{0}".format(site)
+
+
+def get_due_job_types(site):
+	"""Names of the active `Scheduled Job Type` of the site that are due"""
+	key = get_scheduler_index_key(site)
+	if frappe.cache().ttl(key) < 0:
+		# missing, or (re)created without expiry by an update to a single job type
+		rebuild_scheduler_index(site)
+
+	return [
+		frappe.safe_decode(name)
+		for name in frappe.cache().zrangebyscore(key, "-inf", time.time())
+	]
+
+
+def get_next_due_time(site):
+	due = frappe.cache().zrange(get_scheduler_index_key(site), 0, 0, withscores=True)
+	return due[0][1] if due else None
+
+
+def rebuild_scheduler_index(site):
+	job_types = frappe.get_all(
+		"Scheduled Job Type",
+		fields=("name", "frequency", "cron_format", "last_execution"),
+		filters=dict(stopped=0),
+	)
+
+	key = get_scheduler_index_key(site)
+	pipeline = frappe.cache().pipeline()
+	pipeline.delete(key)
+	if job_types:
+		pipeline.zadd(key, get_next_execution_timestamps(job_types))
+		pipeline.expire(key, SCHEDULER_INDEX_TTL)
+	pipeline.execute()
+
+
+def update_scheduler_index(site, job_types):
+	"""Update the next execution time of the given `Scheduled Job Type` documents"""
+	key = get_scheduler_index_key(site)
+	active = [job_type for job_type in job_types if not job_type.stopped]
+	stopped = [job_type.name for job_type in job_types if job_type.stopped]
+
+	pipeline = frappe.cache().pipeline()
+	if active:
+		pipeline.zadd(key, get_next_execution_timestamps(active))
+	if stopped:
+		pipeline.zrem(key, *stopped)
+	pipeline.execute()
+
+
+def remove_from_scheduler_index(site, names):
+	frappe.cache().zrem(get_scheduler_index_key(site), *names)
+
+
+def clear_scheduler_index(site):
+	frappe.cache().delete(get_scheduler_index_key(site))
+	reset_site_due_time(site)
+
+
+def get_next_execution_timestamps(job_types):
+	# next executions are naive datetimes in the site's time zone, scores are unix timestamps
+	# so that sites in different time zones can be compared
+	now, timestamp = now_datetime(), time.time()
+	timestamps = {}
+	for job_type in job_types:
+		cron_format = job_type.cron_format or get_cron_format(job_type.frequency)
+		next_execution = get_next_execution(cron_format, job_type.last_execution)
+		timestamps[job_type.name] = timestamp + (next_execution - now).total_seconds()
+
+	return timestamps
+
+
+def get_recheck_interval():
+	return cint(frappe.get_conf().scheduler_recheck_interval) or DEFAULT_RECHECK_INTERVAL
 
 
 def is_scheduler_inactive():
@@ -117,6 +249,7 @@ def is_scheduler_disabled():
 
 def toggle_scheduler(enable):
 	frappe.db.set_value("System Settings", None, "enable_scheduler", 1 if enable else 0)
+	reset_site_due_time(frappe.local.site)
 
 
 def enable_scheduler():
@@ -171,3 +304,4 @@ def activate_scheduler():
 		enable_scheduler()
 	if frappe.conf.pause_scheduler:
 		update_site_config("pause_scheduler", 0)
+		reset_site_due_time(frappe.local.site)
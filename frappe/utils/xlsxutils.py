@@ -16,7 +16,8 @@ ILLEGAL_CHARACTERS_RE = re.compile(r"[\000-\010]|[\013-\014]|[\016-\037]")
 
 
 # return xlsx file object
-def make_xlsx(data, sheet_name, wb=None, column_widths=None):
+def make_xlsx(data, sheet_name, wb=None, column_widths=None, file=None):
+	"""Write rows to a write-only workbook, saved to `file` or a new `BytesIO`"""
 	column_widths = column_widths or []
 	if wb is None:
 		wb = openpyxl.Workbook(write_only=True)
@@ -46,7 +47,7 @@ def make_xlsx(data, sheet_name, wb=None, column_widths=None):
 
 		ws.append(clean_row)
 
-	xlsx_file = BytesIO()
+	xlsx_file = BytesIO() if file is None else file
 	wb.save(xlsx_file)
 	return xlsx_file
 
@@ -90,15 +91,18 @@ def read_xlsx_file_from_attached_file(file_url=None, fcontent=None, filepath=Non
 	else:
 		return
 
-	rows = []
-	wb1 = load_workbook(filename=filename, read_only=True, data_only=True)
-	ws1 = wb1.active
-	for row in ws1.iter_rows():
-		tmp_list = []
-		for cell in row:
-			tmp_list.append(cell.value)
-		rows.append(tmp_list)
-	return rows
+	return list(read_xlsx_rows(filename))
+
+
+def read_xlsx_rows(filename):
+	"""Values of the rows of the active sheet, read one row at a time"""
+	wb = load_workbook(filename=filename, read_only=True, data_only=True)
+	try:
+		for row in wb.active.iter_rows(values_only=True):
+			yield list(row)
+	finally:
+		# read-only workbooks keep the file open until they are closed
+		wb.close()
 
 
 def read_xls_file_from_attached_file(content):
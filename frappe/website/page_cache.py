@@ -0,0 +1,251 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# MIT License. See license.txt
+
+"""
+HTTP response cache for website pages requested by Guests.
+
+Cached pages are answered in `frappe.app.init_request`, before a database connection or
+session is set up. Responses carry an `ETag` and `Last-Modified` header, so that
+conditional requests are answered with `304 Not Modified` without sending the page.
+
+Only requests that already have the cookies of a Guest session are answered from the
+cache, the first request of a visitor is rendered to set them.
+
+Pages are cached per host, path, query string, language and the cookies listed in site
+config as `website_cache_cookies`. `frappe.website.render.clear_cache` only marks cached
+pages as stale: a stale page is still served while a background job renders it again.
+Pre-render the pages of the sitemap with:
+
+	bench --site [site] warm-website-cache
+"""
+
+import hashlib
+import time
+from datetime import datetime
+
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request, Response
+
+import frappe
+from frappe.translate import get_language, get_parent_language
+from frappe.website.utils import can_cache
+
+# cached responses are dropped after this many seconds, stale or not
+DEFAULT_EXPIRY = 86400
+
+# requests to these paths are never website pages
+EXCLUDED_PATHS = ("/api/", "/backups", "/private/files/", "/app", "/desk")
+
+# headers of the rendered response kept with the page
+CACHED_HEADERS = ("X-Page-Name", "Link")
+
+
+def get_cached_response(request):
+	"""Cached response to the request, `None` if the request has to be rendered"""
+	lang = get_guest_language(request)
+	if not (lang and is_cacheable_request(request) and has_guest_cookies(request)):
+		return None
+
+	cache_key = get_cache_key(request, lang)
+	cached = frappe.cache().get_value(cache_key, expires=True)
+	if not cached:
+		return None
+
+	if cached["version"] != get_version(cached["route"]):
+		enqueue_render(cache_key, cached)
+
+	response = Response(cached["data"], status=cached["status"], content_type=cached["content_type"])
+	for header, value in cached["headers"].items():
+		response.headers[header] = value
+
+	response.headers["X-From-Cache"] = "True"
+	return make_conditional(request, response, cached)
+
+
+def cache_response(response):
+	"""Cache a page rendered for a Guest and answer conditional requests for it"""
+	request = frappe.local.request
+	if not (
+		response.status_code == 200
+		and frappe.local.response.page_cacheable
+		and frappe.session.user == "Guest"
+		and is_cacheable_request(request)
+		# the page would also depend on the languages translated for the website
+		and not frappe.get_hooks("translated_languages_for_website")
+	):
+		return response
+
+	data = response.get_data()
+	route = get_route(request)
+	cached = {
+		"data": data,
+		"status": response.status_code,
+		"content_type": response.headers.get("Content-Type"),
+		"headers": {h: response.headers[h] for h in CACHED_HEADERS if h in response.headers},
+		"etag": hashlib.md5(data).hexdigest(),
+		"last_modified": time.time(),
+		"route": route,
+		"version": get_version(route),
+		"request": get_request_args(request),
+	}
+
+	frappe.cache().set_value(
+		get_cache_key(request, frappe.local.lang),
+		cached,
+		expires_in_sec=frappe.conf.website_page_cache_expiry or DEFAULT_EXPIRY,
+	)
+	frappe.flags.page_cached = True
+
+	return make_conditional(request, response, cached)
+
+
+def make_conditional(request, response, cached):
+	response.set_etag(cached["etag"])
+	response.last_modified = datetime.utcfromtimestamp(cached["last_modified"])
+	response.headers["Cache-Control"] = "no-cache"
+	return response.make_conditional(request)
+
+
+def is_cacheable_request(request):
+	return (
+		request.method in ("GET", "HEAD")
+		and can_cache()
+		and request.cookies.get("sid", "Guest") == "Guest"
+		and not request.headers.get("Authorization")
+		and not request.args.get("cmd")
+		and not request.args.get("_lang")
+		and not request.path.startswith(EXCLUDED_PATHS)
+	)
+
+
+def has_guest_cookies(request):
+	"""Whether the browser already has the cookies set for a Guest session. Cached responses
+	are sent without a session, so without these cookies `website.js` sees a logged in user."""
+	return request.cookies.get("user_id") == "Guest"
+
+
+def get_guest_language(request):
+	"""Language `frappe.translate.get_language` sets for a Guest, without the database"""
+	languages = frappe.cache().get_value("languages")
+	if not languages:
+		return None
+
+	preferred_language = request.cookies.get("preferred_language")
+	for language in [preferred_language] + list(request.accept_languages.values()):
+		if not language:
+			continue
+
+		if language in languages:
+			return language
+
+		parent_language = get_parent_language(language)
+		if parent_language in languages:
+			return parent_language
+
+	# language of System Settings
+	return None
+
+
+def get_cache_key(request, lang):
+	cookies = "&".join(
+		"{0}={1}".format(cookie, request.cookies.get(cookie, ""))
+		for cookie in frappe.conf.website_cache_cookies or ()
+	)
+	variant = "|".join(
+		(request.host, request.path, frappe.safe_decode(request.query_string), lang, cookies)
+	)
+
+	return "website_page_response|" + hashlib.md5(frappe.safe_encode(variant)).hexdigest()
+
+
+def get_route(request):
+	return request.path.strip("/ ")
+
+
+def get_version(route):
+	"""Changes when cached pages of the route, or all cached pages, are marked as stale"""
+	cache = frappe.cache()
+	return (cache.hget("website_page_version", "*"), cache.hget("website_page_version", route))
+
+
+def mark_stale(path=None):
+	"""Mark cached pages of `path`, or all cached pages, as stale"""
+	frappe.cache().hset(
+		"website_page_version", path.strip("/ ") if path else "*", frappe.generate_hash(length=10)
+	)
+
+
+def get_request_args(request):
+	"""Arguments for `EnvironBuilder` to make a request that has the same cache key"""
+	headers = {"Accept-Language": request.headers.get("Accept-Language", "")}
+	cookies = ["sid", "preferred_language"] + list(frappe.conf.website_cache_cookies or ())
+	headers["Cookie"] = "; ".join(
+		"{0}={1}".format(cookie, request.cookies[cookie])
+		for cookie in cookies
+		if cookie in request.cookies
+	)
+
+	return {
+		"base_url": request.host_url,
+		"path": request.path,
+		"query_string": frappe.safe_decode(request.query_string),
+		"headers": headers,
+	}
+
+
+def enqueue_render(cache_key, cached):
+	# the job runs as the user of the request, no session is set up for cached pages
+	frappe.set_user("Guest")
+	frappe.enqueue(
+		"frappe.website.page_cache.render_page",
+		queue="short",
+		job_name="website_page_cache|" + cache_key,
+		deduplicate=True,
+		cache_key=cache_key,
+		request_args=cached["request"],
+	)
+
+
+def render_page(request_args, cache_key=None):
+	"""Render a page like it is rendered for a Guest request, which caches the response.
+	The cached response for `cache_key` is removed if the page is no longer cacheable."""
+	from frappe.website.render import render
+
+	frappe.local.request = Request(EnvironBuilder(method="GET", **request_args).get_environ())
+	frappe.local.form_dict = frappe._dict(frappe.local.request.args.items())
+	frappe.local.response = frappe._dict({"docs": []})
+	frappe.local.no_cache = False
+	frappe.flags.page_cached = False
+	frappe.set_user("Guest")
+	frappe.local.lang = get_language()
+
+	rendered = render()
+	if cache_key and not frappe.flags.page_cached:
+		frappe.cache().delete_value(cache_key)
+
+	return rendered
+
+
+def warm_cache(lang=None):
+	"""Render the pages of the sitemap into the page cache"""
+	from frappe.utils import get_url, update_progress_bar
+	from frappe.website.router import get_pages
+	from frappe.www.sitemap import get_public_pages_from_doctypes
+
+	routes = [page.name for page in get_pages().values() if page.sitemap]
+	routes += [route for route in get_public_pages_from_doctypes() if route]
+	lang = lang or frappe.db.get_default("lang") or "en"
+
+	for i, route in enumerate(routes):
+		update_progress_bar("Rendering pages", i, len(routes))
+		render_page(
+			{
+				"base_url": get_url(),
+				"path": "/" + route.strip("/"),
+				"headers": {"Accept-Language": lang},
+			}
+		)
+
+	frappe.local.request = None
+	print()
+	return routes
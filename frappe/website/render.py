@@ -20,6 +20,7 @@ from frappe import _
 from frappe.translate import get_language
 from frappe.utils import cstr
 from frappe.website.context import get_context
+from frappe.website.page_cache import cache_response, mark_stale
 from frappe.website.redirect import resolve_redirect
 from frappe.website.router import clear_sitemap, evaluate_dynamic_routes
 from frappe.website.utils import (
@@ -103,7 +104,7 @@ def render(path=None, http_status_code=None):
 				"Cache-Control": "no-store, no-cache, must-revalidate",
 			},
 		)
-	return build_response(path, data, http_status_code or 200)
+	return cache_response(build_response(path, data, http_status_code or 200))
 
 
 def is_binary_file(path):
@@ -222,6 +223,7 @@ def render_page(path):
 
 	if out:
 		frappe.local.response.from_cache = True
+		frappe.local.response.page_cacheable = True
 		return out
 
 	return build(path)
@@ -272,6 +274,7 @@ def build_page(path):
 		page_cache = frappe.cache().hget("website_page", path) or {}
 		page_cache[frappe.local.lang] = html
 		frappe.cache().hset("website_page", path, page_cache)
+		frappe.local.response.page_cacheable = True
 
 	return html
 
@@ -350,6 +353,10 @@ def clear_cache(path=None):
 		frappe.cache().delete_value(key)
 
 	frappe.cache().delete_value("website_404")
+
+	# cached responses are served until they are rendered again
+	mark_stale(path)
+
 	if path:
 		frappe.cache().hdel("website_redirects", path)
 		delete_page_cache(path)
@@ -23,7 +23,7 @@ def get_context(context):
 
 	hooks = frappe.get_hooks()
 	try:
-		boot = frappe.sessions.get()
+		boot = frappe.sessions.get(include_sections=context.get("for_mobile"))
 	except Exception as e:
 		raise frappe.SessionBootFailed from e
 
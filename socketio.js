@@ -187,11 +187,14 @@ io.on("connection", function (socket) {
 subscriber.on("message", function (_channel, message) {
 	message = JSON.parse(message);
 
-	if (message.room) {
-		io.to(message.room).emit(message.event, message.message);
-	} else {
-		io.emit(message.event, message.message);
-	}
+	// events published after commit are sent in batches
+	(message.batch || [message]).forEach(function (event) {
+		if (event.room) {
+			io.to(event.room).emit(event.event, event.message);
+		} else {
+			io.emit(event.event, event.message);
+		}
+	});
 });
 
 